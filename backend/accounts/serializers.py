@@ -1,6 +1,5 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from django.db.models import Sum, Max
 
 User = get_user_model()
 
@@ -8,6 +7,10 @@ class UserStatsSerializer(serializers.Serializer):
     """사용자 게임 통계 직렬화"""
     perfectCount = serializers.IntegerField()
     highestScore = serializers.IntegerField()
+    playCount = serializers.IntegerField()
+    fullComboCount = serializers.IntegerField()
+    allPerfectCount = serializers.IntegerField()
+    maxCombo = serializers.IntegerField()
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -20,18 +23,14 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'email', 'stats')
 
     def get_stats(self, obj):
-        from game.models import Result
-        
-        # 해당 유저의 모든 Result에서 perfect 합계와 최고 점수 집계
-        stats = Result.objects.filter(user=obj).aggregate(
-            perfectCount=Sum('perfect'),
-            highestScore=Max('score')
-        )
-        
-        return {
-            'perfectCount': stats['perfectCount'] or 0,
-            'highestScore': stats['highestScore'] or 0,
-        }
+        from game.models import UserStats
+
+        # 결과 저장 시 갱신되는 UserStats 행을 그대로 읽음 (아직 기록이 없으면 0)
+        try:
+            stats = obj.gameStats
+        except UserStats.DoesNotExist:
+            stats = UserStats(user=obj)
+        return UserStatsSerializer(stats).data
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -1,6 +1,39 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.core.signals import request_started
+
+BACKGROUND_WORKERS_UID = 'game.start_background_workers'
+
+
+def start_background_workers(**kwargs):
+    """요청을 처리하는 프로세스의 첫 요청에서 백그라운드 작업 시작 (한 번만)
+
+    서버가 다시 시작되어도 첫 요청 때 저널에 남은 결과를 저장하고 대기 중인 작업을 이어서 처리합니다.
+    ready()가 아니라 첫 요청에서 시작하므로 gunicorn --preload처럼 fork 전에 앱을 불러오는 서버나
+    자동 리로더의 감시 프로세스에서는 스레드를 만들지 않습니다.
+    """
+    from django.conf import settings
+
+    from .result_queue import result_queue
+    from .video_jobs import video_job_runner
+
+    request_started.disconnect(dispatch_uid=BACKGROUND_WORKERS_UID)
+    if settings.RESULT_INGEST_MODE == 'queue':
+        result_queue.start()
+    video_job_runner.start()
+
+
+def _is_management_command():
+    """runserver가 아닌 manage.py 명령 (migrate, test 등)"""
+    return os.path.basename(sys.argv[0]) in ('manage.py', 'django-admin') and sys.argv[1:2] != ['runserver']
 
 
 class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game'
+
+    def ready(self):
+        if not _is_management_command():
+            request_started.connect(start_background_workers, dispatch_uid=BACKGROUND_WORKERS_UID)
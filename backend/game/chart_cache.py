@@ -0,0 +1,54 @@
+"""
+차트 상세 응답 캐시
+
+노트 부분은 차트 버전(revision)별로 렌더링된 바이트를 캐시하고,
+랭킹/유저 최고 기록처럼 요청마다 달라지는 메타데이터만 매번 직렬화하여 합칩니다.
+ETag는 차트 버전과 메타데이터로 계산하므로 노트를 읽지 않고 304를 판단할 수 있습니다.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.utils.encoders import JSONEncoder
+
+from .note_codec import pack_notes, wrap_chart
+
+JSON_FORMAT = 'json'
+BINARY_FORMAT = 'bin'
+
+
+def _dumps(data):
+    # DRF JSONRenderer와 같은 형식 (compact, ensure_ascii=False)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _cache_key(chart, fmt):
+    return f'chart:{chart.pk}:{chart.revision}:notes.{fmt}'
+
+
+def chart_etag(chart, fmt, meta):
+    """차트 버전, 응답 포맷, 메타데이터(랭킹/유저 기록 포함)로 강한 ETag 계산"""
+    digest = hashlib.sha256(f'{chart.pk}:{chart.revision}:{fmt}:'.encode('utf-8') + _dumps(meta))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def get_notes_payload(chart, fmt):
+    """렌더링된 노트 부분을 캐시에서 가져오고, 없으면 만들어 저장"""
+    key = _cache_key(chart, fmt)
+    payload = cache.get(key)
+    if payload is None:
+        if fmt == BINARY_FORMAT:
+            payload = pack_notes(chart.get_note_columns())
+        else:
+            payload = _dumps([{**note_data, 'chart': chart.id} for note_data in chart.iter_notes()])
+        cache.set(key, payload, settings.CHART_CACHE_TIMEOUT)
+    return payload
+
+
+def render_chart(chart, fmt, meta):
+    """메타데이터와 캐시된 노트 부분을 합쳐 차트 상세 응답 본문 생성"""
+    notes_payload = get_notes_payload(chart, fmt)
+    if fmt == BINARY_FORMAT:
+        return wrap_chart(meta, notes_payload)
+    return _dumps(meta)[:-1] + b',"notes":' + notes_payload + b'}'
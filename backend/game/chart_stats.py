@@ -0,0 +1,128 @@
+"""
+차트별 통계 (점수/정확도 분포, 판정 합계, 레인별 miss)
+
+결과를 저장할 때마다 차트별 구간(bin) 값을 ChartStat 테이블에 더합니다.
+metric마다 bin 번호의 의미가 다릅니다.
+
+    plays       0 = 전체 플레이 수, 1 = 입력 기록으로 검증된 플레이 수
+    score       점수 구간 (SCORE_BIN_WIDTH 단위, 마지막 구간은 그 이상 전부)
+    accuracy    정확도 구간 (ACCURACY_BIN_WIDTH % 단위, 100%는 마지막 구간)
+    judgement   JUDGEMENT_FIELDS 순서의 판정 수 합계
+    laneNotes   레인별 노트 수 합계 (검증된 플레이만)
+    laneMisses  레인별 miss 수 합계 (검증된 플레이만)
+
+결과 저장(save_results)과 rebuild_chart_stats 명령이 같은 함수(bucket_totals)로 값을 계산합니다.
+"""
+import numpy as np
+
+SCORE_BIN_WIDTH = 50000
+SCORE_BINS = 40
+ACCURACY_BIN_WIDTH = 5
+ACCURACY_BINS = 100 // ACCURACY_BIN_WIDTH
+
+JUDGEMENT_FIELDS = ('perfect', 'great', 'good', 'bad', 'miss', 'earlyCount', 'lateCount')
+
+METRIC_PLAYS = 'plays'
+METRIC_SCORE = 'score'
+METRIC_ACCURACY = 'accuracy'
+METRIC_JUDGEMENT = 'judgement'
+METRIC_LANE_NOTES = 'laneNotes'
+METRIC_LANE_MISSES = 'laneMisses'
+
+# bucket_totals에 넘기는 Result 필드 순서
+RESULT_FIELDS = ('chart_id', 'score', 'accuracy', *JUDGEMENT_FIELDS, 'laneStats')
+
+
+def _per_chart(chart_index, chart_count, bins, bin_count, weights=None):
+    """(차트, bin)별 합계를 (차트 수, bin 수) 배열로"""
+    flat = np.bincount(chart_index * bin_count + bins, weights=weights, minlength=chart_count * bin_count)
+    return flat.reshape(chart_count, bin_count).astype(np.int64)
+
+
+def bucket_totals(rows):
+    """결과 행 목록의 차트별 통계 값 계산
+
+    Args:
+        rows: RESULT_FIELDS 순서의 튜플 목록.
+
+    Returns:
+        dict: {(차트 ID, metric, bin): 값} (0인 값은 제외)
+    """
+    if not rows:
+        return {}
+    chart_ids, chart_index = np.unique(np.array([row[0] for row in rows], dtype=np.int64), return_inverse=True)
+    numbers = np.array([row[1:-1] for row in rows], dtype=np.float64)
+    scores, accuracies, judgements = numbers[:, 0], numbers[:, 1], numbers[:, 2:]
+    chart_count = len(chart_ids)
+
+    score_bins = np.clip(scores // SCORE_BIN_WIDTH, 0, SCORE_BINS - 1).astype(np.int64)
+    accuracy_bins = np.clip(accuracies // ACCURACY_BIN_WIDTH, 0, ACCURACY_BINS - 1).astype(np.int64)
+    judgement_totals = np.stack(
+        [np.bincount(chart_index, weights=judgements[:, i], minlength=chart_count) for i in range(len(JUDGEMENT_FIELDS))],
+        axis=1,
+    ).astype(np.int64)
+
+    # 레인 통계는 검증된 결과만 [노트 수, miss 수] 목록으로 가지고 있으므로 (결과, 레인, 2) 배열로 채움
+    verified = [i for i, row in enumerate(rows) if row[-1]]
+    lane_count = max((len(rows[i][-1]) for i in verified), default=0)
+    lane_stats = np.zeros((len(verified), lane_count, 2), dtype=np.int64)
+    for position, i in enumerate(verified):
+        lane_stats[position, :len(rows[i][-1])] = rows[i][-1]
+    verified_index = chart_index[verified]
+    lane_totals = np.zeros((chart_count, lane_count, 2), dtype=np.int64)
+    np.add.at(lane_totals, verified_index, lane_stats)
+
+    metrics = (
+        (METRIC_PLAYS, np.stack([
+            np.bincount(chart_index, minlength=chart_count),
+            np.bincount(verified_index, minlength=chart_count),
+        ], axis=1)),
+        (METRIC_SCORE, _per_chart(chart_index, chart_count, score_bins, SCORE_BINS)),
+        (METRIC_ACCURACY, _per_chart(chart_index, chart_count, accuracy_bins, ACCURACY_BINS)),
+        (METRIC_JUDGEMENT, judgement_totals),
+        (METRIC_LANE_NOTES, lane_totals[:, :, 0]),
+        (METRIC_LANE_MISSES, lane_totals[:, :, 1]),
+    )
+    totals = {}
+    for metric, values in metrics:
+        for chart_position, bin_number in zip(*np.nonzero(values)):
+            totals[(int(chart_ids[chart_position]), metric, int(bin_number))] = int(values[chart_position, bin_number])
+    return totals
+
+
+def result_rows(results):
+    """Result 인스턴스 목록을 bucket_totals 입력 형태로 변환"""
+    return [tuple(getattr(result, field) for field in RESULT_FIELDS) for result in results]
+
+
+def summarize(chart, stats):
+    """ChartStat (metric, bin, 값) 목록을 통계 응답으로 변환"""
+    values = {}
+    for metric, bin_number, value in stats:
+        values.setdefault(metric, {})[bin_number] = value
+
+    def histogram(metric, bin_count):
+        counts = values.get(metric, {})
+        return [counts.get(i, 0) for i in range(bin_count)]
+
+    plays = values.get(METRIC_PLAYS, {})
+    judgements = values.get(METRIC_JUDGEMENT, {})
+    lane_notes = values.get(METRIC_LANE_NOTES, {})
+    lane_misses = values.get(METRIC_LANE_MISSES, {})
+    return {
+        'musicId': chart.musicId,
+        'playCount': plays.get(0, 0),
+        'verifiedPlayCount': plays.get(1, 0),
+        'score': {'binWidth': SCORE_BIN_WIDTH, 'counts': histogram(METRIC_SCORE, SCORE_BINS)},
+        'accuracy': {'binWidth': ACCURACY_BIN_WIDTH, 'counts': histogram(METRIC_ACCURACY, ACCURACY_BINS)},
+        'judgements': {field: judgements.get(i, 0) for i, field in enumerate(JUDGEMENT_FIELDS)},
+        'lanes': [
+            {
+                'lane': lane,
+                'notes': lane_notes[lane],
+                'misses': lane_misses.get(lane, 0),
+                'missRate': lane_misses.get(lane, 0) / lane_notes[lane],
+            }
+            for lane in sorted(lane_notes)
+        ],
+    }
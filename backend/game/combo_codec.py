@@ -0,0 +1,112 @@
+"""
+콤보 기록 인코딩
+
+프론트엔드는 콤보 구간을 "시작-끝-콤보수" 문자열을 쉼표로 이은 형태로 보냅니다
+(예: "1520.4-8830.1-42,9012-9012-1"). 예전 데이터는 콤보 수만 이어 붙인 형태("42,1")입니다.
+이를 구간별 int32 배열 세 개로 저장하고, 응답할 때 같은 문자열 형태로 되돌립니다.
+시간은 ms 단위 정수로 반올림합니다.
+
+바이너리 레이아웃 (little-endian)
+    offset  타입            내용
+    0       char[4]         매직 "SCB1"
+    4       uint32          구간 수 n
+    8       uint32          플래그 (bit 0: 시간 배열 포함)
+    12      int32[n]        콤보 수
+    12+4n   int32[n]        시작 시간 (ms, 시간 정보가 없는 구간은 -1) - 플래그 bit 0일 때만
+    12+8n   int32[n]        끝 시간 (ms, 시간 정보가 없는 구간은 -1) - 플래그 bit 0일 때만
+
+모든 구간에 시간 정보가 없으면(예전 형식) 콤보 수 배열만 저장합니다.
+"""
+import struct
+
+import numpy as np
+
+COMBO_MAGIC = b'SCB1'
+NO_TIME = -1
+
+_HEADER = struct.Struct('<4sII')
+_HAS_TIMES = 1
+_INT32 = np.dtype('<i4')
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+class ComboParseError(ValueError):
+    """콤보 문자열 형식 오류"""
+
+
+def parse_combo(text):
+    """콤보 문자열을 (시작, 끝, 콤보 수) int32 배열 세 개로 변환
+
+    Raises:
+        ComboParseError: 구간 형식이 잘못되었거나 값이 범위를 벗어난 경우.
+    """
+    segments = [segment.strip() for segment in text.split(',')] if text.strip() else []
+    starts = np.full(len(segments), NO_TIME, dtype=np.int64)
+    ends = np.full(len(segments), NO_TIME, dtype=np.int64)
+    counts = np.zeros(len(segments), dtype=np.int64)
+
+    for i, segment in enumerate(segments):
+        parts = segment.split('-')
+        try:
+            if len(parts) == 3:
+                starts[i] = round(float(parts[0]))
+                ends[i] = round(float(parts[1]))
+                counts[i] = int(parts[2])
+            elif len(parts) == 1:
+                counts[i] = int(parts[0])
+            else:
+                raise ValueError
+        except (ValueError, OverflowError):
+            raise ComboParseError(f'콤보 구간 형식이 올바르지 않습니다: "{segment}" ({i}번째)')
+
+    for name, column in (('시간', starts), ('시간', ends), ('콤보 수', counts)):
+        if len(column) and (column.min() < NO_TIME or column.max() > _INT32_MAX):
+            raise ComboParseError(f'콤보 {name} 값이 범위를 벗어났습니다.')
+    return starts.astype(_INT32), ends.astype(_INT32), counts.astype(_INT32)
+
+
+def pack_combo(starts, ends, counts):
+    starts = np.asarray(starts, dtype=_INT32)
+    ends = np.asarray(ends, dtype=_INT32)
+    has_times = bool(np.any(starts != NO_TIME) or np.any(ends != NO_TIME))
+    parts = [
+        _HEADER.pack(COMBO_MAGIC, len(counts), _HAS_TIMES if has_times else 0),
+        np.asarray(counts, dtype=_INT32).tobytes(),
+    ]
+    if has_times:
+        parts += [starts.tobytes(), ends.tobytes()]
+    return b''.join(parts)
+
+
+def unpack_combo(buffer):
+    """pack_combo 결과를 (시작, 끝, 콤보 수) 배열로 읽음"""
+    if not buffer:
+        empty = np.zeros(0, dtype=_INT32)
+        return empty, empty, empty
+    magic, count, flags = _HEADER.unpack_from(buffer, 0)
+    if magic != COMBO_MAGIC:
+        raise ValueError('콤보 데이터가 아닙니다.')
+    counts = np.frombuffer(buffer, dtype=_INT32, count=count, offset=_HEADER.size)
+    if not flags & _HAS_TIMES:
+        no_time = np.full(count, NO_TIME, dtype=_INT32)
+        return no_time, no_time, counts
+    times = np.frombuffer(buffer, dtype=_INT32, count=2 * count, offset=_HEADER.size + 4 * count)
+    return times[:count], times[count:], counts
+
+
+def format_combo(starts, ends, counts):
+    """배열을 프론트엔드 콤보 문자열 형태로 변환"""
+    return ','.join(
+        str(count) if start == NO_TIME else f'{start}-{end}-{count}'
+        for start, end, count in zip(starts.tolist(), ends.tolist(), counts.tolist())
+    )
+
+
+def encode_combo(text):
+    """콤보 문자열을 (바이너리, 최대 콤보) 로 변환"""
+    starts, ends, counts = parse_combo(text)
+    return pack_combo(starts, ends, counts), int(counts.max()) if len(counts) else 0
+
+
+def decode_combo(buffer):
+    return format_combo(*unpack_combo(buffer))
@@ -0,0 +1,250 @@
+"""
+메모리 리더보드 엔진
+
+차트별로 (점수, 유저) 순서를 정렬된 정수 목록으로 유지하여
+상위 N명, 유저 순위, 내 주변 N명 조회를 O(log n)에 처리합니다.
+
+각 차트는 처음 조회될 때 Rank 테이블에서 읽어오고, create_result가 점수를 갱신합니다.
+엔진은 프로세스마다 따로 존재하므로 LEADERBOARD_REFRESH_SECONDS가 지나면
+다른 프로세스에서 기록된 점수를 반영하기 위해 차트를 다시 읽습니다.
+그래서 리더보드 API의 상위 목록은 DB에서 읽고, 엔진은 내 순위/주변 조회에만 사용합니다.
+같은 점수는 어디서나 유저 ID 오름차순으로 정렬합니다.
+"""
+from bisect import bisect_left, insort
+import threading
+import time
+
+from django.conf import settings
+
+_SCORE_OFFSET = 2 ** 31 - 1
+_USER_BITS = 32
+_USER_MASK = (1 << _USER_BITS) - 1
+
+
+def _key(score, user_id):
+    """점수 내림차순, 같은 점수는 유저 ID 오름차순이 되도록 (점수, 유저)를 정수 하나로 인코딩
+
+    점수는 0 이상 2^31 미만(CreateResultSerializer.score에서 검증), 유저 ID는 2^32 미만이어야 합니다.
+    튜플 대신 정수 하나를 써서 항목당 메모리를 줄입니다.
+    """
+    if not (0 <= score <= _SCORE_OFFSET and 0 <= user_id <= _USER_MASK):
+        raise ValueError(f'리더보드 키 범위를 벗어났습니다: score={score}, user_id={user_id}')
+    return ((_SCORE_OFFSET - score) << _USER_BITS) | user_id
+
+
+def _decode(key):
+    return _SCORE_OFFSET - (key >> _USER_BITS), key & _USER_MASK
+
+
+class SortedIntList:
+    """정렬된 정수 목록
+
+    값을 최대 2 * LOAD 크기의 정렬된 버킷으로 나누고, 버킷 크기를 펜윅 트리로 관리하여
+    삽입/삭제/순위(index)/위치 조회를 O(log n)에 처리합니다.
+    """
+    LOAD = 1000
+
+    def __init__(self, values=()):
+        values = sorted(values)
+        self._buckets = [values[i:i + self.LOAD] for i in range(0, len(values), self.LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(values)
+        self._build_tree()
+
+    def __len__(self):
+        return self._len
+
+    def _build_tree(self):
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, bucket_index, delta):
+        i = bucket_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket_index):
+        """bucket_index 앞쪽 버킷들의 값 개수 합"""
+        total = 0
+        i = bucket_index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position):
+        """전체 위치를 (버킷 인덱스, 버킷 내 오프셋)으로 변환"""
+        bucket_index = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = bucket_index + step
+            if nxt < len(self._tree) and self._tree[nxt] <= position:
+                bucket_index = nxt
+                position -= self._tree[nxt]
+            step >>= 1
+        return bucket_index, position
+
+    def add(self, value):
+        if not self._buckets:
+            self._buckets = [[value]]
+            self._maxes = [value]
+            self._len = 1
+            self._build_tree()
+            return
+
+        i = min(bisect_left(self._maxes, value), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        insort(bucket, value)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, value):
+        i = bisect_left(self._maxes, value)
+        bucket = self._buckets[i] if i < len(self._buckets) else []
+        j = bisect_left(bucket, value)
+        if j == len(bucket) or bucket[j] != value:
+            raise ValueError(f'{value} is not in list')
+
+        del bucket[j]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._build_tree()
+
+    def bisect_left(self, value):
+        """value 이상인 첫 값의 위치 (value보다 작은 값의 개수)"""
+        i = bisect_left(self._maxes, value)
+        if i == len(self._buckets):
+            return self._len
+        return self._prefix(i) + bisect_left(self._buckets[i], value)
+
+    def islice(self, start, stop):
+        """[start, stop) 위치의 값들을 순서대로 반환"""
+        start = max(start, 0)
+        stop = min(stop, self._len)
+        if start >= stop:
+            return
+        bucket_index, offset = self._locate(start)
+        remaining = stop - start
+        while remaining:
+            chunk = self._buckets[bucket_index][offset:offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            bucket_index += 1
+            offset = 0
+
+
+class ChartLeaderboard:
+    """차트 하나의 리더보드 (유저별 최고 점수)"""
+
+    def __init__(self, entries=()):
+        self._lock = threading.Lock()
+        self._scores = {}
+        for user_id, score in entries:
+            self._scores[user_id] = score
+        self._keys = SortedIntList(_key(score, user_id) for user_id, score in self._scores.items())
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def score_of(self, user_id):
+        return self._scores.get(user_id)
+
+    def record(self, user_id, score):
+        """최고 점수 갱신 (기존 점수보다 높을 때만). 순위가 바뀌었으면 True"""
+        with self._lock:
+            current = self._scores.get(user_id)
+            if current is not None:
+                if score <= current:
+                    return False
+                self._keys.remove(_key(current, user_id))
+            self._scores[user_id] = score
+            self._keys.add(_key(score, user_id))
+            return True
+
+    def rank_of(self, user_id):
+        """유저 순위 (1부터, 같은 점수는 같은 순위). 기록이 없으면 None"""
+        with self._lock:
+            score = self._scores.get(user_id)
+            if score is None:
+                return None
+            return self._keys.bisect_left(_key(score, 0)) + 1
+
+    def _entries(self, start, stop):
+        """[start, stop) 위치의 (순위, 유저 ID, 점수) 목록"""
+        entries = []
+        for key in self._keys.islice(start, stop):
+            score, user_id = _decode(key)
+            entries.append((self._keys.bisect_left(_key(score, 0)) + 1, user_id, score))
+        return entries
+
+    def top(self, limit):
+        """상위 limit명의 (순위, 유저 ID, 점수) 목록"""
+        with self._lock:
+            return self._entries(0, limit)
+
+    def around(self, user_id, count):
+        """유저 앞뒤로 count명씩 포함한 목록. 기록이 없으면 빈 목록"""
+        with self._lock:
+            score = self._scores.get(user_id)
+            if score is None:
+                return []
+            position = self._keys.bisect_left(_key(score, user_id))
+            return self._entries(position - count, position + count + 1)
+
+
+class LeaderboardEngine:
+    """차트별 ChartLeaderboard 모음 (프로세스 단위)"""
+
+    def __init__(self):
+        self._charts = {}
+        self._lock = threading.Lock()
+
+    def _load(self, chart_id):
+        from .models import Rank
+        entries = Rank.objects.filter(chart_id=chart_id).values_list('user_id', 'score').iterator(chunk_size=10000)
+        return ChartLeaderboard(entries)
+
+    def chart(self, chart_id):
+        """차트 리더보드 반환 (없거나 오래되었으면 Rank에서 다시 읽음)"""
+        board = self._charts.get(chart_id)
+        refresh = settings.LEADERBOARD_REFRESH_SECONDS
+        if board is None or (refresh is not None and time.monotonic() - board.loaded_at > refresh):
+            board = self._load(chart_id)
+            with self._lock:
+                self._charts[chart_id] = board
+        return board
+
+    def record(self, chart_id, user_id, score):
+        """결과 저장 후 호출 - 이미 읽어온 차트만 갱신 (아직 없으면 다음 조회 때 Rank에서 읽음)"""
+        board = self._charts.get(chart_id)
+        if board is None:
+            return False
+        return board.record(user_id, score)
+
+    def invalidate(self, chart_id=None):
+        with self._lock:
+            if chart_id is None:
+                self._charts.clear()
+            else:
+                self._charts.pop(chart_id, None)
+
+
+leaderboard_engine = LeaderboardEngine()
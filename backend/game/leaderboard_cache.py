@@ -0,0 +1,79 @@
+"""
+리더보드 응답 캐시
+
+차트/기간별로 직렬화된 리더보드(상대 경로 프로필 이미지)를 캐시하고,
+create_result에서 랭킹이 실제로 바뀌어 캐시된 상위 목록에 영향을 줄 때만 지웁니다.
+다른 프로세스의 갱신은 LEADERBOARD_CACHE_TIMEOUT이 지나면 반영됩니다 (고정된 기간은 만료 없음).
+적중/미스 횟수는 같은 캐시에 누적하므로 공유 캐시 백엔드에서는 전체 프로세스 합계가 됩니다.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+LEADERBOARD_SIZE = 10  # 곡별 리더보드(캐시 대상) 크기
+
+HITS_KEY = 'leaderboard:stats:hits'
+MISSES_KEY = 'leaderboard:stats:misses'
+
+
+def _cache_key(chart_id, period):
+    return f'leaderboard:{chart_id}:{period}'
+
+
+def _count(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:  # add와 incr 사이에 만료/삭제된 경우
+        cache.set(key, 1, None)
+
+
+def get_or_build(chart_id, period, build):
+    """캐시된 리더보드를 반환하고, 없으면 build()로 만들어 저장
+
+    build는 {'entries': [...], 'frozen': bool}을 반환해야 합니다.
+    """
+    key = _cache_key(chart_id, period)
+    payload = cache.get(key)
+    if payload is not None:
+        _count(HITS_KEY)
+        return payload
+
+    _count(MISSES_KEY)
+    payload = build()
+    cache.set(key, payload, None if payload['frozen'] else settings.LEADERBOARD_CACHE_TIMEOUT)
+    return payload
+
+
+def record_score(chart_id, user_id, score, periods):
+    """랭킹이 바뀐 기간 중 캐시된 상위 목록에 영향을 주는 것만 무효화"""
+    for period in periods:
+        key = _cache_key(chart_id, period)
+        payload = cache.get(key)
+        if payload is not None and _affects(payload['entries'], user_id, score):
+            cache.delete(key)
+
+
+def invalidate(chart_id, period):
+    """캐시된 리더보드 삭제 (끝난 기간을 스냅샷으로 고정한 뒤 호출)"""
+    cache.delete(_cache_key(chart_id, period))
+
+
+def _affects(entries, user_id, score):
+    # 목록이 가득 차지 않았거나, 이미 목록에 있거나, 마지막 순위 이상이면 상위 목록이 바뀜
+    return (
+        len(entries) < LEADERBOARD_SIZE
+        or any(entry['user']['id'] == user_id for entry in entries)
+        or score >= entries[-1]['score']
+    )
+
+
+def stats():
+    """누적 적중/미스 횟수와 적중률"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hitRatio': hits / total if total else None}
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,82 @@
+"""
+오래된 결과 보관
+
+RESULT_ARCHIVE_AFTER_DAYS보다 오래된 결과를 id 순으로 나누어 세그먼트 파일(game.result_archive)로
+옮기고 DB에서 삭제합니다. 유저의 차트별 최고 기록(Rank/userBestRecord의 기준)은 DB에 남기고,
+UserStats/ChartStat 같은 누적 통계는 그대로 둡니다 (rebuild 명령은 세그먼트도 함께 집계).
+
+세그먼트를 완성한 뒤에 DB 행을 지우므로, 중간에 중단되면 마지막 세그먼트의 행이 DB에 남을 수 있습니다.
+다음 실행 때 먼저 그 행을 지웁니다 (그 사이 조회에서는 같은 id의 DB 행을 사용).
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from game.models import Result
+from game.result_archive import FIELDS, result_archive
+
+SEGMENT_SIZE = 100000
+DELETE_BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = '오래된 결과를 열 단위 세그먼트 파일로 옮기고 DB에서 삭제합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.RESULT_ARCHIVE_AFTER_DAYS, help='이 기간(일)보다 오래된 결과를 보관',
+        )
+        parser.add_argument('--segment-size', type=int, default=SEGMENT_SIZE, help='세그먼트 하나에 넣을 최대 결과 수')
+        parser.add_argument('--dry-run', action='store_true', help='보관할 결과 수만 출력')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        cold = cold_results(cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'{cutoff.isoformat()} 이전 결과 {cold.count()}개를 보관할 수 있습니다.')
+            return
+
+        segments = result_archive.segments()
+        if segments:
+            leftover = _delete_ids(segments[-1].array('id').tolist())
+            if leftover:
+                self.stdout.write(f'이전 실행에서 지우지 못한 결과 {leftover}개를 삭제했습니다.')
+
+        archived = segment_count = 0
+        while True:
+            ids = list(cold.order_by('id').values_list('id', flat=True)[:options['segment_size']])
+            if not ids:
+                break
+            rows = []
+            for i in range(0, len(ids), DELETE_BATCH_SIZE):
+                rows += Result.objects.filter(id__in=ids[i:i + DELETE_BATCH_SIZE]).order_by('id').values_list(*FIELDS)
+            segment = result_archive.add_segment(rows)
+            _delete_ids(ids)
+            archived += len(rows)
+            segment_count += 1
+            self.stdout.write(f'{segment.path.name}: 결과 {len(rows)}개')
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'결과 {archived}개를 세그먼트 {segment_count}개로 보관했습니다. ({elapsed:.2f}s)'
+        ))
+
+
+def cold_results(cutoff):
+    """cutoff 이전 결과 중 같은 유저/차트에 더 좋은 기록(점수가 높거나, 같으면 먼저 저장된 것)이 있는 결과"""
+    better = Result.objects.filter(user=OuterRef('user'), chart=OuterRef('chart')).filter(
+        Q(score__gt=OuterRef('score')) | Q(score=OuterRef('score'), id__lt=OuterRef('id'))
+    )
+    return Result.objects.filter(playedAt__lt=cutoff).filter(Exists(better))
+
+
+def _delete_ids(ids):
+    deleted = 0
+    for i in range(0, len(ids), DELETE_BATCH_SIZE):
+        count, _ = Result.objects.filter(id__in=ids[i:i + DELETE_BATCH_SIZE]).delete()
+        deleted += count
+    return deleted
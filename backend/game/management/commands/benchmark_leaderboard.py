@@ -0,0 +1,49 @@
+"""
+메모리 리더보드 엔진 벤치마크
+
+차트 하나에 가상의 랭킹을 채운 뒤 구성, 점수 갱신, 내 순위, 상위 N명, 내 주변 N명 조회
+시간을 측정합니다. DB는 사용하지 않습니다.
+"""
+from django.core.management.base import BaseCommand
+from game.leaderboard import ChartLeaderboard
+import random
+import time
+
+
+class Command(BaseCommand):
+    help = '메모리 리더보드 엔진의 구성/갱신/조회 속도를 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ranks', type=int, default=1_000_000, help='차트 하나의 랭킹 수')
+        parser.add_argument('--operations', type=int, default=10000, help='연산별 반복 횟수')
+
+    def handle(self, *args, **options):
+        size = options['ranks']
+        operations = options['operations']
+        rng = random.Random(0)
+
+        entries = [(user_id, rng.randint(0, 1_000_000)) for user_id in range(1, size + 1)]
+        start = time.perf_counter()
+        board = ChartLeaderboard(entries)
+        build_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(f'랭킹 {size:,}개 구성: {build_ms:.1f}ms')
+
+        user_ids = [rng.randint(1, size) for _ in range(operations)]
+        new_user_ids = list(range(size + 1, size + 1 + operations // 2))
+        benchmarks = [
+            ('점수 갱신', lambda i: board.record(user_ids[i], board.score_of(user_ids[i]) + rng.randint(1, 5000))),
+            ('신규 유저 추가', lambda i: board.record(new_user_ids[i % len(new_user_ids)], rng.randint(0, 1_000_000))),
+            ('내 순위', lambda i: board.rank_of(user_ids[i])),
+            ('상위 10명', lambda i: board.top(10)),
+            ('내 주변 5명', lambda i: board.around(user_ids[i], 5)),
+        ]
+
+        self.stdout.write(f'{"연산":<12}{"평균(us)":>12}{"ops/s":>14}')
+        for name, operation in benchmarks:
+            start = time.perf_counter()
+            for i in range(operations):
+                operation(i)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{name:<12}{elapsed / operations * 1e6:>12.2f}{operations / elapsed:>14,.0f}')
+
+        self.stdout.write(self.style.SUCCESS(f'최종 랭킹 수: {len(board):,}'))
@@ -0,0 +1,75 @@
+"""
+노트 업로드 처리 속도 벤치마크
+
+notes_data 파싱, 타임라인 검증, 저장을 노트 수별로 측정하여 초당 처리 노트 수를 출력합니다.
+측정용 데이터는 트랜잭션 롤백으로 모두 제거됩니다.
+"""
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test.utils import override_settings
+from game.models import Chart
+from game.note_ingest import parse_notes
+from game.note_validator import validate_notes
+import json
+import random
+import time
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = '노트 수별 차트 노트 업로드(파싱/검증/저장) 처리 속도를 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='측정할 노트 수 목록',
+        )
+        parser.add_argument(
+            '--storage', choices=['columnar', 'rows'], nargs='+', default=['columnar', 'rows'],
+            help='측정할 노트 저장 방식',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"저장 방식":<10}{"노트 수":>10}{"파싱(ms)":>12}{"검증(ms)":>12}{"저장(ms)":>12}{"notes/s":>14}'
+        )
+        for storage in options['storage']:
+            for size in options['sizes']:
+                parse_ms, validate_ms, save_ms = self._measure(storage, self._notes_json(size))
+                rate = size / ((parse_ms + validate_ms + save_ms) / 1000)
+                self.stdout.write(
+                    f'{storage:<10}{size:>10}{parse_ms:>12.1f}{validate_ms:>12.1f}{save_ms:>12.1f}{rate:>14,.0f}'
+                )
+
+    def _notes_json(self, count):
+        notes = []
+        current = 500
+        for _ in range(count):
+            current += random.choice((0, 125, 250))
+            note_type = random.choices(['tap', 'hold'], weights=[0.8, 0.2])[0]
+            note = {'time': current, 'lane': random.randint(1, 4), 'type': note_type}
+            if note_type == 'hold':
+                note['duration'] = random.randint(300, 1000)
+            notes.append(note)
+        return json.dumps(notes)
+
+    def _measure(self, storage, notes_json):
+        with override_settings(GAME_NOTE_STORAGE=storage), transaction.atomic():
+            creator = User.objects.create_user(username='__benchmark__', nickname='__benchmark__')
+            chart = Chart.objects.create(
+                musicId='__benchmark__', title='benchmark', song='', backgroundVideo='',
+                coverUrl='', artist='benchmark', difficulty=1, creator=creator,
+            )
+
+            start = time.perf_counter()
+            notes = parse_notes(notes_json)
+            parsed = time.perf_counter()
+            validate_notes(notes, require_sorted=False)
+            validated = time.perf_counter()
+            chart.set_notes(notes)
+            saved = time.perf_counter()
+
+            transaction.set_rollback(True)
+        return (parsed - start) * 1000, (validated - parsed) * 1000, (saved - validated) * 1000
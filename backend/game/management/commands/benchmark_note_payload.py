@@ -0,0 +1,76 @@
+"""
+차트 노트 페이로드 크기 / 디코딩 시간 벤치마크
+
+기존 NoteSerializer JSON 출력과 압축 포맷(note_codec)을 비교합니다.
+"""
+from django.core.management.base import BaseCommand
+from game.models import Chart, Note
+from game.note_codec import NoteColumns, pack_notes, unpack_notes
+from game.serializers import NoteSerializer
+import gzip
+import json
+import random
+import time
+
+
+class Command(BaseCommand):
+    help = '노트 JSON 포맷과 압축 바이너리 포맷의 크기 및 디코딩 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--music-id', help='벤치마크할 차트 ID (없으면 합성 차트 사용)')
+        parser.add_argument('--notes', type=int, default=5000, help='합성 차트의 노트 수')
+        parser.add_argument('--repeat', type=int, default=20, help='디코딩 반복 횟수')
+
+    def handle(self, *args, **options):
+        if options['music_id']:
+            chart = Chart.objects.filter(musicId=options['music_id']).first()
+            if not chart:
+                self.stdout.write(self.style.ERROR(f'차트를 찾을 수 없습니다: {options["music_id"]}'))
+                return
+            notes = [
+                Note(id=index, chart_id=chart.id, **note_data)
+                for index, note_data in enumerate(chart.get_note_columns().to_dicts(), start=1)
+            ]
+        else:
+            notes = self._synthetic_notes(options['notes'])
+
+        json_body = json.dumps(NoteSerializer(notes, many=True).data).encode('utf-8')
+        columns = NoteColumns.from_rows((n.time, n.lane, n.type, n.duration) for n in notes)
+        binary_body = pack_notes(columns)
+
+        repeat = options['repeat']
+        json_ms = self._time(lambda: json.loads(json_body), repeat)
+        binary_ms = self._time(lambda: unpack_notes(binary_body), repeat)
+
+        self.stdout.write(f'노트 수: {len(notes)}')
+        self.stdout.write(f'{"포맷":<10}{"크기(B)":>12}{"gzip(B)":>12}{"디코딩(ms)":>14}')
+        for name, body, decode_ms in (('json', json_body, json_ms), ('binary', binary_body, binary_ms)):
+            self.stdout.write(
+                f'{name:<10}{len(body):>12}{len(gzip.compress(body)):>12}{decode_ms:>14.3f}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'크기 {len(json_body) / max(len(binary_body), 1):.1f}배 감소, '
+            f'디코딩 {json_ms / max(binary_ms, 1e-9):.1f}배 빠름'
+        ))
+
+    def _synthetic_notes(self, count):
+        notes = []
+        current = 500
+        for i in range(count):
+            current += random.choice((0, 125, 250, 375))
+            note_type = random.choices(['tap', 'hold'], weights=[0.8, 0.2])[0]
+            notes.append(Note(
+                id=i + 1,
+                chart_id=1,
+                time=current,
+                lane=random.randint(1, 4),
+                type=note_type,
+                duration=random.randint(300, 1000) if note_type == 'hold' else None,
+            ))
+        return notes
+
+    def _time(self, func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
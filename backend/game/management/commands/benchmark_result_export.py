@@ -0,0 +1,53 @@
+"""
+결과 내보내기 처리량 / 메모리 벤치마크
+
+export_results와 같은 생성기로 결과 전체를 형식별로 내보내며 초당 행 수를 측정하고,
+처음 1,000행만 내보낼 때와 전체를 내보낼 때의 최대 메모리(tracemalloc)를 비교합니다.
+"""
+import itertools
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from game import result_export
+
+SMALL_EXPORT_ROWS = 1000
+
+
+class Command(BaseCommand):
+    help = '결과 NDJSON/CSV 내보내기의 초당 행 수와 최대 메모리를 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', choices=tuple(result_export.TABLE_FIELDS), default=result_export.TABLE_RESULTS)
+        parser.add_argument('--chunk-size', type=int, default=result_export.CHUNK_SIZE, help='한 번에 읽고 쓰는 행 수')
+        parser.add_argument('--skip-memory', action='store_true', help='메모리 측정(느림) 생략')
+
+    def handle(self, *args, **options):
+        table, chunk_size = options['table'], options['chunk_size']
+        self.stdout.write(f'{"형식":<8}{"행 수":>12}{"크기(MB)":>12}{"시간(s)":>10}{"rows/s":>12}')
+        for output_format in result_export.FORMATS:
+            start = time.perf_counter()
+            rows, size = self._run(table, output_format, chunk_size)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{output_format:<8}{rows:>12}{size / 1e6:>12.1f}{elapsed:>10.2f}{rows / max(elapsed, 1e-9):>12,.0f}'
+            )
+
+        if options['skip_memory']:
+            return
+        self.stdout.write(f'{"형식":<8}{"행 수":>12}{"최대 메모리(KB)":>18}')
+        for output_format in result_export.FORMATS:
+            for limit in (SMALL_EXPORT_ROWS, None):
+                tracemalloc.start()
+                rows, _ = self._run(table, output_format, chunk_size, limit)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.stdout.write(f'{output_format:<8}{rows:>12}{peak / 1024:>18,.0f}')
+
+    def _run(self, table, output_format, chunk_size, limit=None):
+        """내보낸 (행 수, 문자 수). 출력은 버림"""
+        count = itertools.count()
+        rows = result_export.iter_rows(table, chunk_size=chunk_size)
+        rows = (row for row, _ in zip(itertools.islice(rows, limit), count))
+        size = sum(len(chunk) for chunk in result_export.export(table, output_format, rows, chunk_size))
+        return next(count), size
@@ -0,0 +1,68 @@
+"""
+비디오 인코딩 벤치마크 (한 번에 인코딩 vs 구간 분할 병렬 인코딩)
+
+ffmpeg의 testsrc/sine 입력으로 합성 비디오를 만든 뒤 process_video를 구간 수별로 실행하여
+단계별(probe, split, encode, concat) 소요 시간과 한 번에 인코딩할 때 대비 속도를 비교합니다.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from game.video_jobs import VIDEO_OPTIONS
+from game.video_processor import process_video
+
+STAGES = ('probe', 'split', 'encode', 'concat', 'total')
+
+
+class Command(BaseCommand):
+    help = '합성 비디오로 한 번에 인코딩과 구간 분할 병렬 인코딩의 소요 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=int, default=120, help='합성 비디오 길이 (초)')
+        parser.add_argument('--size', default='1920x1080', help='합성 비디오 해상도')
+        parser.add_argument('--segments', default='1,2,4,8', help='비교할 구간 수 목록 (1 = 한 번에 인코딩)')
+        parser.add_argument('--workers', type=int, help='동시에 실행할 ffmpeg 수 (기본 min(구간 수, CPU 수))')
+        parser.add_argument('--input', help='합성 비디오 대신 사용할 비디오 파일')
+
+    def handle(self, *args, **options):
+        if shutil.which('ffmpeg') is None:
+            raise CommandError('ffmpeg를 찾을 수 없습니다. ffmpeg가 설치되어 있고 PATH에 추가되었는지 확인하세요.')
+        segment_counts = [int(count) for count in options['segments'].split(',')]
+
+        work_dir = tempfile.mkdtemp(prefix='video-benchmark-')
+        try:
+            input_path = options['input'] or self._synthetic_video(work_dir, options['duration'], options['size'])
+            self.stdout.write(f'입력: {input_path} ({os.path.getsize(input_path) / 1e6:.1f}MB), CPU {os.cpu_count()}개')
+            self.stdout.write(f'{"구간":>6}' + ''.join(f'{stage + "(s)":>12}' for stage in STAGES) + f'{"크기(MB)":>12}{"속도":>8}')
+
+            baseline = None
+            for segments in segment_counts:
+                output_path = os.path.join(work_dir, f'output-{segments}.mp4')
+                timings = {}
+                process_video(
+                    input_path, output_path, timeout=3600, segments=segments, workers=options['workers'],
+                    min_segment_seconds=1, timings=timings, **VIDEO_OPTIONS
+                )
+                baseline = baseline or timings['total']
+                self.stdout.write(
+                    f'{segments:>6}'
+                    + ''.join(f'{timings[stage]:>12.2f}' if stage in timings else f'{"-":>12}' for stage in STAGES)
+                    + f'{os.path.getsize(output_path) / 1e6:>12.1f}{baseline / timings["total"]:>7.2f}x'
+                )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _synthetic_video(self, work_dir, duration, size):
+        """testsrc 영상 + sine 오디오 (2초마다 키프레임)"""
+        path = os.path.join(work_dir, 'input.mp4')
+        self.stdout.write(f'합성 비디오 생성 중 ({size}, {duration}초)...')
+        subprocess.run([
+            'ffmpeg', '-v', 'error',
+            '-f', 'lavfi', '-i', f'testsrc=duration={duration}:size={size}:rate=30',
+            '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60', '-c:a', 'aac', '-shortest',
+            '-y', path,
+        ], check=True)
+        return path
@@ -3,7 +3,9 @@ girlfriend.mp4 차트 생성 스크립트
 """
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
-from game.models import Chart, Note
+from game.models import Chart
+from game.note_codec import NoteColumns
+from game.note_validator import validate_notes
 from ulid import ULID
 import json
 import os
@@ -53,6 +55,15 @@ class Command(BaseCommand):
         self.stdout.write(f'BPM: {bpm}')
         self.stdout.write(f'총 노트 수: {len(notes_data)}')
 
+        # 노트 타임라인 검증 (저장 시 정렬되므로 정렬 여부는 제외)
+        notes = NoteColumns.from_notes(notes_data)
+        report = validate_notes(notes, require_sorted=False)
+        if not report.is_valid:
+            self.stdout.write(self.style.ERROR('노트 데이터 검증 실패:'))
+            for message in report.messages():
+                self.stdout.write(f'  - {message}')
+            return
+
         # 차트 생성
         music_id = str(ULID())
         
@@ -71,21 +82,10 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f'차트 생성 완료: {chart.musicId}'))
 
-        # 노트 생성
-        notes_to_create = []
-        for note_data in notes_data:
-            notes_to_create.append(Note(
-                chart=chart,
-                time=note_data['time'],
-                lane=note_data['lane'],
-                type=note_data['type'],
-                duration=note_data.get('duration')
-            ))
-
-        # bulk_create로 한번에 생성
-        Note.objects.bulk_create(notes_to_create)
+        # 노트 생성 (차트 노트 저장 방식에 맞춰 한번에 저장)
+        chart.set_notes(notes)
 
-        self.stdout.write(self.style.SUCCESS(f'노트 {len(notes_to_create)}개 생성 완료!'))
+        self.stdout.write(self.style.SUCCESS(f'노트 {chart.noteCount}개 생성 완료!'))
         
         # 커버 이미지 생성 (비디오 첫 프레임)
         try:
@@ -112,5 +112,5 @@ class Command(BaseCommand):
         self.stdout.write(f'  Artist: {chart.artist}')
         self.stdout.write(f'  BPM: {chart.bpm}')
         self.stdout.write(f'  Difficulty: {chart.difficulty}')
-        self.stdout.write(f'  Notes: {len(notes_to_create)}개')
+        self.stdout.write(f'  Notes: {chart.noteCount}개')
         self.stdout.write('='*50)
@@ -1,6 +1,10 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db.models import Sum
 from game.models import Chart, Note, Rank, Result
+from game.note_codec import NoteColumns
+from game.note_validator import validate_notes
 from datetime import datetime, timedelta
 import random
 
@@ -134,19 +138,21 @@ class Command(BaseCommand):
             # 난이도에 따라 노트 밀도 조정
             time_interval = max(200, 1000 - (chart.difficulty * 50))
             
+            notes = []
             for i in range(note_count):
-                time = i * time_interval + random.randint(-50, 50)
+                time = max(0, i * time_interval + random.randint(-50, 50))
                 lane = random.randint(0, lanes - 1)
                 note_type = random.choices(['tap', 'hold'], weights=[0.8, 0.2])[0]
-                duration = random.randint(300, 1000) if note_type == 'hold' else None
-                
-                Note.objects.create(
-                    chart=chart,
-                    time=time,
-                    lane=lane,
-                    type=note_type,
-                    duration=duration
-                )
+                # 같은 라인의 다음 노트와 겹치지 않도록 홀드 길이 제한
+                duration = random.randint(min(300, time_interval // 2), time_interval - 100) if note_type == 'hold' else None
+                notes.append((time, lane, note_type, duration))
+            
+            notes = NoteColumns.from_rows(notes)
+            report = validate_notes(notes, require_sorted=False)
+            if not report.is_valid:
+                self.stdout.write(self.style.WARNING(f'  - {chart.title}: 노트 검증 실패, 건너뜀 ({"; ".join(report.messages())})'))
+                continue
+            chart.set_notes(notes)
             
             self.stdout.write(f'  ✓ {chart.title}: {note_count}개의 노트 생성')
 
@@ -199,7 +205,7 @@ class Command(BaseCommand):
                     rank = 'F'
                 
                 # 판정 수 생성
-                total_notes = Note.objects.filter(chart=chart).count()
+                total_notes = chart.noteCount
                 perfect = int(total_notes * random.uniform(0.6, 0.95))
                 great = int((total_notes - perfect) * random.uniform(0.5, 0.8))
                 good = int((total_notes - perfect - great) * random.uniform(0.3, 0.7))
@@ -249,10 +255,18 @@ class Command(BaseCommand):
         total_results = Result.objects.count()
         self.stdout.write(f'  ✓ 총 {total_results}개의 게임 결과 생성')
 
+        # 랭킹/결과를 직접 만들었으므로 전체 레이팅, 유저 통계, 차트 통계 재계산
+        self.stdout.write('\n전체 레이팅을 계산합니다...')
+        call_command('rebuild_player_ratings', stdout=self.stdout)
+        self.stdout.write('\n유저 통계를 계산합니다...')
+        call_command('rebuild_user_stats', stdout=self.stdout)
+        self.stdout.write('\n차트 통계를 계산합니다...')
+        call_command('rebuild_chart_stats', stdout=self.stdout)
+
         # 요약 정보 출력
         self.stdout.write(self.style.SUCCESS('\n✅ 목데이터 생성 완료!'))
         self.stdout.write(f'   - 차트: {Chart.objects.count()}개')
-        self.stdout.write(f'   - 노트: {Note.objects.count()}개')
+        self.stdout.write(f'   - 노트: {Chart.objects.aggregate(total=Sum("noteCount"))["total"] or 0}개')
         self.stdout.write(f'   - 랭킹: {Rank.objects.count()}개')
         self.stdout.write(f'   - 결과: {Result.objects.count()}개')
         
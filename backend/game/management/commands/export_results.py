@@ -0,0 +1,59 @@
+"""
+결과 / 랭킹 내보내기
+
+GET /results/export/ 와 같은 형식(NDJSON, CSV)으로 파일 또는 표준 출력에 씁니다.
+행을 chunk 단위로 읽어 바로 쓰므로 행 수와 관계없이 메모리 사용량이 일정합니다.
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from game import result_export
+from game.models import Chart
+
+
+class Command(BaseCommand):
+    help = '결과 또는 랭킹을 NDJSON/CSV로 내보냅니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', choices=tuple(result_export.TABLE_FIELDS), default=result_export.TABLE_RESULTS)
+        parser.add_argument('--format', choices=result_export.FORMATS, default=result_export.FORMAT_NDJSON)
+        parser.add_argument('--chart', help='이 차트(musicId)의 행만')
+        parser.add_argument('--user', type=int, help='이 유저 ID의 행만')
+        parser.add_argument('--since', help='이 일시(YYYY-MM-DD 또는 ISO 8601) 이후 플레이한 결과만')
+        parser.add_argument('--output', '-o', help='저장할 파일 경로 (없으면 표준 출력)')
+        parser.add_argument('--chunk-size', type=int, default=result_export.CHUNK_SIZE, help='한 번에 읽고 쓰는 행 수')
+
+    def handle(self, *args, **options):
+        try:
+            since = result_export.parse_since(options['since'])
+        except result_export.ExportError as e:
+            raise CommandError(str(e))
+        chart_id = None
+        if options['chart']:
+            chart_id = Chart.objects.filter(musicId=options['chart']).values_list('id', flat=True).first()
+            if chart_id is None:
+                raise CommandError(f'차트를 찾을 수 없습니다: {options["chart"]}')
+
+        start = time.perf_counter()
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        table, chunk_size = options['table'], options['chunk_size']
+        rows = counted(result_export.iter_rows(table, chart_id, options['user'], since, chunk_size))
+        chunks = result_export.export(table, options['format'], rows, chunk_size)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+                file.writelines(chunks)
+        else:
+            sys.stdout.writelines(chunks)
+
+        elapsed = time.perf_counter() - start
+        self.stderr.write(self.style.SUCCESS(
+            f'{table} {count}행을 내보냈습니다. ({elapsed:.2f}s, {count / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
@@ -0,0 +1,19 @@
+"""
+결과 저널 저장
+
+write-behind 큐 모드에서 저장되지 못하고 종료된 프로세스의 저널에 남은 결과를 바로 저장합니다.
+실행 중인 서버 프로세스가 잠근 저널은 건너뜁니다 (서버는 시작할 때 이런 저널을 직접 가져가서 저장합니다).
+"""
+from django.core.management.base import BaseCommand
+from game.result_queue import result_queue
+
+
+class Command(BaseCommand):
+    help = '결과 저널에 남은(ack되지 않은) 결과를 저장합니다.'
+
+    def handle(self, *args, **options):
+        count = result_queue.flush_pending()
+        stats = result_queue.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'저널의 결과 {count}개 처리: 저장 {stats["flushed"]}개, 실패 {stats["failed"]}개'
+        ))
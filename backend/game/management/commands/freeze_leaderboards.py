@@ -0,0 +1,45 @@
+"""
+끝난 기간의 리더보드 고정
+
+현재 주/월이 아닌 기간의 PeriodRank를 차트별 상위 랭킹 스냅샷(LeaderboardSnapshot)으로 저장하고,
+해당 기간의 PeriodRank 행은 삭제합니다. 스냅샷은 바뀌지 않으므로 응답을 영구 캐시할 수 있습니다.
+캐시된 기간 리더보드는 지우므로 공유 캐시 백엔드에서는 바로, 프로세스별 캐시에서는
+LEADERBOARD_CACHE_TIMEOUT이 지나면 스냅샷 응답으로 바뀝니다.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from game import leaderboard_cache
+from game.models import LeaderboardSnapshot, PeriodRank, TOP_RANK_LIMIT, period_keys
+from game.serializers import RankSerializer
+
+
+class Command(BaseCommand):
+    help = '끝난 주/월 기간의 리더보드를 스냅샷으로 고정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-rows', action='store_true', help='고정한 기간의 PeriodRank 행을 삭제하지 않습니다')
+
+    def handle(self, *args, **options):
+        current = set(period_keys().values())
+        finished = (
+            PeriodRank.objects.exclude(period__in=current)
+            .values_list('chart_id', 'period')
+            .distinct()
+            .order_by('period', 'chart_id')
+        )
+
+        frozen = 0
+        for chart_id, period in list(finished):
+            with transaction.atomic():
+                ranks = PeriodRank.objects.filter(chart_id=chart_id, period=period)
+                top = ranks.select_related('user').order_by('-score', 'user')[:TOP_RANK_LIMIT]
+                _, created = LeaderboardSnapshot.objects.get_or_create(
+                    chart_id=chart_id, period=period,
+                    defaults={'entries': RankSerializer(top, many=True).data},
+                )
+                if not options['keep_rows']:
+                    ranks.delete()
+            leaderboard_cache.invalidate(chart_id, period)
+            frozen += created
+
+        self.stdout.write(self.style.SUCCESS(f'리더보드 {frozen}개를 고정했습니다.'))
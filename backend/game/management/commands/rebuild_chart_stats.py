@@ -0,0 +1,61 @@
+"""
+차트 통계 재계산
+
+Result 테이블을 id 순으로 나누어 읽고, 묶음마다 NumPy로 차트/구간별 값을 한 번에 집계하여
+ChartStat 테이블을 새로 만듭니다. 결과를 직접 수정/삭제했거나 구간 정의를 바꾼 뒤 사용합니다.
+archive_results로 옮긴 결과도 세그먼트마다 같은 방식으로 더합니다.
+"""
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from game.chart_stats import RESULT_FIELDS, bucket_totals
+from game.models import ChartStat, Result
+from game.result_archive import result_archive
+import time
+
+CHUNK_SIZE = 50000
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Result 테이블로부터 차트 통계(ChartStat)를 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='한 번에 읽어 집계할 결과 수')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        totals = Counter()
+        result_count = 0
+        last_id = 0
+        while True:
+            rows = list(
+                Result.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', *RESULT_FIELDS)[:options['chunk_size']]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            result_count += len(rows)
+            totals.update(bucket_totals([row[1:] for row in rows]))
+
+        for columns in result_archive.iter_values(RESULT_FIELDS):
+            rows = list(zip(*(columns[field] for field in RESULT_FIELDS)))
+            result_count += len(rows)
+            totals.update(bucket_totals(rows))
+
+        with transaction.atomic():
+            ChartStat.objects.all().delete()
+            ChartStat.objects.bulk_create(
+                (
+                    ChartStat(chart_id=chart_id, metric=metric, bin=bin_number, value=value)
+                    for (chart_id, metric, bin_number), value in totals.items()
+                ),
+                batch_size=BATCH_SIZE,
+            )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'결과 {result_count}개로 차트 통계 {len(totals)}개 구간을 다시 계산했습니다. ({elapsed:.2f}s)'
+        ))
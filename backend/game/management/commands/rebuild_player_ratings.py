@@ -0,0 +1,38 @@
+"""
+전체 레이팅 재계산
+
+Rank 테이블 전체를 유저별로 한 번에 집계하여 PlayerRating 테이블을 새로 만듭니다.
+차트 난이도가 바뀌거나 차트가 삭제된 뒤 레이팅을 맞출 때 사용합니다.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from game.models import PlayerRating, Rank
+import time
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Rank 테이블로부터 전체 레이팅(PlayerRating)을 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        totals = (
+            Rank.objects.values('user')
+            .annotate(rating=Sum(F('score') * F('chart__difficulty')), chartCount=Count('id'))
+            .order_by()
+        )
+
+        with transaction.atomic():
+            PlayerRating.objects.all().delete()
+            ratings = PlayerRating.objects.bulk_create(
+                (
+                    PlayerRating(user_id=row['user'], rating=row['rating'], chartCount=row['chartCount'])
+                    for row in totals.iterator()
+                ),
+                batch_size=BATCH_SIZE,
+            )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'유저 {len(ratings)}명의 레이팅을 다시 계산했습니다. ({elapsed:.2f}s)'))
@@ -0,0 +1,83 @@
+"""
+유저 통계 재계산
+
+Result 테이블 전체를 유저별로 한 번에 집계하여 UserStats 테이블을 새로 만듭니다.
+결과를 직접 수정/삭제했거나 UserStats 도입 전 기록을 반영할 때 사용합니다.
+archive_results로 옮긴 결과도 세그먼트마다 NumPy로 집계하여 더합니다.
+"""
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from game.models import Result, UserStats
+from game.result_archive import result_archive
+import time
+
+ARCHIVE_FIELDS = ('user_id', 'perfect', 'isFullCombo', 'isAllPerfect', 'score', 'maxCombo')
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Result 테이블로부터 유저 통계(UserStats)를 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        totals = (
+            Result.objects.values('user')
+            .annotate(
+                playCount=Count('id'),
+                perfectCount=Sum('perfect'),
+                fullComboCount=Count('id', filter=Q(isFullCombo=True)),
+                allPerfectCount=Count('id', filter=Q(isAllPerfect=True)),
+                highestScore=Max('score'),
+                maxCombo=Max('maxCombo'),
+            )
+            .order_by()
+        )
+
+        stats = {row.pop('user'): row for row in totals.iterator()}
+        for columns in result_archive.iter_values(ARCHIVE_FIELDS):
+            for user_id, row in _archive_totals(columns):
+                _merge(stats, user_id, row)
+
+        with transaction.atomic():
+            UserStats.objects.all().delete()
+            UserStats.objects.bulk_create(
+                (UserStats(user_id=user_id, **row) for user_id, row in stats.items()),
+                batch_size=BATCH_SIZE,
+            )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'유저 {len(stats)}명의 통계를 다시 계산했습니다. ({elapsed:.2f}s)'))
+
+
+def _archive_totals(columns):
+    """세그먼트 열 값을 유저별 (유저 ID, 통계) 목록으로 집계"""
+    users, index = np.unique(np.asarray(columns['user_id'], dtype=np.int64), return_inverse=True)
+    highest = np.zeros(len(users), dtype=np.int64)
+    max_combo = np.zeros(len(users), dtype=np.int64)
+    np.maximum.at(highest, index, np.asarray(columns['score'], dtype=np.int64))
+    np.maximum.at(max_combo, index, np.asarray(columns['maxCombo'], dtype=np.int64))
+    counts = {
+        'playCount': np.bincount(index, minlength=len(users)),
+        'perfectCount': np.bincount(index, weights=columns['perfect'], minlength=len(users)),
+        'fullComboCount': np.bincount(index, weights=columns['isFullCombo'], minlength=len(users)),
+        'allPerfectCount': np.bincount(index, weights=columns['isAllPerfect'], minlength=len(users)),
+        'highestScore': highest,
+        'maxCombo': max_combo,
+    }
+    counts = {name: values.astype(np.int64).tolist() for name, values in counts.items()}
+    for i, user_id in enumerate(users.tolist()):
+        yield user_id, {name: values[i] for name, values in counts.items()}
+
+
+def _merge(stats, user_id, row):
+    current = stats.get(user_id)
+    if current is None:
+        stats[user_id] = row
+        return
+    for name in ('playCount', 'perfectCount', 'fullComboCount', 'allPerfectCount'):
+        current[name] += row[name]
+    for name in ('highestScore', 'maxCombo'):
+        current[name] = max(current[name], row[name])
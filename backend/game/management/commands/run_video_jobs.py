@@ -0,0 +1,27 @@
+"""
+차트 비디오 처리 워커
+
+VideoJob 테이블의 작업을 처리합니다. 서버 프로세스 안의 워커를 끄고(VIDEO_JOB_WORKERS = 0)
+별도 프로세스로 비디오를 처리할 때, 또는 --once로 밀린 작업을 바로 처리할 때 사용합니다.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from game.video_jobs import video_job_runner
+
+
+class Command(BaseCommand):
+    help = '차트 비디오 처리 작업(VideoJob)을 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=max(settings.VIDEO_JOB_WORKERS, 1), help='동시에 처리할 작업 수')
+        parser.add_argument('--once', action='store_true', help='지금 실행할 수 있는 작업만 처리하고 종료')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = video_job_runner.run_pending()
+            self.stdout.write(self.style.SUCCESS(f'비디오 작업 {count}개를 처리했습니다.'))
+            return
+
+        self.stdout.write(f'비디오 작업 워커 {options["workers"]}개를 시작합니다.')
+        video_job_runner.start(options['workers'])
+        video_job_runner.join()
@@ -0,0 +1,78 @@
+"""
+업로드 파일 저장
+
+업로드된 파일은 디스크에 한 번만 씁니다.
+- FILE_UPLOAD_MAX_MEMORY_SIZE보다 큰 업로드는 Django가 요청을 읽으면서 이미 임시 파일로 받아 두었으므로
+  다시 쓰지 않고 이름만 바꿔 옮깁니다 (다른 파일 시스템이면 커널 안에서 복사).
+- 작은 업로드는 메모리에 있는 내용을 청크 단위로 한 번 씁니다.
+
+같은 내용이 필요한 두 번째 경로(예: 음원 파일과 비디오 처리용 원본)는 파일을 다시 읽지 않고
+하드 링크 → reflink → 커널 복사(sendfile) 순서로 만듭니다.
+"""
+import os
+import shutil
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+FICLONE = 0x40049409  # linux/fs.h: 데이터 블록을 공유하는 복사 (btrfs, xfs 등에서 지원)
+
+
+def save_upload(uploaded_file, path):
+    """업로드 파일을 path에 저장
+
+    Returns:
+        str: 'move'(임시 파일 이동), 'copy'(다른 파일 시스템의 임시 파일 복사), 'write'(메모리 업로드 쓰기)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        source = uploaded_file.temporary_file_path()
+        try:
+            # 옮긴 뒤 Django가 임시 파일을 지우지 못해도(FileNotFoundError) 업로드 파일 close에서 무시됨
+            os.replace(source, path)
+            method = 'move'
+        except OSError:
+            shutil.copyfile(source, path)
+            method = 'copy'
+        # 임시 파일은 0600으로 만들어지므로 정적 파일 서버가 읽을 수 있도록 권한 변경
+        if settings.FILE_UPLOAD_PERMISSIONS is not None:
+            os.chmod(path, settings.FILE_UPLOAD_PERMISSIONS)
+        return method
+
+    with open(path, 'wb') as f:
+        for chunk in uploaded_file.chunks():
+            f.write(chunk)
+    return 'write'
+
+
+def link_or_copy(source, target):
+    """source와 같은 내용의 파일을 target에 만듦 (target이 있으면 덮어씀)
+
+    하드 링크는 두 경로가 같은 데이터를 공유하므로, 어느 쪽도 제자리에서 수정하지 않는 파일에만 사용합니다
+    (ffmpeg 출력은 항상 새 파일로 씀).
+
+    Returns:
+        str: 'link', 'reflink' 또는 'copy'.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+        return 'link'
+    except OSError:  # 다른 파일 시스템, 하드 링크를 지원하지 않는 파일 시스템
+        pass
+    if fcntl is not None:
+        try:
+            with open(source, 'rb') as src, open(target, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return 'reflink'
+        except OSError:
+            pass
+    # Linux에서는 os.sendfile로 사용자 공간 버퍼 없이 복사
+    shutil.copyfile(source, target)
+    return 'copy'
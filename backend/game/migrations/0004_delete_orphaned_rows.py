@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:10
+
+from django.db import migrations
+
+
+def delete_orphaned_rows(apps, schema_editor):
+    """삭제된 차트를 가리키는 노트(Note), 결과(Result), 랭킹(Rank) 행 삭제
+
+    외래 키 검사 없이 차트만 지워진 SQLite 데이터베이스에는 이런 행이 남아 있어,
+    다음 마이그레이션(0005)이 테이블을 다시 만든 뒤 하는 외래 키 검사가 실패합니다.
+    가리키는 차트가 없어 어떤 API로도 조회되지 않는 행만 지우며, 되돌릴 수 없습니다.
+    """
+    chart_ids = apps.get_model('game', 'Chart').objects.values('id')
+    for model_name in ('Note', 'Result', 'Rank'):
+        apps.get_model('game', model_name).objects.exclude(chart_id__in=chart_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_alter_chart_song'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_orphaned_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:14
+
+import struct
+
+import numpy as np
+from django.db import migrations, models
+
+# 이 마이그레이션 시점의 노트 블록 형식 (game.note_codec이 바뀌어도 같은 데이터를 쓰고 읽도록 고정)
+# "SNT1", uint32 n, int32[n] time 델타, int32[n] duration (-1 = 없음), uint8[n] lane, uint8[n] type (0 tap, 1 hold)
+NOTE_BLOCK_MAGIC = b'SNT1'
+NOTE_TYPES = ('tap', 'hold')
+NO_DURATION = -1
+HEADER = struct.Struct('<4sI')
+
+
+def pack_notes(rows):
+    """(time, lane, type, duration) 행 목록(시간, id 순)을 노트 블록으로 인코딩"""
+    rows = list(rows)
+    time = np.array([row[0] for row in rows], dtype=np.int64)
+    deltas = np.diff(time, prepend=0)
+    duration = np.array([NO_DURATION if row[3] is None else row[3] for row in rows], dtype=np.int64)
+    for name, values in (('time', deltas), ('duration', duration)):
+        if len(values) and (values.min() < -2 ** 31 or values.max() > 2 ** 31 - 1):
+            raise ValueError(f'노트 {name} 값이 int32 범위를 벗어납니다.')
+    return b''.join((
+        HEADER.pack(NOTE_BLOCK_MAGIC, len(rows)),
+        deltas.astype('<i4').tobytes(),
+        duration.astype('<i4').tobytes(),
+        np.array([row[1] for row in rows], dtype=np.int64).astype('u1').tobytes(),
+        np.array([row[2] == 'hold' for row in rows], dtype=np.uint8).tobytes(),
+    ))
+
+
+def unpack_notes(buffer):
+    """노트 블록을 Note 필드 dict 목록으로 디코딩"""
+    buffer = bytes(buffer)
+    magic, count = HEADER.unpack_from(buffer, 0)
+    if magic != NOTE_BLOCK_MAGIC:
+        raise ValueError('올바른 노트 블록이 아닙니다.')
+    offset = HEADER.size
+    time = np.cumsum(np.frombuffer(buffer, dtype='<i4', count=count, offset=offset), dtype=np.int64)
+    duration = np.frombuffer(buffer, dtype='<i4', count=count, offset=offset + 4 * count)
+    lane = np.frombuffer(buffer, dtype='u1', count=count, offset=offset + 8 * count)
+    note_type = np.frombuffer(buffer, dtype='u1', count=count, offset=offset + 9 * count)
+    return [
+        {'time': t, 'lane': l, 'type': NOTE_TYPES[k], 'duration': None if d == NO_DURATION else d}
+        for t, l, k, d in zip(time.tolist(), lane.tolist(), note_type.tolist(), duration.tolist())
+    ]
+
+
+def notes_to_columns(apps, schema_editor):
+    """기존 Note 행을 차트별 노트 블록으로 변환"""
+    Chart = apps.get_model('game', 'Chart')
+    Note = apps.get_model('game', 'Note')
+    for chart in Chart.objects.all():
+        rows = list(
+            Note.objects.filter(chart=chart).order_by('time', 'id').values_list('time', 'lane', 'type', 'duration')
+        )
+        chart.notesData = pack_notes(rows)
+        chart.noteCount = len(rows)
+        chart.save(update_fields=['notesData', 'noteCount'])
+        Note.objects.filter(chart=chart).delete()
+
+
+def columns_to_notes(apps, schema_editor):
+    """노트 블록을 다시 Note 행으로 풀어서 저장"""
+    Chart = apps.get_model('game', 'Chart')
+    Note = apps.get_model('game', 'Note')
+    for chart in Chart.objects.exclude(notesData=None):
+        Note.objects.bulk_create(Note(chart=chart, **note_data) for note_data in unpack_notes(chart.notesData))
+        chart.notesData = None
+        chart.save(update_fields=['notesData'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_delete_orphaned_rows'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chart',
+            name='noteCount',
+            field=models.IntegerField(default=0, help_text='노트 수'),
+        ),
+        migrations.AddField(
+            model_name='chart',
+            name='notesData',
+            field=models.BinaryField(blank=True, help_text='열 단위로 인코딩된 노트 (note_codec 노트 블록)', null=True),
+        ),
+        migrations.RunPython(notes_to_columns, columns_to_notes),
+    ]
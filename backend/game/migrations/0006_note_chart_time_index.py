@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0005_chart_notes_data'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['chart', 'time'], name='game_note_chart_i_f82ea7_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0006_note_chart_time_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chart',
+            name='revision',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='차트 내용 버전 (메타데이터/노트 변경 시 증가)'),
+        ),
+    ]
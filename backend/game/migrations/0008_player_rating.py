@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def build_ratings(apps, schema_editor):
+    """기존 Rank로 PlayerRating 채우기 (rebuild_player_ratings와 같은 집계)"""
+    PlayerRating = apps.get_model('game', 'PlayerRating')
+    Rank = apps.get_model('game', 'Rank')
+    totals = (
+        Rank.objects.values('user')
+        .annotate(rating=Sum(F('score') * F('chart__difficulty')), chartCount=Count('id'))
+        .order_by()
+    )
+    PlayerRating.objects.bulk_create(
+        (
+            PlayerRating(user_id=row['user'], rating=row['rating'], chartCount=row['chartCount'])
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_profileimage'),
+        ('game', '0007_chart_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerRating',
+            fields=[
+                ('user', models.OneToOneField(help_text='레이팅 대상 유저', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='playerRating', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating', models.BigIntegerField(default=0, help_text='레이팅 (차트별 최고 점수 x 난이도의 합)')),
+                ('chartCount', models.IntegerField(default=0, help_text='기록이 있는 차트 수')),
+                ('updatedAt', models.DateTimeField(auto_now=True, help_text='마지막 갱신 시간')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-rating', 'user'], name='game_rating_order_idx')],
+            },
+        ),
+        migrations.RunPython(build_ratings, migrations.RunPython.noop),
+    ]
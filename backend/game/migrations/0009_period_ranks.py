@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_player_rating'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(help_text='기간 키 (예: 2026-W42, 2026-10)', max_length=10)),
+                ('entries', models.JSONField(help_text='직렬화된 상위 랭킹 목록')),
+                ('frozenAt', models.DateTimeField(auto_now_add=True, help_text='고정된 시간')),
+                ('chart', models.ForeignKey(help_text='리더보드가 속한 차트', on_delete=django.db.models.deletion.CASCADE, related_name='leaderboardSnapshots', to='game.chart')),
+            ],
+            options={
+                'unique_together': {('chart', 'period')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(help_text='기간 키 (예: 2026-W42, 2026-10)', max_length=10)),
+                ('score', models.IntegerField(help_text='기간 내 최고 점수')),
+                ('chart', models.ForeignKey(help_text='랭킹이 속한 차트', on_delete=django.db.models.deletion.CASCADE, related_name='periodRanks', to='game.chart')),
+                ('user', models.ForeignKey(help_text='랭킹을 기록한 사용자', on_delete=django.db.models.deletion.CASCADE, related_name='periodRanks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['chart', 'period', '-score'], name='game_periodrank_order_idx')],
+                'unique_together': {('chart', 'period', 'user')},
+            },
+        ),
+    ]
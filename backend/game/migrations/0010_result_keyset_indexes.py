@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0009_period_ranks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['user', '-playedAt', '-id'], name='game_result_user_played_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['chart', '-score', '-id'], name='game_result_chart_score_idx'),
+        ),
+    ]
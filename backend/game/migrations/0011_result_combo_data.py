@@ -0,0 +1,85 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+from game.combo_codec import ComboParseError, decode_combo, encode_combo
+
+BATCH_SIZE = 1000
+
+
+def _encode_lenient(text):
+    # 500자 제한으로 잘린 기존 문자열은 형식이 맞는 구간만 남김
+    try:
+        return encode_combo(text)
+    except ComboParseError:
+        valid = []
+        for segment in text.split(','):
+            try:
+                encode_combo(segment)
+            except ComboParseError:
+                continue
+            valid.append(segment)
+        return encode_combo(','.join(valid))
+
+
+def combo_to_data(apps, schema_editor):
+    """콤보 문자열을 comboData/maxCombo로 변환"""
+    Result = apps.get_model('game', 'Result')
+    results = []
+    for result in Result.objects.only('id', 'combo').iterator(chunk_size=BATCH_SIZE):
+        result.comboData, result.maxCombo = _encode_lenient(result.combo)
+        results.append(result)
+        if len(results) >= BATCH_SIZE:
+            Result.objects.bulk_update(results, ['comboData', 'maxCombo'])
+            results = []
+    Result.objects.bulk_update(results, ['comboData', 'maxCombo'])
+
+
+def data_to_combo(apps, schema_editor):
+    """comboData를 다시 콤보 문자열로 변환"""
+    Result = apps.get_model('game', 'Result')
+    results = []
+    for result in Result.objects.only('id', 'comboData').iterator(chunk_size=BATCH_SIZE):
+        result.combo = decode_combo(bytes(result.comboData))
+        results.append(result)
+        if len(results) >= BATCH_SIZE:
+            Result.objects.bulk_update(results, ['combo'])
+            results = []
+    Result.objects.bulk_update(results, ['combo'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0010_result_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='comboData',
+            field=models.BinaryField(default=b'', help_text='콤보 구간 기록 (combo_codec 인코딩)'),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='maxCombo',
+            field=models.IntegerField(default=0, help_text='최대 콤보'),
+        ),
+        migrations.RunPython(combo_to_data, data_to_combo),
+        # 되돌릴 때 빈 값으로 다시 추가한 뒤 data_to_combo로 채우도록 기본값 지정
+        migrations.AlterField(
+            model_name='result',
+            name='combo',
+            field=models.CharField(default='', help_text='콤보 기록 (문자열)', max_length=500),
+        ),
+        migrations.RemoveField(
+            model_name='result',
+            name='combo',
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['chart', '-maxCombo', '-id'], name='game_result_chart_combo_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0011_result_combo_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='verifiedScore',
+            field=models.IntegerField(blank=True, help_text='입력 기록으로 다시 계산한 점수 (입력 기록이 없으면 null)', null=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def build_user_stats(apps, schema_editor):
+    """기존 Result로 UserStats 채우기 (rebuild_user_stats와 같은 집계)"""
+    Result = apps.get_model('game', 'Result')
+    UserStats = apps.get_model('game', 'UserStats')
+    totals = (
+        Result.objects.values('user')
+        .annotate(
+            playCount=Count('id'),
+            perfectCount=Sum('perfect'),
+            fullComboCount=Count('id', filter=Q(isFullCombo=True)),
+            allPerfectCount=Count('id', filter=Q(isAllPerfect=True)),
+            highestScore=Max('score'),
+            maxCombo=Max('maxCombo'),
+        )
+        .order_by()
+    )
+    UserStats.objects.bulk_create(
+        (UserStats(user_id=row.pop('user'), **row) for row in totals.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_profileimage'),
+        ('game', '0012_result_verified_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(help_text='통계 대상 유저', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='gameStats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('playCount', models.IntegerField(default=0, help_text='플레이 횟수')),
+                ('perfectCount', models.IntegerField(default=0, help_text='퍼펙트 판정 수 합계')),
+                ('fullComboCount', models.IntegerField(default=0, help_text='풀콤보 횟수')),
+                ('allPerfectCount', models.IntegerField(default=0, help_text='올 퍼펙트 횟수')),
+                ('highestScore', models.IntegerField(default=0, help_text='최고 점수')),
+                ('maxCombo', models.IntegerField(default=0, help_text='최대 콤보')),
+                ('updatedAt', models.DateTimeField(auto_now=True, help_text='마지막 갱신 시간')),
+            ],
+        ),
+        migrations.RunPython(build_user_stats, migrations.RunPython.noop),
+    ]
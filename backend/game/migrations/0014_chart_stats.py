@@ -0,0 +1,61 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:46
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+
+from game.chart_stats import RESULT_FIELDS, bucket_totals
+
+
+def build_chart_stats(apps, schema_editor):
+    """기존 Result로 ChartStat 채우기 (rebuild_chart_stats와 같은 집계)"""
+    ChartStat = apps.get_model('game', 'ChartStat')
+    Result = apps.get_model('game', 'Result')
+    totals = Counter()
+    last_id = 0
+    while True:
+        rows = list(
+            Result.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', *RESULT_FIELDS)[:50000]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        totals.update(bucket_totals([row[1:] for row in rows]))
+    ChartStat.objects.bulk_create(
+        (
+            ChartStat(chart_id=chart_id, metric=metric, bin=bin_number, value=value)
+            for (chart_id, metric, bin_number), value in totals.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0013_user_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='laneStats',
+            field=models.JSONField(blank=True, help_text='입력 기록으로 계산한 레인별 [노트 수, miss 수] (입력 기록이 없으면 null)', null=True),
+        ),
+        migrations.CreateModel(
+            name='ChartStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(help_text='통계 종류 (score, accuracy, judgement 등)', max_length=20)),
+                ('bin', models.SmallIntegerField(help_text='구간 번호')),
+                ('value', models.BigIntegerField(default=0, help_text='구간 값')),
+                ('chart', models.ForeignKey(help_text='통계 대상 차트', on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='game.chart')),
+            ],
+            options={
+                'unique_together': {('chart', 'metric', 'bin')},
+            },
+        ),
+        migrations.RunPython(build_chart_stats, migrations.RunPython.noop),
+    ]
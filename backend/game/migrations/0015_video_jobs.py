@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-18 08:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0014_chart_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chart',
+            name='videoStatus',
+            field=models.CharField(choices=[('processing', 'Processing'), ('ready', 'Ready')], default='ready', help_text='배경 비디오 처리 상태 (processing이면 backgroundVideo가 아직 없음)', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='VideoJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', help_text='작업 상태', max_length=10)),
+                ('inputPath', models.CharField(help_text='원본 비디오 경로 (MEDIA_ROOT 기준, 작업이 끝나면 삭제)', max_length=500)),
+                ('outputPath', models.CharField(help_text='처리된 비디오 경로 (MEDIA_ROOT 기준)', max_length=500)),
+                ('progress', models.FloatField(default=0, help_text='진행률 (0~1)')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='실행한 횟수')),
+                ('error', models.TextField(blank=True, default='', help_text='마지막 실패 사유')),
+                ('runAfter', models.DateTimeField(default=django.utils.timezone.now, help_text='이 시간 이후에 실행 (재시도 대기)')),
+                ('startedAt', models.DateTimeField(blank=True, help_text='마지막 실행 시작 시간', null=True)),
+                ('finishedAt', models.DateTimeField(blank=True, help_text='완료 시간', null=True)),
+                ('createdAt', models.DateTimeField(auto_now_add=True, help_text='생성 시간')),
+                ('chart', models.OneToOneField(help_text='비디오를 처리할 차트', on_delete=django.db.models.deletion.CASCADE, related_name='videoJob', to='game.chart')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'runAfter'], name='game_videojob_due_idx')],
+            },
+        ),
+    ]
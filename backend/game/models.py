@@ -1,5 +1,35 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Greatest
 from django.conf import settings
+from django.utils import timezone
+from .combo_codec import decode_combo, encode_combo
+from .note_codec import NoteColumns, pack_notes, unpack_notes
+
+NOTE_BULK_BATCH_SIZE = 1000  # rows 저장 방식에서 INSERT 한 번에 넣을 노트 수
+TOP_RANK_LIMIT = 10  # 차트 응답에 포함할 상위 랭킹 수
+CHART_STAT_BATCH_SIZE = 1000  # 차트 통계 INSERT 한 번에 넣을 구간 수
+
+VIDEO_PROCESSING = 'processing'
+VIDEO_READY = 'ready'
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+PERIOD_ALL = 'all'
+PERIOD_WEEK = 'week'
+PERIOD_MONTH = 'month'
+
+def period_keys(moment=None):
+    """시점이 속한 주/월 기간 키 (예: {'week': '2026-W42', 'month': '2026-10'})"""
+    moment = timezone.localtime(moment)
+    year, week, _ = moment.isocalendar()
+    return {
+        PERIOD_WEEK: f'{year}-W{week:02d}',
+        PERIOD_MONTH: f'{moment.year}-{moment.month:02d}',
+    }
 
 class Note(models.Model):
     """노트 모델"""
@@ -15,11 +45,51 @@ class Note(models.Model):
     type = models.CharField(max_length=10, choices=NOTE_TYPES, help_text="노트 타입")
     duration = models.IntegerField(null=True, blank=True, help_text="홀드 노트의 유지 시간 (ms 단위)")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['chart', 'time']),  # 시간 구간 조회용
+        ]
+
     def __str__(self):
         return f"Note {self.id} - {self.type} at {self.time}ms"
 
+class ChartQuerySet(models.QuerySet):
+    """차트 쿼리셋 - 랭킹과 유저 기록을 차트 수와 무관하게 일정한 쿼리 수로 함께 읽음"""
+
+    def with_top_score(self):
+        """차트별 1위 점수를 topScore로 annotate"""
+        top_score = Rank.objects.filter(chart=OuterRef('pk')).order_by('-score').values('score')[:1]
+        return self.annotate(topScore=Subquery(top_score, output_field=models.IntegerField()))
+
+    def with_top_ranks(self, limit=TOP_RANK_LIMIT):
+        """차트별 상위 랭킹을 topRanks에 저장
+
+        슬라이스된 prefetch는 ROW_NUMBER() 윈도우 함수 쿼리 한 번으로 모든 차트의 상위 N개를 읽습니다.
+        """
+        return self.prefetch_related(Prefetch(
+            'ranks',
+            queryset=Rank.objects.select_related('user').order_by('-score', 'user')[:limit],
+            to_attr='topRanks',
+        ))
+
+    def with_user_best(self, user):
+        """차트별 유저 최고 기록을 userBestResults(0개 또는 1개)에 저장"""
+        if user is None or not user.is_authenticated:
+            return self
+        return self.prefetch_related(Prefetch(
+            'results',
+            queryset=Result.objects.filter(user=user).order_by('-score', 'id')[:1],
+            to_attr='userBestResults',
+        ))
+
+
 class Chart(models.Model):
     """곡 차트 모델"""
+    VIDEO_STATUSES = [
+        (VIDEO_PROCESSING, 'Processing'),
+        (VIDEO_READY, 'Ready'),
+    ]
+
     musicId = models.CharField(max_length=100, unique=True, help_text="곡 ID")
     title = models.CharField(max_length=200, help_text="곡 제목")
     song = models.CharField(max_length=500, help_text="노래 음원 파일 경로")
@@ -30,16 +100,124 @@ class Chart(models.Model):
     bpm = models.IntegerField(default=120, help_text="BPM (분당 비트 수)")
     difficulty = models.IntegerField(help_text="난이도 (1~15)")
     creator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='charts', help_text="차트를 만든 사용자")
+    notesData = models.BinaryField(null=True, blank=True, editable=False, help_text="열 단위로 인코딩된 노트 (note_codec 노트 블록)")
+    noteCount = models.IntegerField(default=0, help_text="노트 수")
+    revision = models.PositiveIntegerField(default=1, editable=False, help_text="차트 내용 버전 (메타데이터/노트 변경 시 증가)")
+    videoStatus = models.CharField(max_length=10, choices=VIDEO_STATUSES, default=VIDEO_READY, help_text="배경 비디오 처리 상태 (processing이면 backgroundVideo가 아직 없음)")
+
+    objects = ChartQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.title} by {self.artist} (ID: {self.musicId})"
 
+    def save(self, *args, **kwargs):
+        # 저장할 때마다 버전을 올려 캐시된 응답과 ETag를 무효화
+        # (queryset.update()는 save()를 거치지 않으므로 차트 내용 변경에 사용하지 않음)
+        if not self._state.adding:
+            self.revision += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'revision'}
+        super().save(*args, **kwargs)
+
+    def get_note_columns(self):
+        """차트의 노트를 NoteColumns로 반환 (노트 블록이 없으면 Note 행에서 읽음)"""
+        if self.notesData is not None:
+            return unpack_notes(self.notesData)
+        return NoteColumns.from_queryset(self.notes.all())
+
+    def iter_notes(self, start=None, end=None, chunk_size=2000):
+        """시작 시간이 [start, end) 구간인 노트를 시간 순으로 하나씩 반환
+
+        각 노트의 id는 차트 전체에서의 순번(1부터)입니다.
+        """
+        if self.notesData is not None:
+            columns = unpack_notes(self.notesData)
+            lo, hi = columns.index_range(start, end)
+            for chunk_start in range(lo, hi, chunk_size):
+                chunk = columns[chunk_start:min(chunk_start + chunk_size, hi)]
+                for index, note_data in enumerate(chunk.to_dicts(), start=chunk_start + 1):
+                    yield {'id': index, **note_data}
+            return
+
+        # Note 행 저장 방식: (chart, time) 인덱스로 구간만 읽음
+        notes = self.notes.all()
+        offset = 0
+        if start is not None:
+            offset = notes.filter(time__lt=start).count()
+            notes = notes.filter(time__gte=start)
+        if end is not None:
+            notes = notes.filter(time__lt=end)
+        rows = notes.order_by('time', 'id').values_list('time', 'lane', 'type', 'duration')
+        for index, (time, lane, note_type, duration) in enumerate(rows.iterator(chunk_size=chunk_size), start=offset + 1):
+            yield {'id': index, 'time': time, 'lane': lane, 'type': note_type, 'duration': duration}
+
+    @transaction.atomic
+    def set_notes(self, columns):
+        """차트의 노트를 교체 (GAME_NOTE_STORAGE 설정에 따라 노트 블록 또는 Note 행으로 저장)"""
+        columns = columns.sorted()
+        self.notes.all().delete()
+        if settings.GAME_NOTE_STORAGE == 'rows':
+            Note.objects.bulk_create(
+                (Note(chart=self, **note_data) for note_data in columns.to_dicts()),
+                batch_size=NOTE_BULK_BATCH_SIZE,
+            )
+            self.notesData = None
+        else:
+            self.notesData = pack_notes(columns)
+        self.noteCount = len(columns)
+        self.save(update_fields=['notesData', 'noteCount'])
+
+class RankQuerySet(models.QuerySet):
+    """랭킹 쿼리셋"""
+
+    def record_scores(self, user_id, scores):
+        """유저의 차트별 최고 점수를 갱신
+
+        기존 최고 점수를 읽고, 더 높은 차트만 INSERT ... ON CONFLICT DO UPDATE 한 번으로 저장합니다.
+        같은 유저의 결과가 동시에 제출되어도 유니크 제약 위반이나 낮은 점수로 덮어쓰는 일이 없습니다.
+        결과 저장과 같은 트랜잭션 안에서, 반환값(이전 점수)으로 레이팅을 갱신한다면
+        PlayerRating.objects.lock(user_id)을 먼저 호출한 뒤 사용해야 합니다
+        (처음 기록하는 차트는 잠글 행이 없어 동시에 저장되면 둘 다 이전 점수를 None으로 읽음).
+
+        Args:
+            scores (dict): {차트 ID: 점수}
+
+        Returns:
+            dict: 랭킹이 추가되거나 점수가 오른 차트의 {차트 ID: 이전 최고 점수 또는 None}
+        """
+        previous = dict(
+            self.select_for_update()
+            .filter(user_id=user_id, chart_id__in=list(scores))
+            .values_list('chart_id', 'score')
+        )
+        candidates = [
+            (chart_id, score) for chart_id, score in scores.items()
+            if previous.get(chart_id) is None or score > previous[chart_id]
+        ]
+        if not candidates:
+            return {}
+
+        table = connection.ops.quote_name(Rank._meta.db_table)
+        values = ', '.join(['(%s, %s, %s)'] * len(candidates))
+        params = [value for chart_id, score in candidates for value in (chart_id, user_id, score)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (chart_id, user_id, score) VALUES {values} '
+                f'ON CONFLICT (chart_id, user_id) DO UPDATE SET score = excluded.score '
+                f'WHERE excluded.score > {table}.score '
+                f'RETURNING chart_id',
+                params,
+            )
+            return {chart_id: previous.get(chart_id) for chart_id, in cursor.fetchall()}
+
 class Rank(models.Model):
     """랭킹 모델"""
     chart = models.ForeignKey(Chart, on_delete=models.CASCADE, related_name='ranks', help_text="랭킹이 속한 차트")
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ranks', help_text="랭킹을 기록한 사용자")
     score = models.IntegerField(help_text="점수")
 
+    objects = RankQuerySet.as_manager()
+
     class Meta:
         unique_together = ('chart', 'user')  # 한 차트에 한 사용자당 하나의 랭킹
 
@@ -65,7 +243,8 @@ class Result(models.Model):
     score = models.IntegerField(help_text="최종 점수")
     accuracy = models.FloatField(help_text="정확도 (%)")
     rank = models.CharField(max_length=2, choices=RANKS, help_text="점수 기반 랭크")
-    combo = models.CharField(max_length=500, help_text="콤보 기록 (문자열)")
+    comboData = models.BinaryField(default=b'', help_text="콤보 구간 기록 (combo_codec 인코딩)")
+    maxCombo = models.IntegerField(default=0, help_text="최대 콤보")
     isFullCombo = models.BooleanField(default=False, help_text="풀콤보 여부")
     isAllPerfect = models.BooleanField(default=False, help_text="올 퍼펙트 여부")
     earlyCount = models.IntegerField(default=0, help_text="빠르게 친 판정 수")
@@ -75,7 +254,247 @@ class Result(models.Model):
     good = models.IntegerField(default=0, help_text="굿 판정 수")
     miss = models.IntegerField(default=0, help_text="미스 판정 수")
     bad = models.IntegerField(default=0, help_text="배드 판정 수")
+    verifiedScore = models.IntegerField(null=True, blank=True, help_text="입력 기록으로 다시 계산한 점수 (입력 기록이 없으면 null)")
+    laneStats = models.JSONField(null=True, blank=True, help_text="입력 기록으로 계산한 레인별 [노트 수, miss 수] (입력 기록이 없으면 null)")
     playedAt = models.DateTimeField(auto_now_add=True, help_text="플레이 시간")
 
+    class Meta:
+        indexes = [
+            # 유저별 최근 플레이 순, 차트별 점수 순 키셋 페이지네이션용
+            models.Index(fields=['user', '-playedAt', '-id'], name='game_result_user_played_idx'),
+            models.Index(fields=['chart', '-score', '-id'], name='game_result_chart_score_idx'),
+            models.Index(fields=['chart', '-maxCombo', '-id'], name='game_result_chart_combo_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.nickname} - {self.score} on {self.chart.title} at {self.playedAt}"
+
+    @property
+    def combo(self):
+        """콤보 기록 문자열 ("시작-끝-콤보수"를 쉼표로 이은 형태)"""
+        return decode_combo(self.comboData)
+
+    @combo.setter
+    def combo(self, text):
+        self.comboData, self.maxCombo = encode_combo(text)
+
+class PlayerRatingQuerySet(models.QuerySet):
+    """전체 레이팅 쿼리셋"""
+
+    def lock(self, user_id):
+        """유저 레이팅 행을 (없으면 만든 뒤) 트랜잭션이 끝날 때까지 잠금
+
+        아직 없는 Rank 행은 select_for_update로 잠글 수 없으므로, 같은 유저의 결과 저장을
+        항상 존재하는 이 행에서 직렬화합니다. 결과 저장과 같은 트랜잭션 안에서 호출해야 합니다.
+        """
+        self.bulk_create([PlayerRating(user_id=user_id)], ignore_conflicts=True)
+        list(self.select_for_update().filter(user_id=user_id).values_list('pk', flat=True))
+
+    def apply_delta(self, user_id, rating_delta, chart_delta):
+        """유저 레이팅에 변화량만 더함 (행이 없으면 추가, INSERT ... ON CONFLICT 쿼리 한 번)"""
+        table = connection.ops.quote_name(PlayerRating._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, rating, "chartCount", "updatedAt") VALUES (%s, %s, %s, %s) '
+                f'ON CONFLICT (user_id) DO UPDATE SET '
+                f'rating = {table}.rating + excluded.rating, '
+                f'"chartCount" = {table}."chartCount" + excluded."chartCount", '
+                f'"updatedAt" = excluded."updatedAt"',
+                [user_id, rating_delta, chart_delta, timezone.now()],
+            )
+
+class PlayerRating(models.Model):
+    """유저 전체 레이팅 (차트별 최고 점수 x 난이도의 합)
+
+    create_result에서 Rank가 바뀐 만큼만 갱신하며, rebuild_player_ratings 명령으로 다시 계산할 수 있습니다.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='playerRating', help_text="레이팅 대상 유저")
+    rating = models.BigIntegerField(default=0, help_text="레이팅 (차트별 최고 점수 x 난이도의 합)")
+    chartCount = models.IntegerField(default=0, help_text="기록이 있는 차트 수")
+    updatedAt = models.DateTimeField(auto_now=True, help_text="마지막 갱신 시간")
+
+    objects = PlayerRatingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rating', 'user'], name='game_rating_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.nickname} - {self.rating}"
+
+    @staticmethod
+    def rating_of(score, difficulty):
+        """차트 하나의 레이팅 기여분"""
+        return score * difficulty
+
+class UserStatsQuerySet(models.QuerySet):
+    """유저 통계 쿼리셋"""
+
+    def record_results(self, user_id, results):
+        """새 결과만큼 유저 통계를 F() 식으로 더함 (행이 없으면 만든 뒤 다시 갱신)"""
+        changes = {
+            'playCount': F('playCount') + len(results),
+            'perfectCount': F('perfectCount') + sum(result.perfect for result in results),
+            'fullComboCount': F('fullComboCount') + sum(1 for result in results if result.isFullCombo),
+            'allPerfectCount': F('allPerfectCount') + sum(1 for result in results if result.isAllPerfect),
+            'highestScore': Greatest('highestScore', Value(max(result.score for result in results))),
+            'maxCombo': Greatest('maxCombo', Value(max(result.maxCombo for result in results))),
+            'updatedAt': timezone.now(),
+        }
+        if not self.filter(user_id=user_id).update(**changes):
+            self.bulk_create([UserStats(user_id=user_id)], ignore_conflicts=True)
+            self.filter(user_id=user_id).update(**changes)
+
+class UserStats(models.Model):
+    """유저 게임 통계 (/auth/me 응답용)
+
+    create_result에서 저장한 결과만큼 갱신하며, rebuild_user_stats 명령으로 다시 계산할 수 있습니다.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='gameStats', help_text="통계 대상 유저")
+    playCount = models.IntegerField(default=0, help_text="플레이 횟수")
+    perfectCount = models.IntegerField(default=0, help_text="퍼펙트 판정 수 합계")
+    fullComboCount = models.IntegerField(default=0, help_text="풀콤보 횟수")
+    allPerfectCount = models.IntegerField(default=0, help_text="올 퍼펙트 횟수")
+    highestScore = models.IntegerField(default=0, help_text="최고 점수")
+    maxCombo = models.IntegerField(default=0, help_text="최대 콤보")
+    updatedAt = models.DateTimeField(auto_now=True, help_text="마지막 갱신 시간")
+
+    objects = UserStatsQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user.nickname} - {self.playCount} plays"
+
+class ChartStatQuerySet(models.QuerySet):
+    """차트 통계 쿼리셋"""
+
+    def add_totals(self, totals):
+        """차트/metric/bin별 값을 INSERT ... ON CONFLICT DO UPDATE로 더함
+
+        Args:
+            totals (dict): {(차트 ID, metric, bin): 더할 값} (chart_stats.bucket_totals 결과)
+        """
+        items = list(totals.items())
+        table = connection.ops.quote_name(ChartStat._meta.db_table)
+        with connection.cursor() as cursor:
+            for start in range(0, len(items), CHART_STAT_BATCH_SIZE):
+                batch = items[start:start + CHART_STAT_BATCH_SIZE]
+                values = ', '.join(['(%s, %s, %s, %s)'] * len(batch))
+                params = [value for key, total in batch for value in (*key, total)]
+                cursor.execute(
+                    f'INSERT INTO {table} (chart_id, metric, bin, value) VALUES {values} '
+                    f'ON CONFLICT (chart_id, metric, bin) DO UPDATE SET value = {table}.value + excluded.value',
+                    params,
+                )
+
+class ChartStat(models.Model):
+    """차트별 통계 구간 값 (점수/정확도 분포, 판정 합계, 레인별 miss)
+
+    metric과 bin의 의미는 chart_stats 모듈을 참고하세요. create_result에서 새 결과만큼 더하며,
+    rebuild_chart_stats 명령으로 다시 계산할 수 있습니다.
+    """
+    chart = models.ForeignKey(Chart, on_delete=models.CASCADE, related_name='stats', help_text="통계 대상 차트")
+    metric = models.CharField(max_length=20, help_text="통계 종류 (score, accuracy, judgement 등)")
+    bin = models.SmallIntegerField(help_text="구간 번호")
+    value = models.BigIntegerField(default=0, help_text="구간 값")
+
+    objects = ChartStatQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('chart', 'metric', 'bin')
+
+    def __str__(self):
+        return f"{self.chart.title} - {self.metric}[{self.bin}] = {self.value}"
+
+class PeriodRankQuerySet(models.QuerySet):
+    """기간별 랭킹 쿼리셋"""
+
+    def record_scores(self, user_id, scores):
+        """차트/기간별 최고 점수를 INSERT ... ON CONFLICT DO UPDATE 쿼리 한 번으로 갱신
+
+        Args:
+            scores (dict): {(차트 ID, 기간 키): 점수}
+
+        Returns:
+            list: 랭킹이 추가되거나 점수가 오른 (차트 ID, 기간 키) 목록
+        """
+        if not scores:
+            return []
+        table = connection.ops.quote_name(PeriodRank._meta.db_table)
+        values = ', '.join(['(%s, %s, %s, %s)'] * len(scores))
+        params = [
+            value for (chart_id, period), score in scores.items()
+            for value in (chart_id, user_id, period, score)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (chart_id, user_id, period, score) VALUES {values} '
+                f'ON CONFLICT (chart_id, period, user_id) DO UPDATE SET score = excluded.score '
+                f'WHERE excluded.score > {table}.score '
+                f'RETURNING chart_id, period',
+                params,
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+
+class PeriodRank(models.Model):
+    """기간별(주/월) 랭킹 모델
+
+    기간이 끝나면 freeze_leaderboards 명령으로 LeaderboardSnapshot에 고정하고 삭제됩니다.
+    """
+    chart = models.ForeignKey(Chart, on_delete=models.CASCADE, related_name='periodRanks', help_text="랭킹이 속한 차트")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='periodRanks', help_text="랭킹을 기록한 사용자")
+    period = models.CharField(max_length=10, help_text="기간 키 (예: 2026-W42, 2026-10)")
+    score = models.IntegerField(help_text="기간 내 최고 점수")
+
+    objects = PeriodRankQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('chart', 'period', 'user')  # 한 기간, 한 차트에 한 사용자당 하나의 랭킹
+        indexes = [
+            models.Index(fields=['chart', 'period', '-score'], name='game_periodrank_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.nickname} - {self.score} on {self.chart.title} ({self.period})"
+
+class LeaderboardSnapshot(models.Model):
+    """끝난 기간의 리더보드 (변경되지 않으므로 응답을 영구 캐시할 수 있음)"""
+    chart = models.ForeignKey(Chart, on_delete=models.CASCADE, related_name='leaderboardSnapshots', help_text="리더보드가 속한 차트")
+    period = models.CharField(max_length=10, help_text="기간 키 (예: 2026-W42, 2026-10)")
+    entries = models.JSONField(help_text="직렬화된 상위 랭킹 목록")
+    frozenAt = models.DateTimeField(auto_now_add=True, help_text="고정된 시간")
+
+    class Meta:
+        unique_together = ('chart', 'period')
+
+    def __str__(self):
+        return f"{self.chart.title} ({self.period})"
+
+class VideoJob(models.Model):
+    """차트 배경 비디오 처리 작업 (game.video_jobs 워커가 실행)"""
+    STATUSES = [
+        (JOB_QUEUED, 'Queued'),
+        (JOB_RUNNING, 'Running'),
+        (JOB_DONE, 'Done'),
+        (JOB_FAILED, 'Failed'),
+    ]
+
+    chart = models.OneToOneField(Chart, on_delete=models.CASCADE, related_name='videoJob', help_text="비디오를 처리할 차트")
+    status = models.CharField(max_length=10, choices=STATUSES, default=JOB_QUEUED, help_text="작업 상태")
+    inputPath = models.CharField(max_length=500, help_text="원본 비디오 경로 (MEDIA_ROOT 기준, 작업이 끝나면 삭제)")
+    outputPath = models.CharField(max_length=500, help_text="처리된 비디오 경로 (MEDIA_ROOT 기준)")
+    progress = models.FloatField(default=0, help_text="진행률 (0~1)")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="실행한 횟수")
+    error = models.TextField(blank=True, default='', help_text="마지막 실패 사유")
+    runAfter = models.DateTimeField(default=timezone.now, help_text="이 시간 이후에 실행 (재시도 대기)")
+    startedAt = models.DateTimeField(null=True, blank=True, help_text="마지막 실행 시작 시간")
+    finishedAt = models.DateTimeField(null=True, blank=True, help_text="완료 시간")
+    createdAt = models.DateTimeField(auto_now_add=True, help_text="생성 시간")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'runAfter'], name='game_videojob_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.chart.musicId} ({self.status})"
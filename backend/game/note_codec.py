@@ -0,0 +1,175 @@
+"""
+노트 열(column) 단위 표현과 바이너리 인코딩
+
+노트 배열을 time / lane / type / duration 네 개의 배열로 보관하고,
+차트 상세 응답의 압축 포맷(application/vnd.sunrin.chart)을 만들고 읽습니다.
+
+바이너리 레이아웃 (모든 정수는 little-endian):
+
+노트 블록
+    offset  타입            내용
+    0       char[4]         매직 "SNT1"
+    4       uint32          노트 수 n
+    8       int32[n]        time 델타 (첫 값은 절대 시간, 이후 time[i] - time[i-1])
+    8+4n    int32[n]        duration (ms, 홀드가 아니면 -1)
+    8+8n    uint8[n]        lane
+    8+9n    uint8[n]        type (0 = tap, 1 = hold)
+
+차트 봉투
+    offset  타입            내용
+    0       char[4]         매직 "SNC1"
+    4       uint32          메타데이터 길이 m
+    8       uint8[m]        notes를 제외한 차트 상세 응답 (UTF-8 JSON)
+    ...     0 패딩          다음 오프셋이 4의 배수가 되도록
+    ...     노트 블록
+
+int32 배열이 4바이트 경계에서 시작하므로 클라이언트는 Int32Array / Uint8Array
+뷰로 복사 없이 읽을 수 있습니다. 노트는 (time, id) 순으로 정렬되어 있으며
+노트 ID는 전송하지 않습니다.
+"""
+import json
+import struct
+
+import numpy as np
+
+NOTE_BLOCK_MAGIC = b'SNT1'
+CHART_MAGIC = b'SNC1'
+CHART_MEDIA_TYPE = 'application/vnd.sunrin.chart'
+
+NOTE_TYPE_CODES = ('tap', 'hold')  # 인덱스가 type 코드
+NO_DURATION = -1
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1  # 노트 블록의 time 델타와 duration 범위
+
+_HEADER = struct.Struct('<4sI')
+
+
+class NoteColumns:
+    """노트 배열의 열 단위 표현"""
+    __slots__ = ('time', 'lane', 'type', 'duration')
+
+    def __init__(self, time, lane, type, duration):
+        self.time = np.asarray(time, dtype=np.int64)
+        self.lane = np.asarray(lane, dtype=np.int64)
+        self.type = np.asarray(type, dtype=np.uint8)
+        self.duration = np.asarray(duration, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, index):
+        return NoteColumns(self.time[index], self.lane[index], self.type[index], self.duration[index])
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [])
+
+    @classmethod
+    def from_rows(cls, rows):
+        """(time, lane, type, duration) 튜플 목록에서 생성"""
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        time, lane, types, duration = zip(*rows)
+        type_codes = (np.asarray(types, dtype=object) == 'hold').astype(np.uint8)
+        duration = np.array([NO_DURATION if d is None else d for d in duration], dtype=np.int64)
+        return cls(time, lane, type_codes, duration)
+
+    @classmethod
+    def from_notes(cls, notes):
+        """노트 dict 목록(업로드 JSON 형식)에서 생성"""
+        return cls.from_rows(
+            (note['time'], note['lane'], note['type'], note.get('duration'))
+            for note in notes
+        )
+
+    @classmethod
+    def from_queryset(cls, notes):
+        """Note 쿼리셋에서 생성 (모델 인스턴스 없이 values_list로 읽음)"""
+        return cls.from_rows(
+            notes.order_by('time', 'id').values_list('time', 'lane', 'type', 'duration')
+        )
+
+    def sorted(self):
+        """시간 순으로 정렬된 NoteColumns 반환 (같은 시간은 기존 순서 유지)"""
+        order = np.argsort(self.time, kind='stable')
+        return NoteColumns(self.time[order], self.lane[order], self.type[order], self.duration[order])
+
+    def index_range(self, start=None, end=None):
+        """정렬된 노트에서 시작 시간이 [start, end) 구간인 노트의 인덱스 범위"""
+        lo = 0 if start is None else int(np.searchsorted(self.time, start, side='left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.time, end, side='left'))
+        return lo, max(lo, hi)
+
+    def to_dicts(self):
+        """노트 dict 목록으로 변환"""
+        types = np.asarray(NOTE_TYPE_CODES, dtype=object)[self.type].tolist()
+        durations = [None if d == NO_DURATION else d for d in self.duration.tolist()]
+        return [
+            {'time': time, 'lane': lane, 'type': note_type, 'duration': duration}
+            for time, lane, note_type, duration in zip(
+                self.time.tolist(), self.lane.tolist(), types, durations
+            )
+        ]
+
+
+def pack_notes(columns):
+    """노트 블록을 바이트로 인코딩
+
+    Raises:
+        ValueError: time 델타나 duration이 int32 범위를 벗어난 경우 (그대로 저장하면 값이 바뀜).
+    """
+    deltas = np.diff(columns.time, prepend=0)
+    for name, values in (('time', deltas), ('duration', columns.duration)):
+        if len(values) and (values.min() < INT32_MIN or values.max() > INT32_MAX):
+            raise ValueError(f'노트 {name} 값이 int32 범위를 벗어납니다.')
+    return b''.join((
+        _HEADER.pack(NOTE_BLOCK_MAGIC, len(columns)),
+        deltas.astype('<i4').tobytes(),
+        columns.duration.astype('<i4').tobytes(),
+        columns.lane.astype('u1').tobytes(),
+        columns.type.astype('u1').tobytes(),
+    ))
+
+
+def unpack_notes(buffer, offset=0):
+    """노트 블록을 디코딩하여 NoteColumns 반환"""
+    magic, count = _HEADER.unpack_from(buffer, offset)
+    if magic != NOTE_BLOCK_MAGIC:
+        raise ValueError('올바른 노트 블록이 아닙니다.')
+    offset += _HEADER.size
+    deltas = np.frombuffer(buffer, dtype='<i4', count=count, offset=offset)
+    offset += 4 * count
+    duration = np.frombuffer(buffer, dtype='<i4', count=count, offset=offset)
+    offset += 4 * count
+    lane = np.frombuffer(buffer, dtype='u1', count=count, offset=offset)
+    offset += count
+    note_type = np.frombuffer(buffer, dtype='u1', count=count, offset=offset)
+    return NoteColumns(np.cumsum(deltas, dtype=np.int64), lane, note_type, duration)
+
+
+def pack_chart(meta, columns):
+    """차트 메타데이터와 노트를 차트 봉투로 인코딩"""
+    return wrap_chart(meta, pack_notes(columns))
+
+
+def wrap_chart(meta, note_block):
+    """차트 메타데이터와 인코딩된 노트 블록을 차트 봉투로 묶음"""
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    padding = -(_HEADER.size + len(meta_bytes)) % 4
+    return b''.join((
+        _HEADER.pack(CHART_MAGIC, len(meta_bytes)),
+        meta_bytes,
+        b'\0' * padding,
+        note_block,
+    ))
+
+
+def unpack_chart(buffer):
+    """차트 봉투를 (메타데이터 dict, NoteColumns)로 디코딩"""
+    magic, meta_length = _HEADER.unpack_from(buffer, 0)
+    if magic != CHART_MAGIC:
+        raise ValueError('올바른 차트 페이로드가 아닙니다.')
+    meta_end = _HEADER.size + meta_length
+    meta = json.loads(bytes(buffer[_HEADER.size:meta_end]).decode('utf-8'))
+    notes_offset = meta_end + (-meta_end % 4)
+    return meta, unpack_notes(buffer, notes_offset)
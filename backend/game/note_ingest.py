@@ -0,0 +1,102 @@
+"""
+업로드된 노트 JSON 파싱
+
+notes_data 문자열을 요소 단위로 읽으면서 열 배열에 바로 쌓고,
+필드 검증은 배열 단위로 한 번에 수행합니다. 노트 dict 목록을 통째로 만들지 않습니다.
+"""
+import json
+import re
+
+import numpy as np
+
+from .note_codec import NO_DURATION, NOTE_TYPE_CODES, NoteColumns
+
+_WHITESPACE = re.compile(r'\s*')
+_MAX_REPORTED = 10  # 에러 메시지에 포함할 최대 인덱스 수
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class NoteParseError(ValueError):
+    """노트 JSON 파싱/검증 실패"""
+
+    def __init__(self, message, indices=()):
+        self.indices = list(indices)[:_MAX_REPORTED]
+        if self.indices:
+            message = f'{message} (노트 인덱스: {", ".join(map(str, self.indices))})'
+        super().__init__(message)
+
+
+def iter_json_array(text):
+    """JSON 배열 문자열의 요소를 하나씩 디코딩하여 반환"""
+    decoder = json.JSONDecoder()
+    index = _WHITESPACE.match(text, 0).end()
+    if text[index:index + 1] != '[':
+        raise NoteParseError('노트 데이터는 JSON 배열이어야 합니다.')
+    index = _WHITESPACE.match(text, index + 1).end()
+
+    while text[index:index + 1] != ']':
+        try:
+            value, index = decoder.raw_decode(text, index)
+        except json.JSONDecodeError as e:
+            raise NoteParseError(f'노트 JSON 형식이 올바르지 않습니다: {e.msg} (위치 {e.pos})')
+        yield value
+
+        index = _WHITESPACE.match(text, index).end()
+        separator = text[index:index + 1]
+        if separator == ',':
+            index = _WHITESPACE.match(text, index + 1).end()
+            if text[index:index + 1] == ']':
+                raise NoteParseError(f'노트 JSON 형식이 올바르지 않습니다 (위치 {index})')
+        elif separator != ']':
+            raise NoteParseError(f'노트 JSON 형식이 올바르지 않습니다 (위치 {index})')
+
+    if text[index + 1:].strip():
+        raise NoteParseError('노트 배열 뒤에 불필요한 데이터가 있습니다.')
+
+
+def _int_column(values, name):
+    column = np.asarray(values)
+    if len(column) and column.dtype.kind not in 'iu':
+        invalid = [i for i, v in enumerate(values) if type(v) is not int]
+        if invalid:
+            raise NoteParseError(f'노트의 {name} 값은 정수여야 합니다.', invalid)
+    if len(column) and column.dtype.kind != 'i':
+        # int64 범위를 넘는 정수는 uint64 또는 object 배열이 되고 astype에서 값이 바뀜
+        invalid = [i for i, v in enumerate(values) if not INT64_MIN <= v <= INT64_MAX]
+        raise NoteParseError(f'노트의 {name} 값이 너무 큽니다.', invalid)
+    return column.astype(np.int64)
+
+
+def parse_notes(text):
+    """notes_data 문자열을 NoteColumns로 변환
+
+    Raises:
+        NoteParseError: JSON 형식이 잘못되었거나 필드가 누락/잘못된 경우.
+    """
+    times, lanes, types, durations = [], [], [], []
+    missing = []
+    for index, note in enumerate(iter_json_array(text)):
+        try:
+            times.append(note['time'])
+            lanes.append(note['lane'])
+            types.append(note['type'])
+        except (KeyError, TypeError):
+            missing.append(index)
+            continue
+        duration = note.get('duration')
+        durations.append(NO_DURATION if duration is None else duration)
+
+    if missing:
+        raise NoteParseError('노트에 time, lane, type 필드가 모두 있어야 합니다.', missing)
+
+    type_column = np.asarray(types, dtype=object)
+    invalid_types = np.flatnonzero(~np.isin(type_column, NOTE_TYPE_CODES))
+    if len(invalid_types):
+        raise NoteParseError(f'노트 type은 {", ".join(NOTE_TYPE_CODES)} 중 하나여야 합니다.', invalid_types.tolist())
+
+    return NoteColumns(
+        _int_column(times, 'time'),
+        _int_column(lanes, 'lane'),
+        (type_column == 'hold').astype(np.uint8),
+        _int_column(durations, 'duration'),
+    )
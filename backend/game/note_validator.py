@@ -0,0 +1,119 @@
+"""
+차트 노트 타임라인 검증
+
+NoteColumns 전체를 배열 연산으로 한 번에 검사하고, 위반 항목별로
+문제가 된 노트 인덱스를 담은 리포트를 반환합니다.
+"""
+import numpy as np
+
+from .note_codec import INT32_MAX, NO_DURATION
+
+LANE_COUNT = 4  # 게임 라인 수 (0부터 또는 1부터 시작하는 번호 모두 허용)
+MAX_REPORTED_INDICES = 100  # 위반 항목마다 리포트에 담을 최대 인덱스 수
+
+HOLD_TYPE = 1
+MAX_NOTE_TIME = INT32_MAX  # 노트 블록은 time과 duration을 int32로 저장 (ms)
+
+
+class NoteValidationReport:
+    """노트 검증 결과"""
+
+    def __init__(self, note_count):
+        self.note_count = note_count
+        self.errors = []
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    def add(self, code, message, indices):
+        indices = np.asarray(indices)
+        if len(indices):
+            self.errors.append({
+                'code': code,
+                'message': message,
+                'count': int(len(indices)),
+                'indices': indices[:MAX_REPORTED_INDICES].tolist(),
+            })
+
+    def messages(self):
+        """에러마다 사람이 읽을 수 있는 메시지 한 줄씩 반환"""
+        return [
+            f'{error["message"]} ({error["count"]}개, 노트 인덱스: '
+            f'{", ".join(map(str, error["indices"][:10]))}{" ..." if error["count"] > 10 else ""})'
+            for error in self.errors
+        ]
+
+
+def validate_notes(columns, require_sorted=True, lane_count=LANE_COUNT):
+    """노트 타임라인을 검증하여 NoteValidationReport 반환
+
+    Args:
+        columns (NoteColumns): 검사할 노트.
+        require_sorted (bool): 시간 순 정렬 여부도 검사할지. 저장 시 정렬되는
+            업로드 경로에서는 False로 호출합니다.
+        lane_count (int): 라인 수.
+    """
+    report = NoteValidationReport(len(columns))
+    if not len(columns):
+        return report
+
+    time, lane, note_type, duration = columns.time, columns.lane, columns.type, columns.duration
+    is_hold = note_type == HOLD_TYPE
+
+    report.add('negative_time', '노트 시간은 0 이상이어야 합니다.', np.flatnonzero(time < 0))
+    report.add(
+        'time_out_of_range',
+        f'노트 시간은 {MAX_NOTE_TIME} 이하여야 합니다.',
+        np.flatnonzero(time > MAX_NOTE_TIME),
+    )
+
+    if require_sorted:
+        report.add('unsorted_time', '노트가 시간 순으로 정렬되어 있지 않습니다.', np.flatnonzero(np.diff(time) < 0) + 1)
+
+    # 라인 번호는 차트 전체에서 0부터 또는 1부터 일관되게 사용
+    base = 1 if lane.min() >= 1 else 0
+    report.add(
+        'lane_out_of_range',
+        f'노트 라인은 {base}~{base + lane_count - 1} 범위여야 합니다.',
+        np.flatnonzero((lane < base) | (lane >= base + lane_count)),
+    )
+
+    report.add(
+        'tap_duration',
+        'tap 노트에는 duration이 없어야 합니다.',
+        np.flatnonzero(~is_hold & (duration != NO_DURATION)),
+    )
+    report.add(
+        'hold_duration',
+        'hold 노트에는 0보다 큰 duration이 있어야 합니다.',
+        np.flatnonzero(is_hold & (duration <= 0)),
+    )
+    report.add(
+        'duration_out_of_range',
+        f'hold 노트의 duration은 {MAX_NOTE_TIME} 이하여야 합니다.',
+        np.flatnonzero(duration > MAX_NOTE_TIME),
+    )
+
+    report.add('hold_overlap', '같은 라인의 hold 노트가 겹칩니다.', _overlapping_holds(time, lane, duration, is_hold))
+    return report
+
+
+def _overlapping_holds(time, lane, duration, is_hold):
+    """같은 라인에서 앞선 hold가 끝나기 전에 시작하는 hold 노트 인덱스"""
+    holds = np.flatnonzero(is_hold & (duration > 0))
+    if len(holds) < 2:
+        return holds[:0]
+
+    order = holds[np.lexsort((time[holds], lane[holds]))]
+    start = time[order]
+    end = start + duration[order]
+    hold_lane = lane[order]
+
+    # 라인별 누적 최대 종료 시간: 라인마다 충분히 큰 오프셋을 더해 한 번의 누적 최대로 계산
+    offset = (hold_lane - hold_lane.min()) * (int(end.max() - start.min()) + 1)
+    running_end = np.maximum.accumulate(end - start.min() + offset) - offset + start.min()
+
+    same_lane = hold_lane[1:] == hold_lane[:-1]
+    overlaps = same_lane & (start[1:] < running_end[:-1])
+    return np.sort(order[1:][overlaps])
@@ -0,0 +1,128 @@
+"""
+키셋(커서) 페이지네이션
+
+정렬 기준 필드 값(마지막 행)을 커서로 넘겨 다음 페이지를 WHERE 조건으로 바로 찾습니다.
+OFFSET을 쓰지 않으므로 몇 번째 페이지든 정렬 인덱스를 타고 같은 비용으로 읽습니다.
+archive를 넘기면 DB 밖(보관된 결과 세그먼트)의 행도 같은 순서로 합쳐서 페이지를 만듭니다.
+cursor나 limit이 없는 요청은 페이지네이션하지 않습니다 (기존 배열 응답 유지).
+"""
+import base64
+import datetime
+import json
+import sys
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """내림차순 정렬 필드 목록(마지막은 유일한 필드)에 대한 키셋 페이지네이션
+
+    응답: {"next": 다음 페이지 URL 또는 null, "results": [...]}
+    cursor와 limit이 모두 없으면 paginate_queryset이 None을 반환하며, all_rows로 전체 행을 읽습니다.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 50
+    max_limit = 200
+
+    def __init__(self, ordering, archive=None):
+        self.ordering = ordering  # 예: ('playedAt', 'id') -> ORDER BY playedAt DESC, id DESC
+        # archive(after, until, limit): 키가 after보다 뒤, until보다 앞인 DB 밖의 행을 정렬 순서로 최대 limit개
+        self.archive = archive
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        params = request.query_params
+        if self.cursor_query_param not in params and self.limit_query_param not in params:
+            return None
+        self.limit = self._get_limit(request)
+        queryset = self._ordered(queryset)
+
+        after = None
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            after = self._decode_cursor(queryset.model, cursor)
+            queryset = queryset.filter(self._after(after))
+
+        rows = list(queryset[:self.limit + 1])
+        if self.archive is not None:
+            # DB 페이지가 다 찼으면 마지막 행보다 앞에 오는 보관 행만 있으면 되므로, 커서가 보관 행의
+            # 범위에 닿기 전에는 archive가 세그먼트 메타데이터만 보고 바로 빈 목록을 반환
+            until = self._key(rows[-1]) if len(rows) > self.limit else None
+            rows = self._merge(rows, self.archive(after, until, self.limit + 1))[:self.limit + 1]
+        self.has_next = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        return self.page
+
+    def all_rows(self, queryset):
+        """페이지네이션하지 않는 요청용 - DB와 보관된 행 전체를 정렬 순서로 반환"""
+        rows = list(self._ordered(queryset))
+        if self.archive is not None:
+            rows = self._merge(rows, self.archive(None, None, sys.maxsize))
+        return rows
+
+    def _ordered(self, queryset):
+        return queryset.order_by(*(f'-{field}' for field in self.ordering))
+
+    def _merge(self, rows, archived):
+        if not archived:
+            return rows
+        # 보관 직후 DB에서 아직 지워지지 않은 행은 DB 쪽을 사용
+        merged = {self._key(row): row for row in archived + rows}
+        return sorted(merged.values(), key=self._key, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self._encode_cursor(list(self._key(last))),
+        )
+
+    def _key(self, row):
+        return tuple(getattr(row, field) for field in self.ordering)
+
+    def _get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    def _after(self, values):
+        """(f1, f2, ...) < (v1, v2, ...) 조건을 OR로 풀어서 생성"""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            prefix = {name: value for name, value in zip(self.ordering[:i], values)}
+            condition |= Q(**prefix, **{f'{field}__lt': values[i]})
+        return condition
+
+    def _encode_cursor(self, values):
+        raw = json.dumps(values, default=_encode_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _decode_cursor(self, model, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [model._meta.get_field(field).to_python(value) for field, value in zip(self.ordering, values)]
+        except (ValueError, ValidationError):
+            raise NotFound('커서 값이 올바르지 않습니다.')
+
+
+def _encode_value(value):
+    # DjangoJSONEncoder는 마이크로초를 잘라내므로 커서에는 전체 정밀도의 ISO 문자열 사용
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} 값은 커서에 사용할 수 없습니다.')
@@ -0,0 +1,20 @@
+from rest_framework.renderers import BaseRenderer
+from .note_codec import CHART_MEDIA_TYPE, NoteColumns, pack_chart
+
+
+class CompactChartRenderer(BaseRenderer):
+    """차트 상세를 열 단위 바이너리 포맷으로 렌더링 (note_codec 참고)
+
+    Accept: application/vnd.sunrin.chart 또는 ?format=bin 으로 선택됩니다.
+    """
+    media_type = CHART_MEDIA_TYPE
+    format = 'bin'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        meta = dict(data)
+        notes = meta.pop('notes', [])
+        if not isinstance(notes, NoteColumns):
+            notes = NoteColumns.from_notes(notes)
+        return pack_chart(meta, notes)
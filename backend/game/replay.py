@@ -0,0 +1,281 @@
+"""
+입력 기록 기반 결과 검증 (리플레이)
+
+결과 제출 시 inputLog(키 입력 기록)를 함께 보내면 차트 노트로 판정을 다시 계산하여
+Result.verifiedScore에 저장합니다. 판정/점수/정확도/랭크 규칙은 프론트엔드
+useNoteJudgement.ts, useMissDetection.ts와 같습니다.
+
+inputLog 형식: [[시간(ms), 레인, 동작], ...]  (동작 1 = 누름, 0 = 뗌, 시간은 곡 시작 기준)
+
+판정 순서
+    1. 레인별로 누름 입력 시간을 노트 시간 배열에서 searchsorted로 찾아 가장 가까운 노트와 매칭
+       (miss 판정 범위 밖이면 무시, 같은 노트를 노린 입력이 있으면 먼저 누른 입력이 가져가고
+       나머지 입력은 남은 노트에서 다시 찾음)
+    2. 일반 노트는 시간 차이로 perfect/great/good/miss 판정
+    3. 롱노트는 good 범위 안에서 눌렀을 때만 시작하고, 같은 레인에서 끝 시간 전에 키를 떼면 miss,
+       끝까지 누르고 있으면 perfect
+    4. 매칭되지 않은 노트는 (끝 시간 + AUTO_MISS_TIME)에 miss
+    5. 판정을 시간 순으로 정렬하여 누적합으로 콤보와 콤보 배율을 계산
+"""
+import bisect
+import itertools
+
+import numpy as np
+
+from .chart_cache import BINARY_FORMAT, get_notes_payload
+from .note_codec import NO_DURATION, unpack_notes
+
+# 프론트엔드 useMissDetection.ts와 같은 값 (ms)
+JUDGEMENT_WINDOWS = {
+    'perfect': 30,
+    'great': 60,
+    'good': 100,
+    'miss': 150,
+}
+AUTO_MISS_TIME = 200
+
+TAP_SCORES = (500, 300, 100)  # perfect, great, good 기본 점수
+HOLD_SCORE = 750  # 롱노트 완료 점수
+COMBO_STEP = 20  # 콤보 20마다 배율 +0.05 (최대 1.5배)
+
+MAX_INPUT_EVENTS = 50000
+
+PERFECT, GREAT, GOOD, MISS = range(4)
+HOLD_TYPE = 1
+
+
+class ReplayError(ValueError):
+    """입력 기록 형식 오류"""
+
+
+def parse_input_log(events):
+    """inputLog를 시간 순으로 정렬된 (시간, 레인, 누름 여부) 배열로 변환
+
+    Raises:
+        ReplayError: 형식이 잘못되었거나 입력 수가 MAX_INPUT_EVENTS를 넘는 경우.
+    """
+    if not isinstance(events, list):
+        raise ReplayError('입력 기록은 [시간, 레인, 동작] 배열의 목록이어야 합니다.')
+    if len(events) > MAX_INPUT_EVENTS:
+        raise ReplayError(f'입력 기록은 최대 {MAX_INPUT_EVENTS}개까지 보낼 수 있습니다.')
+    if not events:
+        empty = np.zeros(0)
+        return empty, empty.astype(np.int64), empty.astype(bool)
+
+    try:
+        if set(map(len, events)) != {3}:
+            raise ValueError
+        table = np.fromiter(itertools.chain.from_iterable(events), dtype=np.float64, count=3 * len(events))
+    except (TypeError, ValueError):
+        raise ReplayError('입력 기록은 [시간, 레인, 동작] 배열의 목록이어야 합니다.')
+    table = table.reshape(-1, 3)
+    if not np.isfinite(table).all():
+        raise ReplayError('입력 기록에 올바르지 않은 숫자가 있습니다.')
+    lanes, actions = table[:, 1], table[:, 2]
+    if (lanes != np.floor(lanes)).any() or (lanes < 0).any() or (lanes > 255).any():
+        raise ReplayError('레인 값이 올바르지 않습니다.')
+    if not np.isin(actions, (0, 1)).all():
+        raise ReplayError('동작 값은 0(뗌) 또는 1(누름)이어야 합니다.')
+
+    order = np.argsort(table[:, 0], kind='stable')
+    table = table[order]
+    return table[:, 0], table[:, 1].astype(np.int64), table[:, 2] == 1
+
+
+def _nearest(note_times, press_times):
+    """각 입력 시간에 가장 가까운 노트 인덱스와 시간 차이
+
+    거리가 같으면 먼저 나오는 노트 (프론트엔드의 순차 탐색과 같음)
+    """
+    position = np.searchsorted(note_times, press_times)
+    left = np.maximum(position - 1, 0)
+    right = np.minimum(position, len(note_times) - 1)
+    left_diff = np.abs(note_times[left] - press_times)
+    right_diff = np.abs(note_times[right] - press_times)
+    return np.where(right_diff < left_diff, right, left), np.minimum(left_diff, right_diff)
+
+
+def _nearest_available(times, available, press_time):
+    """miss 판정 범위 안의 남은 노트 중 가장 가까운 노트 인덱스 (없으면 -1)"""
+    window = JUDGEMENT_WINDOWS['miss']
+    position = bisect.bisect_left(times, press_time)
+    left = position - 1
+    while left >= 0 and not available[left] and press_time - times[left] <= window:
+        left -= 1
+    right = position
+    while right < len(times) and not available[right] and times[right] - press_time <= window:
+        right += 1
+
+    best, best_diff = -1, window
+    for index in (left, right):
+        if 0 <= index < len(times) and available[index]:
+            diff = abs(times[index] - press_time)
+            if diff < best_diff or (diff == best_diff and best < 0):
+                best, best_diff = index, diff
+    return best
+
+
+def _match_presses(note_times, is_hold, press_times):
+    """한 레인의 누름 입력을 노트와 매칭
+
+    입력과 노트가 모두 시간 순이므로 가장 가까운 노트는 한 번의 searchsorted로 구합니다.
+    같은 노트를 노린 입력이 있을 때만 입력 순서대로 한 번 훑으며 이미 소비된 노트를 건너뜁니다
+    (입력을 하나씩 처리하는 프론트엔드와 같은 결과).
+
+    Returns:
+        np.ndarray: 입력별 매칭된 노트 인덱스 (매칭되지 않으면 -1)
+    """
+    matched = np.full(len(press_times), -1, dtype=np.int64)
+    if not len(note_times) or not len(press_times):
+        return matched
+
+    miss_window, good_window = JUDGEMENT_WINDOWS['miss'], JUDGEMENT_WINDOWS['good']
+    claims, diff = _nearest(note_times, press_times)
+    presses = np.flatnonzero(diff <= miss_window)
+    # 같은 노트를 노린 입력이 없으면 가장 가까운 노트가 그대로 답
+    group = claims[presses]
+    if not (group[1:] == group[:-1]).any():
+        taken = presses[~(is_hold[group] & (diff[presses] > good_window))]
+        matched[taken] = claims[taken]
+        return matched
+
+    times = note_times.tolist()
+    holds = is_hold.tolist()
+    available = bytearray(b'\x01') * len(times)
+    press_list = press_times.tolist()
+    claim_list = claims.tolist()
+    for index in presses.tolist():
+        note = claim_list[index]
+        press_time = press_list[index]
+        if not available[note]:
+            note = _nearest_available(times, available, press_time)
+            if note < 0:
+                continue
+        if holds[note] and abs(times[note] - press_time) > good_window:
+            continue
+        available[note] = 0
+        matched[index] = note
+    return matched
+
+
+def _calculate_accuracy(perfect, great, good, miss):
+    # useNoteJudgement.ts calculateAccuracy (bad는 항상 0)
+    total = perfect + great + good + miss
+    if total == 0:
+        return 0
+    weighted_sum = (perfect * 1.0 + great * 0.8 + good * 0.5 + 0 * 0.2) * 100
+    return int(np.floor(weighted_sum / total + 0.5))  # Math.round
+
+
+def _calculate_rank(accuracy, perfect, total_notes):
+    # useNoteJudgement.ts calculateRank
+    if perfect == total_notes and total_notes > 0:
+        return 'SS'
+    for threshold, rank in ((98, 'SS'), (95, 'S'), (85, 'A'), (75, 'B'), (60, 'C'), (50, 'D')):
+        if accuracy >= threshold:
+            return rank
+    return 'F'
+
+
+def replay(notes, events):
+    """입력 기록으로 결과를 다시 계산
+
+    Args:
+        notes (NoteColumns): 시간 순으로 정렬된 차트 노트.
+        events: parse_input_log 결과 (시간, 레인, 누름 여부).
+
+    Returns:
+        dict: score, accuracy, rank, perfect, great, good, miss, earlyCount, lateCount,
+        maxCombo, isFullCombo, isAllPerfect (Result 필드 이름과 같음),
+        laneStats (레인 번호 순 [노트 수, miss 수] 목록)
+    """
+    input_times, input_lanes, pressed = events
+    note_times = notes.time.astype(np.float64)
+    is_hold = (notes.type == HOLD_TYPE) & (notes.duration != NO_DURATION)
+    note_ends = note_times + np.where(is_hold, notes.duration, 0)
+
+    # 노트별 입력 매칭 (레인 수만큼만 반복)
+    press_of_note = np.full(len(notes), -1, dtype=np.int64)
+    release_of_note = np.full(len(notes), np.inf)
+    for lane in np.unique(notes.lane):
+        lane_notes = np.flatnonzero(notes.lane == lane)
+        lane_inputs = input_lanes == lane
+        lane_presses = np.flatnonzero(lane_inputs & pressed)
+        matched = _match_presses(note_times[lane_notes], is_hold[lane_notes], input_times[lane_presses])
+        hit = matched >= 0
+        hit_notes = lane_notes[matched[hit]]
+        press_of_note[hit_notes] = lane_presses[hit]
+
+        # 롱노트: 누른 뒤 같은 레인에서 처음 뗀 시간
+        releases = input_times[lane_inputs & ~pressed]
+        holds = hit_notes[is_hold[hit_notes]]
+        if len(holds) and len(releases):
+            position = np.searchsorted(releases, input_times[press_of_note[holds]], side='right')
+            found = position < len(releases)
+            release_of_note[holds[found]] = releases[position[found]]
+
+    hit = press_of_note >= 0
+    press_times = np.full(len(notes), np.nan)
+    press_times[hit] = input_times[press_of_note[hit]]
+    diff = np.abs(note_times - press_times)
+
+    judgement = np.full(len(notes), MISS, dtype=np.int64)
+    judgement[hit & (diff <= JUDGEMENT_WINDOWS['good'])] = GOOD
+    judgement[hit & (diff <= JUDGEMENT_WINDOWS['great'])] = GREAT
+    judgement[hit & (diff <= JUDGEMENT_WINDOWS['perfect'])] = PERFECT
+    # 판정 시간: 일반 노트는 누른 시간, 롱노트는 끝 시간 또는 뗀 시간, 놓친 노트는 자동 miss 시간
+    event_times = np.where(hit, press_times, note_ends + AUTO_MISS_TIME)
+    held = hit & is_hold
+    completed = held & (release_of_note >= note_ends)
+    judgement[held] = np.where(completed[held], PERFECT, MISS)
+    event_times[held] = np.where(completed[held], note_ends[held], release_of_note[held])
+    base_scores = np.zeros(len(notes), dtype=np.float64)
+    tap_hit = ~is_hold & (judgement != MISS)
+    base_scores[tap_hit] = np.asarray(TAP_SCORES, dtype=np.float64)[judgement[tap_hit]]
+    base_scores[completed] = HOLD_SCORE
+
+    # 콤보: 판정 직전의 마지막 구간 콤보 수 (콤보가 끊기면 새 구간이 1부터 시작)
+    order = np.argsort(event_times, kind='stable')
+    is_hit = judgement[order] != MISS
+    hits_total = np.cumsum(is_hit)
+    hits_before = hits_total - is_hit
+    last_break = np.maximum.accumulate(np.where(is_hit, -1, np.arange(len(order))))
+    previous_break = np.concatenate(([-1], last_break[:-1]))
+    broken = previous_break >= 0
+    combo_before = hits_before - np.where(broken, hits_total[np.maximum(previous_break, 0)], 0) + broken
+
+    multiplier = np.minimum(1 + np.floor(combo_before / COMBO_STEP) * 0.05, 1.5)
+    score = int(np.floor(base_scores[order] * multiplier)[is_hit].sum())
+    segment_combo = np.where(is_hit, combo_before + 1, 1)
+
+    counts = np.bincount(judgement, minlength=4)
+    perfect, great, good, miss = (int(count) for count in counts)
+    accuracy = _calculate_accuracy(perfect, great, good, miss)
+    # 일반 노트 입력만 빠름/느림 집계 (miss 판정 입력 포함)
+    tapped = hit & ~is_hold
+    early = int(np.count_nonzero(press_times[tapped] < note_times[tapped]))
+    lane_count = int(notes.lane.max()) + 1 if len(notes) else 0
+    lane_notes = np.bincount(notes.lane, minlength=lane_count)
+    lane_misses = np.bincount(notes.lane[judgement == MISS], minlength=lane_count)
+
+    return {
+        'score': score,
+        'accuracy': accuracy,
+        'rank': _calculate_rank(accuracy, perfect, perfect + great + good + miss),
+        'perfect': perfect,
+        'great': great,
+        'good': good,
+        'miss': miss,
+        'earlyCount': early,
+        'lateCount': int(np.count_nonzero(tapped)) - early,
+        'maxCombo': int(segment_combo.max()) if len(segment_combo) else 0,
+        'isFullCombo': miss == 0,
+        'isAllPerfect': miss == 0 and great == 0 and good == 0,
+        'laneStats': np.stack([lane_notes, lane_misses], axis=1).tolist(),
+    }
+
+
+def replay_chart(chart, input_log):
+    """차트 노트로 inputLog를 다시 판정 (노트는 차트 캐시의 노트 블록에서 읽음)"""
+    notes = unpack_notes(get_notes_payload(chart, BINARY_FORMAT))
+    return replay(notes, parse_input_log(input_log))
@@ -0,0 +1,312 @@
+"""
+오래된 결과 보관 (열 단위 세그먼트 파일)
+
+archive_results 명령이 오래된 Result 행(유저의 차트별 최고 기록 제외)을 세그먼트 파일로 옮기고
+DB에서 삭제합니다. 세그먼트는 한 번 쓰면 바뀌지 않고, 새 결과는 새 세그먼트로만 추가됩니다.
+user_results / chart_results 페이지네이션이 DB 행 다음 순서에 오는 보관된 결과를
+메모리 매핑(np.load mmap_mode='r')으로 필요한 행만 읽어 이어 붙입니다.
+유저나 차트가 삭제되어도 세그먼트는 다시 쓰지 않으므로, 읽는 쪽(페이지, 내보내기, 통계 재계산)에서
+지금 있는 유저와 차트의 결과만 사용합니다 (DB 결과가 CASCADE로 지워지는 것과 같은 결과).
+
+세그먼트 디렉터리 (RESULT_ARCHIVE_DIR/segment-000001/)
+    meta.json                       행 수, 필드별 최댓값, 사전 열의 값 목록
+    <필드>.npy                      숫자 열 (행은 id 순, 필드마다 필요한 만큼 좁은 dtype)
+    <필드>.npy (musicId, rank)      사전 열: meta.json 값 목록의 인덱스
+    <필드>.data.npy / .offsets.npy  가변 길이 열 (comboData, laneStats JSON)
+    index.<필터>.<정렬>.npy         (필터 오름차순, 정렬 필드 내림차순, id 내림차순) 순 행 번호
+    index.<필터>.<정렬>.keys.npy    위 순서의 필터 값 (searchsorted용)
+
+np.savez_compressed로 압축한 배열은 메모리 매핑할 수 없으므로, 열마다 좁은 dtype과
+사전/가변 길이 인코딩을 쓴 .npy 파일로 저장합니다.
+"""
+import datetime
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from .models import Chart, Result
+
+SEGMENT_PREFIX = 'segment-'
+NULL_INT = np.iinfo(np.int64).min  # verifiedScore가 null인 행
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# archive_results가 DB에서 읽는 Result 필드 (values_list 순서)
+FIELDS = (
+    'id', 'user_id', 'chart_id', 'musicId', 'difficulty', 'score', 'accuracy', 'rank', 'comboData', 'maxCombo',
+    'isFullCombo', 'isAllPerfect', 'earlyCount', 'lateCount', 'perfect', 'great', 'good', 'miss', 'bad',
+    'verifiedScore', 'laneStats', 'playedAt',
+)
+NUMERIC_COLUMNS = {
+    'id': '<i8',
+    'user_id': '<i8',
+    'chart_id': '<i8',
+    'difficulty': '<i2',
+    'score': '<i4',
+    'accuracy': '<f8',
+    'maxCombo': '<i4',
+    'isFullCombo': '?',
+    'isAllPerfect': '?',
+    'earlyCount': '<i4',
+    'lateCount': '<i4',
+    'perfect': '<i4',
+    'great': '<i4',
+    'good': '<i4',
+    'miss': '<i4',
+    'bad': '<i4',
+    'verifiedScore': '<i8',
+    'playedAt': '<i8',  # UTC 기준 마이크로초
+}
+DICTIONARY_COLUMNS = ('musicId', 'rank')
+BLOB_COLUMNS = ('comboData', 'laneStats')
+
+# (필터 필드, 정렬 필드): user_results는 유저별 최근 플레이 순, chart_results는 차트별 점수/콤보 순
+INDEXES = (('user_id', 'playedAt'), ('chart_id', 'score'), ('chart_id', 'maxCombo'))
+
+
+def to_micros(value):
+    return (value - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def _from_micros(value):
+    return EPOCH + datetime.timedelta(microseconds=int(value))
+
+
+def _encode_key(field, value):
+    """페이지네이션 키 값을 세그먼트 열 값으로 변환"""
+    return to_micros(value) if field == 'playedAt' else value
+
+
+class Segment:
+    """보관된 결과 세그먼트 하나 (읽기 전용, 열은 처음 읽을 때 메모리 매핑)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'meta.json', encoding='utf-8') as file:
+            self.meta = json.load(file)
+        self._arrays = {}
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def array(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            path = self.path / f'{name}.npy'
+            try:
+                array = np.load(path, mmap_mode='r')
+            except ValueError:  # 길이 0인 배열은 매핑할 수 없음
+                array = np.load(path)
+            self._arrays[name] = array
+        return array
+
+    def values(self, name, rows=None):
+        """행 번호 목록(생략하면 전체)의 필드 값을 파이썬 값 목록으로 읽음"""
+        if name in DICTIONARY_COLUMNS:
+            codes = self.array(name) if rows is None else self.array(name)[rows]
+            choices = self.meta['dictionaries'][name]
+            return [choices[code] for code in codes.tolist()]
+        if name in BLOB_COLUMNS:
+            offsets = self.array(f'{name}.offsets')
+            rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+            # memmap 슬라이스는 행마다 객체를 만들므로 memoryview로 잘라서 읽음
+            data = memoryview(np.asarray(self.array(f'{name}.data')))
+            bounds = zip(offsets[rows].tolist(), offsets[rows + 1].tolist())
+            chunks = [bytes(data[start:end]) for start, end in bounds]
+            if name == 'laneStats':
+                return [json.loads(chunk) if chunk else None for chunk in chunks]
+            return chunks
+        column = self.array(name) if rows is None else self.array(name)[rows]
+        if name == 'playedAt':
+            return [_from_micros(value) for value in column.tolist()]
+        if name == 'verifiedScore':
+            return [None if value == NULL_INT else value for value in column.tolist()]
+        return column.tolist()
+
+    def page(self, field, value, ordering, after=None, until=None, limit=50):
+        """필터 값에 해당하는 행 번호를 (정렬 필드, id) 내림차순으로 반환
+
+        after보다 뒤, until보다 앞 (둘 다 (정렬 필드 값, id))인 행만 최대 limit개 반환합니다.
+        """
+        order_field = ordering[0]
+        if until is not None and self.meta['max'][order_field] < _encode_key(order_field, until[0]):
+            return np.zeros(0, dtype=np.int64)
+
+        name = f'index.{field}.{order_field}'
+        keys = self.array(f'{name}.keys')
+        lo, hi = np.searchsorted(keys, value, side='left'), np.searchsorted(keys, value, side='right')
+        rows = np.asarray(self.array(name)[lo:hi])
+        if not len(rows):
+            return rows
+        primary = self.array(order_field)[rows]
+        ids = self.array('id')[rows]
+
+        start = 0
+        if after is not None:
+            key, after_id = _encode_key(order_field, after[0]), after[1]
+            later = (primary < key) | ((primary == key) & (ids < after_id))
+            start = int(np.argmax(later)) if later.any() else len(rows)
+        stop = len(rows)
+        if until is not None:
+            key, until_id = _encode_key(order_field, until[0]), until[1]
+            earlier = (primary > key) | ((primary == key) & (ids > until_id))
+            stop = int(np.count_nonzero(earlier))
+        return rows[start:max(start, min(stop, start + limit))]
+
+    def results(self, rows):
+        """행 번호 목록을 저장되지 않은 Result 인스턴스로 변환 (user/chart는 연결하지 않음)"""
+        columns = {name: self.values(name, rows) for name in FIELDS}
+        results = []
+        for values in zip(*(columns[name] for name in FIELDS)):
+            result = Result(**dict(zip(FIELDS, values)))
+            result._state.adding = False
+            results.append(result)
+        return results
+
+
+def write_segment(path, rows):
+    """FIELDS 순서의 행 목록(id 순)을 세그먼트 디렉터리로 저장"""
+    path = Path(path)
+    path.mkdir(parents=True)
+    columns = dict(zip(FIELDS, zip(*rows)))
+    meta = {'rows': len(rows), 'dictionaries': {}, 'max': {}}
+
+    for name, dtype in NUMERIC_COLUMNS.items():
+        values = columns[name]
+        if name == 'playedAt':
+            values = [to_micros(value) for value in values]
+        elif name == 'verifiedScore':
+            values = [NULL_INT if value is None else value for value in values]
+        array = np.asarray(values, dtype=dtype)
+        np.save(path / f'{name}.npy', array)
+        columns[name] = array
+
+    for name in DICTIONARY_COLUMNS:
+        choices, codes = np.unique(np.asarray(columns[name], dtype=object).astype(str), return_inverse=True)
+        np.save(path / f'{name}.npy', codes.astype('<i4'))
+        meta['dictionaries'][name] = choices.tolist()
+
+    for name in BLOB_COLUMNS:
+        if name == 'laneStats':
+            chunks = [b'' if value is None else json.dumps(value, separators=(',', ':')).encode('utf-8') for value in columns[name]]
+        else:
+            chunks = [bytes(value) for value in columns[name]]
+        offsets = np.zeros(len(chunks) + 1, dtype='<i8')
+        np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+        np.save(path / f'{name}.offsets.npy', offsets)
+        np.save(path / f'{name}.data.npy', np.frombuffer(b''.join(chunks), dtype=np.uint8))
+
+    for field, order_field in INDEXES:
+        order = np.lexsort((-columns['id'], -columns[order_field].astype(np.int64), columns[field]))
+        np.save(path / f'index.{field}.{order_field}.npy', order.astype('<i4'))
+        np.save(path / f'index.{field}.{order_field}.keys.npy', columns[field][order])
+        meta['max'][order_field] = int(columns[order_field].max())
+
+    meta['ids'] = [int(columns['id'][0]), int(columns['id'][-1])]
+    with open(path / 'meta.json', 'w', encoding='utf-8') as file:
+        json.dump(meta, file)
+
+
+class ResultArchive:
+    """RESULT_ARCHIVE_DIR 아래 세그먼트 목록"""
+
+    def __init__(self, path=None):
+        self._path = path
+        self._segments = {}
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return Path(self._path or settings.RESULT_ARCHIVE_DIR)
+
+    def segments(self):
+        """세그먼트 목록 (이름 순). 새로 추가된 세그먼트만 열어서 캐시에 추가"""
+        try:
+            names = sorted(name for name in os.listdir(self.path) if name.startswith(SEGMENT_PREFIX))
+        except FileNotFoundError:
+            return []
+        paths = [self.path / name for name in names]
+        with self._lock:
+            # 경로로 캐시하므로 RESULT_ARCHIVE_DIR이 바뀌면 같은 이름의 다른 세그먼트를 새로 엶
+            for path in paths:
+                if path not in self._segments:
+                    self._segments[path] = Segment(path)
+            return [self._segments[path] for path in paths]
+
+    def add_segment(self, rows):
+        """새 세그먼트를 임시 디렉터리에 쓴 뒤 이름을 바꿔 추가 (읽는 쪽은 완성된 세그먼트만 봄)"""
+        existing = self.segments()
+        number = int(existing[-1].path.name[len(SEGMENT_PREFIX):]) + 1 if existing else 1
+        final = self.path / f'{SEGMENT_PREFIX}{number:06d}'
+        temporary = self.path / f'.tmp-{final.name}'
+        if temporary.exists():
+            shutil.rmtree(temporary)
+        write_segment(temporary, rows)
+        os.rename(temporary, final)
+        return self.segments()[-1]
+
+    def page(self, field, value, ordering, after=None, until=None, limit=50):
+        """모든 세그먼트에서 필터 값에 해당하는 결과를 (정렬 필드, id) 내림차순으로 최대 limit개 반환
+
+        결과에는 user/chart를 연결하며, 유저나 차트가 삭제된 결과는 건너뜁니다.
+        """
+        results = []
+        while len(results) < limit:
+            candidates = []
+            for segment in self.segments():
+                rows = segment.page(field, value, ordering, after, until, limit - len(results))
+                if len(rows):
+                    candidates += segment.results(rows)
+            if not candidates:
+                break
+            candidates.sort(key=lambda result: _sort_key(result, ordering), reverse=True)
+            candidates = candidates[:limit - len(results)]
+            results += _attach_relations(candidates)
+            after = _sort_key(candidates[-1], ordering)
+        return results
+
+    def live_ids(self):
+        """지금 있는 (유저 ID 배열, 차트 ID 배열) - live_mask에 넘김"""
+        user_ids = get_user_model().objects.values_list('id', flat=True)
+        chart_ids = Chart.objects.values_list('id', flat=True)
+        return (
+            np.fromiter(user_ids.iterator(), dtype=np.int64),
+            np.fromiter(chart_ids.iterator(), dtype=np.int64),
+        )
+
+    def iter_values(self, names):
+        """세그먼트마다 지금 있는 유저와 차트의 결과만 {필드: 값 목록}으로 반환 (통계 재계산용)"""
+        user_ids, chart_ids = self.live_ids()
+        for segment in self.segments():
+            rows = np.flatnonzero(live_mask(segment, user_ids, chart_ids))
+            yield {name: segment.values(name, rows) for name in names}
+
+
+def live_mask(segment, user_ids, chart_ids):
+    """세그먼트 행 중 유저와 차트가 남아 있는 행의 불리언 마스크"""
+    return np.isin(segment.array('user_id'), user_ids) & np.isin(segment.array('chart_id'), chart_ids)
+
+
+def _sort_key(result, ordering):
+    return tuple(getattr(result, field) for field in ordering)
+
+
+def _attach_relations(results):
+    users = get_user_model().objects.only('id', 'nickname').in_bulk({result.user_id for result in results})
+    charts = Chart.objects.only('id', 'title').in_bulk({result.chart_id for result in results})
+    attached = []
+    for result in results:
+        user, chart = users.get(result.user_id), charts.get(result.chart_id)
+        if user is None or chart is None:
+            continue
+        result.user, result.chart = user, chart
+        attached.append(result)
+    return attached
+
+
+result_archive = ResultArchive()
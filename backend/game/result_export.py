@@ -0,0 +1,154 @@
+"""
+결과 / 랭킹 내보내기 (NDJSON, CSV 스트리밍)
+
+GET /results/export/ 와 export_results 명령이 같은 생성기를 사용합니다.
+values_list 프로젝션을 .iterator(chunk_size=...)로 읽고 chunk_size 행마다 문자열 하나를 내보내므로,
+내보내는 행 수와 관계없이 메모리 사용량은 chunk_size 행 분량으로 일정합니다.
+
+결과는 archive_results로 보관된 결과(세그먼트)를 먼저, 그 다음 DB의 결과를 id 순으로 내보냅니다.
+"""
+import csv
+import datetime
+import io
+import json
+
+import numpy as np
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Rank, Result
+from .result_archive import live_mask, to_micros, result_archive
+
+TABLE_RESULTS = 'results'
+TABLE_RANKS = 'ranks'
+FORMAT_NDJSON = 'ndjson'
+FORMAT_CSV = 'csv'
+FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+CONTENT_TYPES = {FORMAT_NDJSON: 'application/x-ndjson', FORMAT_CSV: 'text/csv; charset=utf-8'}
+CHUNK_SIZE = 2000
+
+# 내보내는 열 (comboData 같은 바이너리 열은 제외)
+RESULT_EXPORT_FIELDS = (
+    'id', 'user_id', 'chart_id', 'musicId', 'difficulty', 'score', 'accuracy', 'rank', 'maxCombo',
+    'isFullCombo', 'isAllPerfect', 'earlyCount', 'lateCount', 'perfect', 'great', 'good', 'miss', 'bad',
+    'verifiedScore', 'laneStats', 'playedAt',
+)
+RANK_EXPORT_FIELDS = ('id', 'user_id', 'chart_id', 'chart__musicId', 'score')
+TABLE_FIELDS = {TABLE_RESULTS: RESULT_EXPORT_FIELDS, TABLE_RANKS: RANK_EXPORT_FIELDS}
+CSV_CONVERTERS = {
+    'laneStats': lambda value: json.dumps(value, separators=(',', ':')),
+    'playedAt': datetime.datetime.isoformat,
+}
+
+
+class ExportError(ValueError):
+    """내보내기 조건 오류"""
+
+
+def parse_since(value):
+    """since 값(날짜 또는 ISO 8601 일시)을 aware datetime으로 변환"""
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ExportError('since 값은 YYYY-MM-DD 또는 ISO 8601 일시여야 합니다.')
+        since = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def iter_rows(table, chart_id=None, user_id=None, since=None, chunk_size=CHUNK_SIZE):
+    """TABLE_FIELDS[table] 순서의 튜플을 하나씩 반환
+
+    since는 결과의 플레이 시간에만 적용됩니다 (랭킹은 시간 정보가 없음).
+    """
+    fields = TABLE_FIELDS[table]
+    if table == TABLE_RESULTS:
+        yield from _iter_archived(chart_id, user_id, since, chunk_size)
+        queryset = Result.objects.all()
+        if since is not None:
+            queryset = queryset.filter(playedAt__gte=since)
+    else:
+        queryset = Rank.objects.all()
+    if chart_id is not None:
+        queryset = queryset.filter(chart_id=chart_id)
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+    yield from queryset.order_by('id').values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def _iter_archived(chart_id, user_id, since, chunk_size):
+    segments = result_archive.segments()
+    if not segments:
+        return
+    # 세그먼트에 남아 있는 삭제된 유저/차트의 결과는 내보내지 않음
+    user_ids, chart_ids = result_archive.live_ids()
+    for segment in segments:
+        mask = live_mask(segment, user_ids, chart_ids)
+        if chart_id is not None:
+            mask &= segment.array('chart_id') == chart_id
+        if user_id is not None:
+            mask &= segment.array('user_id') == user_id
+        if since is not None:
+            mask &= segment.array('playedAt') >= to_micros(since)
+        rows = np.flatnonzero(mask)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            yield from zip(*(segment.values(field, chunk) for field in RESULT_EXPORT_FIELDS))
+
+
+def iter_ndjson(fields, rows, chunk_size=CHUNK_SIZE):
+    """행마다 JSON 객체 한 줄, chunk_size 줄씩 묶어서 반환"""
+    encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=_encode_value)
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(fields, row))))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_csv(fields, rows, chunk_size=CHUNK_SIZE):
+    """헤더 줄 다음에 행마다 CSV 한 줄, chunk_size 줄씩 묶어서 반환 (JSON 열은 JSON 문자열)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(fields)
+    converters = [(i, CSV_CONVERTERS[field]) for i, field in enumerate(fields) if field in CSV_CONVERTERS]
+    count = 0
+    for row in rows:
+        if converters:
+            row = list(row)
+            for i, convert in converters:
+                if row[i] is not None:
+                    row[i] = convert(row[i])
+        writer.writerow(row)
+        count += 1
+        if count >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue()
+
+
+def export(table, output_format, rows, chunk_size=CHUNK_SIZE):
+    """iter_rows 결과를 output_format 문자열 묶음으로 반환하는 생성기"""
+    serialize = iter_csv if output_format == FORMAT_CSV else iter_ndjson
+    return serialize(_public_fields(TABLE_FIELDS[table]), rows, chunk_size)
+
+
+def _public_fields(fields):
+    # 열 이름은 ResultSerializer 응답과 같은 형태로 (user_id -> user, chart__musicId -> musicId)
+    names = {'user_id': 'user', 'chart_id': 'chart', 'chart__musicId': 'musicId'}
+    return tuple(names.get(field, field) for field in fields)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} 값은 내보낼 수 없습니다.')
@@ -0,0 +1,344 @@
+"""
+결과 저장 write-behind 큐
+
+RESULT_INGEST_MODE = 'queue'일 때 create_result는 검증된 결과를 저널 파일에 한 줄 추가하고
+메모리 큐에 넣은 뒤 바로 응답합니다. 백그라운드 스레드가 RESULT_QUEUE_FLUSH_INTERVAL_MS마다
+(또는 RESULT_QUEUE_FLUSH_SIZE개가 모이면) 한 트랜잭션으로 모아서 저장합니다.
+
+저널은 추가만 하는 NDJSON 파일입니다.
+- {"seq": n, "user": 유저 ID, "chart": 차트 ID, "data": {...}}: 큐에 넣은 결과
+- {"ack": [n, ...]}: 저장이 끝난 결과 순번 목록
+
+저널은 프로세스마다 따로 쓰고(RESULT_JOURNAL_PATH에 pid와 시작 시각을 붙인 파일), 사용하는 동안 파일을 잠가 둡니다.
+잠금은 프로세스가 끝나면 풀리므로 잠글 수 있는 저널은 종료된 프로세스가 남긴 것입니다.
+큐가 시작될 때(서버 프로세스의 첫 요청, game.apps) 그런 저널의 ack되지 않은 결과를 자기 저널로 옮겨 다시 저장하고
+남은 파일을 삭제합니다. 서버가 실행 중이 아니면 flush_result_journal 명령으로 바로 저장할 수 있습니다.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, close_old_connections, transaction
+
+from .models import Chart
+from .results import build_result, save_results
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 한 프로세스만 사용한다고 가정
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAX_FLUSH_RETRIES = 5
+
+
+class ResultJournal:
+    """추가 전용 결과 저널"""
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+        self.last_seq = 0  # pending()이 읽은 가장 큰 순번
+
+    def lock(self):
+        """저널 파일을 이 프로세스가 쓰도록 잠금. 다른 프로세스가 사용 중이면 False
+
+        잠그기 전에 다른 프로세스가 먼저 가져가서 삭제한 파일이면 False를 반환합니다.
+        """
+        file = self._open()
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.close()
+            return False
+        if not os.path.exists(self.path) or os.stat(self.path).st_ino != os.fstat(file.fileno()).st_ino:
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        """저널 파일 삭제 (잠근 상태에서 호출)"""
+        os.remove(self.path)
+        self.close()
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def _write(self, record):
+        file = self._open()
+        file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        file.flush()
+        if self.fsync:
+            os.fsync(file.fileno())
+
+    def append(self, seq, user_id, chart_id, data):
+        with self._lock:
+            self._write({'seq': seq, 'user': user_id, 'chart': chart_id, 'data': data})
+
+    def ack(self, seqs):
+        """저장이 끝난 결과 순번 기록"""
+        with self._lock:
+            self._write({'ack': seqs})
+
+    def compact(self):
+        """저장 대기 중인 결과가 없을 때 파일을 비움"""
+        with self._lock:
+            self._open().truncate(0)
+
+    def pending(self):
+        """ack되지 않은 결과 레코드 목록 (seq 순)"""
+        if not os.path.exists(self.path):
+            return []
+        entries = {}
+        acked = set()
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:  # 쓰는 도중 종료된 마지막 줄
+                    continue
+                if 'ack' in record:
+                    acked.update(record['ack'])
+                else:
+                    entries[record['seq']] = record
+        self.last_seq = max(entries, default=0)
+        return [entries[seq] for seq in sorted(entries) if seq not in acked]
+
+
+def process_journal_path():
+    """이 프로세스의 저널 경로 (같은 pid를 다시 쓰는 재시작과도 겹치지 않도록 시작 시각 포함)"""
+    path = Path(settings.RESULT_JOURNAL_PATH)
+    return path.with_name(f'{path.stem}.{os.getpid()}-{time.time_ns()}{path.suffix}')
+
+
+def orphaned_journals(exclude=None):
+    """종료된 프로세스가 남긴 저널을 잠근 상태로 반환 (pid를 붙이기 전의 RESULT_JOURNAL_PATH 포함)"""
+    path = Path(settings.RESULT_JOURNAL_PATH)
+    candidates = sorted(path.parent.glob(f'{path.stem}.*{path.suffix}'))
+    if path.exists():
+        candidates.insert(0, path)
+    for candidate in candidates:
+        if candidate == exclude:
+            continue
+        journal = ResultJournal(candidate, settings.RESULT_JOURNAL_FSYNC)
+        if journal.lock():
+            yield journal
+
+
+def _unsaved(records, error):
+    """저장 중 OperationalError가 났을 때 아직 저장되지 않은 레코드 (_save_each가 표시)"""
+    return getattr(error, 'unsaved', records)
+
+
+class ResultQueue:
+    """결과 write-behind 큐와 저장 스레드"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._seq = 0
+        self._in_flight = 0
+        self.journal = None
+        self.metrics = {
+            'enqueued': 0,
+            'flushed': 0,
+            'failed': 0,
+            'batches': 0,
+            'lastFlushMs': None,
+            'maxFlushMs': 0.0,
+            'totalFlushMs': 0.0,
+        }
+
+    def start(self):
+        """이 프로세스의 저널을 만들고, 종료된 프로세스의 저널에 남은 결과를 옮겨 큐에 넣은 뒤
+        저장 스레드 시작 (처음 한 번만)"""
+        with self._lock:
+            if self._started:
+                return
+            self.journal = ResultJournal(process_journal_path(), settings.RESULT_JOURNAL_FSYNC)
+            self.journal.lock()
+            recovered = 0
+            for orphan in orphaned_journals(exclude=self.journal.path):
+                for record in orphan.pending():
+                    # 새 순번으로 이 프로세스 저널에 먼저 기록한 뒤 이전 저널 삭제
+                    self._seq += 1
+                    record = {**record, 'seq': self._seq}
+                    self.journal.append(record['seq'], record['user'], record['chart'], record['data'])
+                    self._queue.put(record)
+                    recovered += 1
+                orphan.remove()
+            if recovered:
+                logger.info('이전 프로세스의 결과 저널에서 %d개를 다시 저장합니다.', recovered)
+            threading.Thread(target=self._run, name='result-queue', daemon=True).start()
+            self._started = True
+
+    def put(self, user_id, chart_id, data):
+        """결과를 저널에 기록하고 큐에 추가. 결과 순번(seq) 반환"""
+        self.start()
+        with self._lock:
+            self._seq += 1
+            record = {'seq': self._seq, 'user': user_id, 'chart': chart_id, 'data': data}
+            self.journal.append(record['seq'], user_id, chart_id, data)
+            self._queue.put(record)
+            self.metrics['enqueued'] += 1
+        return record['seq']
+
+    def stats(self):
+        batches = self.metrics['batches']
+        return {
+            **self.metrics,
+            'depth': self._queue.qsize() + self._in_flight,
+            'avgFlushMs': self.metrics['totalFlushMs'] / batches if batches else None,
+        }
+
+    def _run(self):
+        interval = settings.RESULT_QUEUE_FLUSH_INTERVAL_MS / 1000
+        size = settings.RESULT_QUEUE_FLUSH_SIZE
+        while True:
+            batch = [self._queue.get()]
+            self._in_flight = 1
+            deadline = time.monotonic() + interval
+            while len(batch) < size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                self._in_flight = len(batch)
+
+            close_old_connections()
+            try:
+                self._flush(batch)
+            except OperationalError as e:
+                # DB를 쓸 수 없음: 이미 저장한 결과는 ack하고, 나머지는 저널에 남아 있으므로 큐 뒤에 다시 넣고 잠시 후 재시도
+                unsaved = _unsaved(batch, e)
+                logger.exception('결과 큐 저장 실패, %d개를 다시 큐에 넣습니다.', len(unsaved))
+                with self._lock:
+                    self._ack_saved(self.journal, batch, unsaved)
+                    for record in unsaved:
+                        self._queue.put(record)
+                    self._in_flight = 0
+                time.sleep(interval)
+                continue
+            finally:
+                close_old_connections()
+
+            with self._lock:
+                self._in_flight = 0
+                if self._queue.empty():
+                    self.journal.compact()
+                else:
+                    self.journal.ack([record['seq'] for record in batch])
+
+    def flush_pending(self):
+        """저장 스레드 없이 종료된 프로세스의 저널에 남은 결과를 바로 저장 (flush_result_journal 명령용)"""
+        count = 0
+        for journal in orphaned_journals():
+            pending = journal.pending()
+            if pending:
+                try:
+                    self._flush(pending)
+                except OperationalError as e:
+                    self._ack_saved(journal, pending, _unsaved(pending, e))
+                    journal.close()
+                    raise
+            journal.remove()
+            count += len(pending)
+        return count
+
+    @staticmethod
+    def _ack_saved(journal, records, unsaved):
+        unsaved_seqs = {record['seq'] for record in unsaved}
+        saved = [record['seq'] for record in records if record['seq'] not in unsaved_seqs]
+        if saved:
+            journal.ack(saved)
+
+    def _flush(self, records):
+        """레코드 목록을 한 트랜잭션으로 저장
+
+        잠김 등 일시적 오류는 재시도하고, 그 외 오류가 나면 레코드를 하나씩 저장하여
+        문제가 되는 결과만 버립니다 (로그에 남김).
+        """
+        start = time.perf_counter()
+        for attempt in range(MAX_FLUSH_RETRIES):
+            try:
+                saved, failed = self._save(records)
+                break
+            except OperationalError:
+                if attempt == MAX_FLUSH_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+            except Exception:
+                saved, failed = self._save_each(records)
+                break
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics['flushed'] += saved
+        self.metrics['failed'] += failed
+        self.metrics['batches'] += 1
+        self.metrics['lastFlushMs'] = elapsed
+        self.metrics['maxFlushMs'] = max(self.metrics['maxFlushMs'], elapsed)
+        self.metrics['totalFlushMs'] += elapsed
+
+    def _save(self, records):
+        users = get_user_model().objects.in_bulk({record['user'] for record in records})
+        charts = Chart.objects.defer('notesData').in_bulk({record['chart'] for record in records})
+
+        by_user = {}
+        failed = 0
+        for record in records:
+            user, chart = users.get(record['user']), charts.get(record['chart'])
+            if user is None or chart is None:  # 큐에 있는 동안 유저/차트가 삭제됨
+                failed += 1
+                continue
+            by_user.setdefault(user, []).append(build_result(user, chart, record['data']))
+
+        with transaction.atomic():
+            for user, results in by_user.items():
+                save_results(user, results)
+        return sum(len(results) for results in by_user.values()), failed
+
+    def _save_each(self, records):
+        """레코드를 하나씩 저장 (각각 커밋). OperationalError가 나면 아직 저장하지 않은 레코드를
+        예외의 unsaved에 담아 다시 발생시킴 (이미 커밋한 레코드를 다시 저장하지 않도록)"""
+        saved = failed = 0
+        for index, record in enumerate(records):
+            try:
+                record_saved, record_failed = self._save([record])
+            except OperationalError as e:
+                e.unsaved = records[index:]
+                self.metrics['flushed'] += saved
+                self.metrics['failed'] += failed
+                raise
+            except Exception:
+                logger.exception('결과를 저장하지 못해 버립니다: %s', json.dumps(record))
+                record_saved, record_failed = 0, 1
+            saved += record_saved
+            failed += record_failed
+        return saved, failed
+
+
+result_queue = ResultQueue()
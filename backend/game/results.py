@@ -0,0 +1,102 @@
+"""
+게임 결과 저장
+
+결과 행 추가와 함께 최고 점수(Rank), 기간별 랭킹(PeriodRank), 전체 레이팅(PlayerRating),
+유저 통계(UserStats), 차트 통계(ChartStat)를 한 트랜잭션에서 갱신하고, 커밋 후 메모리 리더보드와 리더보드 캐시에 반영합니다.
+결과 여러 개를 저장할 때도 테이블마다 쿼리 한 번으로 처리합니다.
+"""
+from django.db import transaction
+
+from . import chart_stats, leaderboard_cache
+from .leaderboard import leaderboard_engine
+from .models import PERIOD_ALL, ChartStat, PeriodRank, PlayerRating, Rank, Result, UserStats, period_keys
+from .replay import replay_chart
+
+
+def build_result(user, chart, data):
+    """CreateResultSerializer로 검증된 데이터로 저장 전 Result 생성
+
+    입력 기록(inputLog)이 있으면 차트 노트로 다시 판정한 점수와 레인별 miss 수를
+    verifiedScore, laneStats에 저장합니다.
+    """
+    result = Result(
+        user=user,
+        chart=chart,
+        musicId=data['musicId'],
+        difficulty=chart.difficulty,
+        score=data['score'],
+        accuracy=data['accuracy'],
+        combo=data['combo'],
+        rank=data['rank'],
+        isFullCombo=data['isFullCombo'],
+        isAllPerfect=data['isAllPerfect'],
+        perfect=data.get('perfect', 0),
+        great=data.get('great', 0),
+        good=data.get('good', 0),
+        miss=data.get('miss', 0),
+        bad=data.get('bad', 0),
+        earlyCount=data.get('earlyCount', 0),
+        lateCount=data.get('lateCount', 0),
+    )
+    if data.get('inputLog') is not None:
+        replayed = replay_chart(chart, data['inputLog'])
+        result.verifiedScore = replayed['score']
+        result.laneStats = replayed['laneStats']
+    return result
+
+
+@transaction.atomic
+def save_results(user, results):
+    """한 유저의 Result 목록을 저장하고 랭킹/레이팅/유저 통계/차트 통계 갱신
+
+    Args:
+        user: 결과를 기록한 유저.
+        results (list): build_result로 만든 저장 전 Result 목록.
+
+    Returns:
+        list: 저장된 Result 목록
+    """
+    # 이전 최고 점수를 읽고 레이팅에 차이를 더하는 동안 같은 유저의 다른 저장이 끼어들지 않도록 직렬화
+    PlayerRating.objects.lock(user.id)
+    if len(results) == 1:
+        results[0].save()
+    else:
+        results = Result.objects.bulk_create(results)
+
+    charts = {}
+    best_scores = {}
+    period_scores = {}
+    for result in results:
+        charts[result.chart_id] = result.chart
+        best_scores[result.chart_id] = max(result.score, best_scores.get(result.chart_id, result.score))
+        for period in period_keys(result.playedAt).values():
+            key = (result.chart_id, period)
+            period_scores[key] = max(result.score, period_scores.get(key, result.score))
+
+    UserStats.objects.record_results(user.id, results)
+    ChartStat.objects.add_totals(chart_stats.bucket_totals(chart_stats.result_rows(results)))
+    changed = PeriodRank.objects.record_scores(user.id, period_scores)
+    improved = Rank.objects.record_scores(user.id, best_scores)
+    if improved:
+        # 전체 레이팅은 바뀐 최고 점수만큼만 반영
+        PlayerRating.objects.apply_delta(
+            user.id,
+            sum(
+                PlayerRating.rating_of(best_scores[chart_id] - (previous or 0), charts[chart_id].difficulty)
+                for chart_id, previous in improved.items()
+            ),
+            sum(1 for previous in improved.values() if previous is None),
+        )
+        changed += [(chart_id, PERIOD_ALL) for chart_id in improved]
+
+    transaction.on_commit(lambda: _publish(user.id, improved, changed, best_scores, period_scores))
+    return results
+
+
+def _publish(user_id, improved, changed, best_scores, period_scores):
+    """커밋된 점수 변경을 메모리 리더보드와 리더보드 캐시에 반영"""
+    for chart_id in improved:
+        leaderboard_engine.record(chart_id, user_id, best_scores[chart_id])
+    for chart_id, period in changed:
+        score = best_scores[chart_id] if period == PERIOD_ALL else period_scores[(chart_id, period)]
+        leaderboard_cache.record_score(chart_id, user_id, score, [period])
@@ -1,12 +1,16 @@
 from rest_framework import serializers
-from .models import Note, Chart, Rank, Result
-from .video_processor import process_video
+from .models import Note, Chart, PlayerRating, Rank, Result, VideoJob, TOP_RANK_LIMIT, VIDEO_PROCESSING
+from .combo_codec import ComboParseError, parse_combo
+from .note_ingest import NoteParseError, parse_notes
+from .note_validator import validate_notes
+from .replay import ReplayError, parse_input_log
+from . import media_files, video_jobs
 from ulid import ULID
 import cv2
 from django.core.files.base import ContentFile
 from django.conf import settings
+from django.db import transaction
 import os
-import json
 
 class NoteSerializer(serializers.ModelSerializer):
     """노트 시리얼라이저"""
@@ -14,9 +18,67 @@ class NoteSerializer(serializers.ModelSerializer):
         model = Note
         fields = '__all__'
 
-class ChartSerializer(serializers.ModelSerializer):
+def serialize_best_record(result):
+    """유저 최고 기록을 응답 형태로 변환"""
+    if result is None:
+        return None
+    return {
+        'accuracy': result.accuracy,
+        'combo': result.combo,
+        'maxCombo': result.maxCombo,
+        'score': result.score,
+        'rank': result.rank,
+        'isFullCombo': result.isFullCombo,
+        'isAllPerfect': result.isAllPerfect,
+    }
+
+class ChartRecordFieldsMixin:
+    """차트의 ranks / userBestRecord 필드
+
+    ChartQuerySet.with_top_ranks() / with_user_best()로 prefetch된 topRanks /
+    userBestResults가 있으면 그대로 사용하고, 없을 때만 차트별로 조회합니다.
+    """
+
+    def get_ranks(self, obj):
+        ranks = getattr(obj, 'topRanks', None)
+        if ranks is None:
+            ranks = obj.ranks.select_related('user').order_by('-score', 'user')[:TOP_RANK_LIMIT]
+        return RankSerializer(ranks, many=True, context=self.context).data
+
+    def get_userBestRecord(self, obj):
+        request = self.context.get('request')
+        if not request or not request.user.is_authenticated:
+            return None
+
+        best_results = getattr(obj, 'userBestResults', None)
+        if best_results is None:
+            best_result = Result.objects.filter(
+                chart=obj,
+                user=request.user
+            ).order_by('-score', 'id').first()
+        else:
+            best_result = best_results[0] if best_results else None
+
+        return serialize_best_record(best_result)
+
+class ChartListSerializer(ChartRecordFieldsMixin, serializers.ModelSerializer):
+    """차트 목록 시리얼라이저 (노트 없이 요약 정보만 포함)"""
+    topScore = serializers.IntegerField(read_only=True, allow_null=True)
+    ranks = serializers.SerializerMethodField()
+    userBestRecord = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Chart
+        fields = (
+            'musicId', 'title', 'song', 'backgroundVideo', 'coverUrl',
+            'isCommunitySong', 'artist', 'bpm', 'difficulty', 'creator', 'videoStatus',
+            'noteCount', 'topScore', 'ranks', 'userBestRecord'
+        )
+        read_only_fields = fields
+
+class ChartSerializer(ChartRecordFieldsMixin, serializers.ModelSerializer):
     """차트 시리얼라이저"""
-    notes = NoteSerializer(many=True, read_only=True)
+    notes = serializers.SerializerMethodField()
     ranks = serializers.SerializerMethodField()
     userBestRecord = serializers.SerializerMethodField()
     musicFile = serializers.FileField(write_only=True)
@@ -27,42 +89,41 @@ class ChartSerializer(serializers.ModelSerializer):
         model = Chart
         fields = (
             'musicId', 'title', 'song', 'backgroundVideo', 'coverUrl', 
-            'isCommunitySong', 'artist', 'bpm', 'difficulty', 'creator',
+            'isCommunitySong', 'artist', 'bpm', 'difficulty', 'creator', 'videoStatus',
             'notes', 'ranks', 'userBestRecord', 'musicFile', 'coverFile', 'notes_data'
         )
-        read_only_fields = ('musicId', 'song', 'backgroundVideo', 'coverUrl', 'creator', 'isCommunitySong')
+        read_only_fields = ('musicId', 'song', 'backgroundVideo', 'coverUrl', 'creator', 'isCommunitySong', 'videoStatus')
 
-    def get_ranks(self, obj):
-        ranks = obj.ranks.order_by('-score')[:10]
-        return RankSerializer(ranks, many=True, context=self.context).data
-    
-    def get_userBestRecord(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return None
-        
-        best_result = Result.objects.filter(
-            chart=obj,
-            user=request.user
-        ).order_by('-score').first()
-        
-        if best_result:
-            return {
-                'accuracy': best_result.accuracy,
-                'combo': best_result.combo,
-                'score': best_result.score,
-                'rank': best_result.rank,
-                'isFullCombo': best_result.isFullCombo,
-                'isAllPerfect': best_result.isAllPerfect,
-            }
-        return None
+    def get_fields(self):
+        fields = super().get_fields()
+        # 압축 포맷 응답은 노트를 별도로 인코딩하므로 제외
+        if self.context.get('exclude_notes'):
+            fields.pop('notes')
+        return fields
+
+    def validate_notes_data(self, value):
+        """노트 JSON을 파싱/검증하여 NoteColumns로 변환 (파일 저장 전에 검증)"""
+        try:
+            notes = parse_notes(value)
+        except NoteParseError as e:
+            raise serializers.ValidationError(str(e))
+
+        # 저장 시 시간 순으로 정렬하므로 정렬 여부는 검사하지 않음
+        report = validate_notes(notes, require_sorted=False)
+        if not report.is_valid:
+            raise serializers.ValidationError(report.messages())
+        return notes
+
+    def get_notes(self, obj):
+        # 노트 블록에는 노트 ID가 없으므로 차트 내 순번을 ID로 사용
+        return [{**note_data, 'chart': obj.id} for note_data in obj.iter_notes()]
 
     def create(self, validated_data):
         import posixpath
         request = self.context['request']
         music_file = validated_data.pop('musicFile')
         cover_file = validated_data.pop('coverFile', None)
-        notes_data_str = validated_data.pop('notes_data')
+        notes = validated_data.pop('notes_data')
         
         music_id = str(ULID())
         file_name = f'{music_id}.mp4'
@@ -71,22 +132,17 @@ class ChartSerializer(serializers.ModelSerializer):
         song_os_path = os.path.join(settings.MEDIA_ROOT, 'songs', file_name)
         song_db_path = posixpath.join(settings.MEDIA_URL, 'songs', file_name)
         
-        os.makedirs(os.path.dirname(song_os_path), exist_ok=True)
-        with open(song_os_path, 'wb+') as f:
-            for chunk in music_file.chunks():
-                f.write(chunk)
+        # 업로드는 한 번만 디스크에 씀 (큰 파일은 Django가 받아 둔 임시 파일을 옮김)
+        media_files.save_upload(music_file, song_os_path)
 
         # --- Video File ---
-        # 임시 파일에 원본 비디오 저장
-        temp_dir = os.path.join(settings.MEDIA_ROOT, 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_video_path = os.path.join(temp_dir, file_name)
-        
-        with open(temp_video_path, 'wb+') as f:
-            music_file.seek(0)
-            for chunk in music_file.chunks():
-                f.write(chunk)
-        
+        # 비디오 처리용 원본: 음원 파일과 같은 내용이므로 다시 쓰지 않고 링크 (처리 후 삭제)
+        temp_video_path = os.path.join(settings.MEDIA_ROOT, 'temp', file_name)
+        media_files.link_or_copy(song_os_path, temp_video_path)
+        # 처리가 끝날 때까지는 원본을 배경 비디오로 제공 (처리된 비디오는 새 파일로 만든 뒤 이 경로로 교체)
+        video_os_path = os.path.join(settings.MEDIA_ROOT, 'video', file_name)
+        media_files.link_or_copy(song_os_path, video_os_path)
+
         # --- Cover Image ---
         cover_db_path = ''
         
@@ -118,46 +174,24 @@ class ChartSerializer(serializers.ModelSerializer):
                 cover_db_path = posixpath.join(settings.MEDIA_URL, 'covers', 'bochi.jpg')
             cap.release()
         
-        # 비디오 처리: 다운스케일링 및 블러 적용
-        video_os_path = os.path.join(settings.MEDIA_ROOT, 'video', file_name)
+        # 비디오 처리(다운스케일링 + 블러)는 백그라운드 작업으로 실행 (game.video_jobs)
+        # 처리가 끝날 때까지 차트는 videoStatus = 'processing'이며 backgroundVideo는 원본 비디오
         video_db_path = posixpath.join(settings.MEDIA_URL, 'video', file_name)
-        
-        try:
-            # ffmpeg로 비디오 처리 (다운스케일링 + 블러)
-            process_video(
-                input_path=temp_video_path,
-                output_path=video_os_path,
-                width=1280,
-                height=720,
-                quality=26,
-                blur_sigma=5.0
-            )
-        except Exception as e:
-            # 비디오 처리 실패 시 원본 파일 사용
-            print(f"비디오 처리 실패, 원본 파일 사용: {e}")
-            os.makedirs(os.path.dirname(video_os_path), exist_ok=True)
-            with open(video_os_path, 'wb+') as f:
-                with open(temp_video_path, 'rb') as temp_f:
-                    f.write(temp_f.read())
-        finally:
-            # 임시 파일 정리
-            if os.path.exists(temp_video_path):
-                os.remove(temp_video_path)
-
-        chart = Chart.objects.create(
-            musicId=music_id,
-            song=song_db_path,
-            backgroundVideo=video_db_path,
-            coverUrl=cover_db_path,
-            creator=request.user,
-            isCommunitySong=True,
-            **validated_data
-        )
 
-        if notes_data_str:
-            notes_data = json.loads(notes_data_str)
-            for note_data in notes_data:
-                Note.objects.create(chart=chart, **note_data)
+        # 차트, 노트, 비디오 작업은 하나의 트랜잭션으로 저장 (중간 실패 시 차트가 남지 않음)
+        with transaction.atomic():
+            chart = Chart.objects.create(
+                musicId=music_id,
+                song=song_db_path,
+                backgroundVideo=video_db_path,
+                coverUrl=cover_db_path,
+                creator=request.user,
+                isCommunitySong=True,
+                videoStatus=VIDEO_PROCESSING,
+                **validated_data
+            )
+            chart.set_notes(notes)
+            video_jobs.enqueue(chart, posixpath.join('temp', file_name), posixpath.join('video', file_name))
         
         return chart
 
@@ -165,6 +199,17 @@ class ChartSerializer(serializers.ModelSerializer):
         # This part needs to be updated if chart editing is implemented
         return super().update(instance, validated_data)
 
+class VideoJobSerializer(serializers.ModelSerializer):
+    """차트 비디오 처리 작업 시리얼라이저"""
+    maxAttempts = serializers.SerializerMethodField()
+
+    class Meta:
+        model = VideoJob
+        fields = ('status', 'progress', 'attempts', 'maxAttempts', 'error', 'runAfter', 'startedAt', 'finishedAt', 'createdAt')
+
+    def get_maxAttempts(self, obj):
+        return settings.VIDEO_JOB_MAX_ATTEMPTS
+
 class RankUserSerializer(serializers.Serializer):
     """랭킹에 포함될 유저 정보 시리얼라이저"""
     id = serializers.IntegerField(source='user.id', read_only=True)
@@ -187,18 +232,27 @@ class RankSerializer(serializers.ModelSerializer):
         model = Rank
         fields = ('user', 'score')
 
+class PlayerRatingSerializer(serializers.ModelSerializer):
+    """전체 레이팅 시리얼라이저"""
+    user = RankUserSerializer(source='*', read_only=True)
+
+    class Meta:
+        model = PlayerRating
+        fields = ('user', 'rating', 'chartCount')
+
 class ResultSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.nickname', read_only=True)
     title = serializers.CharField(source='chart.title', read_only=True)
+    combo = serializers.CharField(read_only=True)
 
     class Meta:
         model = Result
-        fields = '__all__'
+        exclude = ('comboData',)
         read_only_fields = ('user', 'chart', 'playedAt')
 
 class CreateResultSerializer(serializers.Serializer):
     musicId = serializers.CharField()
-    score = serializers.IntegerField()
+    score = serializers.IntegerField(min_value=0, max_value=2 ** 31 - 1)  # 리더보드 엔진 키 범위
     accuracy = serializers.FloatField()
     combo = serializers.CharField()
     rank = serializers.CharField()
@@ -210,4 +264,19 @@ class CreateResultSerializer(serializers.Serializer):
     miss = serializers.IntegerField(default=0)
     bad = serializers.IntegerField(default=0)
     earlyCount = serializers.IntegerField(default=0)
-    lateCount = serializers.IntegerField(default=0)
\ No newline at end of file
+    lateCount = serializers.IntegerField(default=0)
+    inputLog = serializers.JSONField(required=False, write_only=True, help_text="키 입력 기록 [[시간(ms), 레인, 동작(1 누름/0 뗌)], ...]")
+
+    def validate_combo(self, value):
+        try:
+            parse_combo(value)
+        except ComboParseError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def validate_inputLog(self, value):
+        try:
+            parse_input_log(value)
+        except ReplayError as e:
+            raise serializers.ValidationError(str(e))
+        return value
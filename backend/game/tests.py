@@ -1,3 +1,983 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .combo_codec import ComboParseError, decode_combo, encode_combo
+from .leaderboard import leaderboard_engine
+from .models import (
+    JOB_DONE, JOB_FAILED, JOB_QUEUED, VIDEO_PROCESSING, VIDEO_READY, Chart, ChartStat, PlayerRating, Rank, Result,
+    UserStats, VideoJob, period_keys,
+)
+from .note_codec import CHART_MEDIA_TYPE, INT32_MAX, NoteColumns, pack_notes, unpack_chart
+from .note_ingest import NoteParseError, parse_notes
+from .note_validator import validate_notes
+from .result_archive import result_archive
+from .result_queue import ResultJournal, ResultQueue
+from .serializers import ChartSerializer
+from .results import build_result, save_results
+from .video_jobs import video_job_runner
+from . import leaderboard_cache, video_processor
+
+User = get_user_model()
+
+
+def make_user(name):
+    return User.objects.create_user(username=name, nickname=name)
+
+
+def make_chart(creator, music_id, difficulty=5):
+    return Chart.objects.create(
+        musicId=music_id, title=music_id, artist='artist', song='', backgroundVideo='', coverUrl='',
+        difficulty=difficulty, creator=creator,
+    )
+
+
+def result_data(chart, score):
+    return {
+        'musicId': chart.musicId, 'score': score, 'accuracy': 90.0, 'combo': '10', 'rank': 'A',
+        'isFullCombo': False, 'isAllPerfect': False,
+    }
+
+
+def upload_chart(client, music_file):
+    notes = json.dumps([{'time': 1000, 'lane': 1, 'type': 'tap', 'duration': None}])
+    response = client.post('/charts/', {
+        'title': 'title', 'artist': 'artist', 'difficulty': 3, 'notes_data': notes, 'musicFile': music_file,
+    }, format='multipart')
+    assert response.status_code == 201, response.content
+    return Chart.objects.get(musicId=response.json()['musicId'])
+
+
+def submit(user, chart, score):
+    """create_result와 같은 경로로 결과 하나 저장"""
+    result, = save_results(user, [build_result(user, chart, result_data(chart, score))])
+    return result
+
+
+class NoteRangeTests(SimpleTestCase):
+    """노트 블록(int32)에 저장할 수 없는 time / duration 거부"""
+
+    def codes(self, notes):
+        return [error['code'] for error in validate_notes(parse_notes(json.dumps(notes)), require_sorted=False).errors]
+
+    def test_int32_limits(self):
+        self.assertEqual(self.codes([{'time': INT32_MAX, 'lane': 1, 'type': 'tap'}]), [])
+        self.assertEqual(self.codes([{'time': INT32_MAX + 1, 'lane': 1, 'type': 'tap'}]), ['time_out_of_range'])
+        self.assertEqual(
+            self.codes([{'time': 0, 'lane': 1, 'type': 'hold', 'duration': INT32_MAX + 1}]),
+            ['duration_out_of_range'],
+        )
+
+    def test_int64_overflow_is_parse_error(self):
+        with self.assertRaises(NoteParseError):
+            parse_notes(json.dumps([{'time': 0, 'lane': 1, 'type': 'tap', 'duration': 2 ** 64 - 1}]))
+
+    def test_pack_rejects_out_of_range(self):
+        with self.assertRaises(ValueError):
+            pack_notes(NoteColumns([INT32_MAX + 1], [1], [0], [-1]))
+
+
+class ComboCodecTests(SimpleTestCase):
+    """콤보 문자열 <-> 구간별 int32 배열 인코딩"""
+
+    def test_round_trip(self):
+        data, max_combo = encode_combo('1520.4-8830.6-42,9012-9012-1')
+        self.assertEqual(max_combo, 42)
+        self.assertEqual(len(data), 12 + 3 * 4 * 2)
+        self.assertEqual(decode_combo(data), '1520-8831-42,9012-9012-1')  # 시간은 ms로 반올림
+
+        # 예전 형식(콤보 수만)은 시간 배열 없이 저장
+        data, max_combo = encode_combo('42,1')
+        self.assertEqual((decode_combo(data), max_combo, len(data)), ('42,1', 42, 12 + 2 * 4))
+
+        data, max_combo = encode_combo('')
+        self.assertEqual((decode_combo(data), max_combo), ('', 0))
+
+        result = Result(combo='10-20-3,30-90-7')
+        self.assertEqual((result.combo, result.maxCombo), ('10-20-3,30-90-7', 7))
+
+    def test_invalid_combo(self):
+        for text in ('1-2', 'a-b-c', '10-20-3,', f'0-{2 ** 31}-1'):
+            with self.subTest(text), self.assertRaises(ComboParseError):
+                encode_combo(text)
+
+
+class NoteValidatorTests(SimpleTestCase):
+    """노트 타임라인 검증 리포트: 위반 항목별 노트 인덱스"""
+
+    def test_reports_each_violation(self):
+        notes = NoteColumns.from_notes([
+            {'time': 0, 'lane': 1, 'type': 'hold', 'duration': 1000},
+            {'time': 500, 'lane': 1, 'type': 'hold', 'duration': 200},  # 0번 hold와 겹침
+            {'time': 600, 'lane': 2, 'type': 'hold', 'duration': 100},  # 다른 라인이라 겹치지 않음
+            {'time': 400, 'lane': 3, 'type': 'tap', 'duration': None},  # 앞 노트보다 먼저 시작 (정렬 위반)
+            {'time': 2000, 'lane': 1, 'type': 'hold', 'duration': 100},  # 0번 hold가 끝난 뒤
+            {'time': 2100, 'lane': 5, 'type': 'tap', 'duration': None},
+            {'time': 2200, 'lane': 2, 'type': 'tap', 'duration': 50},
+            {'time': 2300, 'lane': 4, 'type': 'hold', 'duration': 0},
+        ])
+        report = validate_notes(notes)
+        self.assertFalse(report.is_valid)
+        self.assertEqual({error['code']: error['indices'] for error in report.errors}, {
+            'hold_overlap': [1],
+            'unsorted_time': [3],
+            'lane_out_of_range': [5],
+            'tap_duration': [6],
+            'hold_duration': [7],
+        })
+        self.assertEqual(len(report.messages()), 5)
+
+        self.assertTrue(validate_notes(notes[[0, 2, 4]]).is_valid)
+
+
+class ChartDetailTests(TestCase):
+    """차트 상세 응답 (JSON / 열 단위 바이너리 포맷)"""
+    NOTES = [
+        {'time': 500, 'lane': 0, 'type': 'tap', 'duration': None},
+        {'time': 1000, 'lane': 3, 'type': 'hold', 'duration': 750},
+        {'time': 1000, 'lane': 1, 'type': 'tap', 'duration': None},
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('player')
+        self.chart = make_chart(self.user, 'chart')
+        self.chart.set_notes(NoteColumns.from_notes(self.NOTES))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_binary_format_matches_json(self):
+        data = self.client.get('/charts/chart/').json()
+        response = self.client.get('/charts/chart/', HTTP_ACCEPT=CHART_MEDIA_TYPE)
+        self.assertEqual(response['Content-Type'], CHART_MEDIA_TYPE)
+
+        meta, notes = unpack_chart(response.content)
+        self.assertEqual(meta, {field: value for field, value in data.items() if field != 'notes'})
+        # 바이너리 포맷은 노트 ID(순번)와 차트 ID를 보내지 않음
+        self.assertEqual(notes.to_dicts(), [
+            {field: value for field, value in note.items() if field not in ('id', 'chart')} for note in data['notes']
+        ])
+        self.assertEqual(notes.to_dicts(), self.NOTES)
+        self.assertEqual(self.client.get('/charts/chart/?format=bin').content, response.content)
+
+    def test_note_range(self):
+        for storage in ('columnar', 'rows'):
+            with self.subTest(storage), override_settings(GAME_NOTE_STORAGE=storage):
+                self.chart.set_notes(NoteColumns.from_notes(self.NOTES))
+                # 구간 안 노트만, id는 차트 전체에서의 순번
+                data = self.client.get('/charts/chart/notes/?from=1000&to=2000').json()
+                self.assertEqual((data['from'], data['to']), (1000, 2000))
+                self.assertEqual(data['notes'], [{'id': i + 1, **note} for i, note in enumerate(self.NOTES)][1:])
+                self.assertEqual([note['id'] for note in self.client.get('/charts/chart/notes/?to=1000').json()['notes']], [1])
+
+                response = self.client.get('/charts/chart/notes/?from=600&stream=ndjson')
+                self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+                lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+                self.assertEqual([json.loads(line) for line in lines], data['notes'])
+
+        self.assertEqual(self.client.get('/charts/chart/notes/?from=abc').status_code, 400)
+
+    def test_etag_changes_with_revision(self):
+        for accept in ('application/json', CHART_MEDIA_TYPE):
+            with self.subTest(accept):
+                etag = self.client.get('/charts/chart/', HTTP_ACCEPT=accept)['ETag']
+                response = self.client.get('/charts/chart/', HTTP_ACCEPT=accept, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], etag)
+
+        etag = self.client.get('/charts/chart/')['ETag']
+        # 노트를 바꾸면 차트 버전이 올라가 캐시된 노트 대신 새 노트를 새 ETag로 반환
+        self.chart.set_notes(NoteColumns.from_notes(self.NOTES[:1]))
+        response = self.client.get('/charts/chart/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['notes']), 1)
+
+        # 랭킹(메타데이터)이 바뀌어도 ETag가 바뀜
+        etag = response['ETag']
+        submit(self.user, self.chart, 1000)
+        response = self.client.get('/charts/chart/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ranks'][0]['score'], 1000)
+
+
+class ChartListQueryTests(TestCase):
+    """차트 목록의 쿼리 수는 차트 수와 무관 (상위 랭킹, 유저 최고 기록 prefetch)"""
+
+    def setUp(self):
+        self.user = make_user('player')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_charts(self, count):
+        for _ in range(count):
+            chart = make_chart(self.user, f'chart-{Chart.objects.count()}')
+            submit(self.user, chart, 1000)
+            submit(make_user(f'rival-{chart.id}'), chart, 2000)
+
+    def assert_list_queries(self, chart_count):
+        with self.assertNumQueries(3):
+            response = self.client.get('/charts/')
+        charts = response.json()
+        self.assertEqual(len(charts), chart_count)
+        self.assertTrue(all(chart['userBestRecord']['score'] == 1000 for chart in charts))
+
+    def test_query_count_is_constant(self):
+        self.add_charts(2)
+        self.assert_list_queries(2)
+        self.add_charts(18)
+        self.assert_list_queries(20)
+
+
+class LeaderboardTests(TestCase):
+    """곡별 리더보드 상위 목록은 DB 기준이며 같은 점수는 어디서나 유저 ID 순서"""
+
+    def setUp(self):
+        cache.clear()
+        leaderboard_engine.invalidate()
+        self.addCleanup(leaderboard_engine.invalidate)
+        self.users = [make_user(f'player-{i}') for i in range(4)]
+        self.chart = make_chart(self.users[0], 'chart')
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def board_user_ids(self):
+        return [entry['user']['id'] for entry in self.client.get('/leaderboard/chart/').json()]
+
+    def test_top_reflects_other_processes_and_ties_by_user(self):
+        # 유저 ID가 큰 쪽이 먼저 제출해 Rank ID 순서와 유저 ID 순서가 다름
+        submit(self.users[2], self.chart, 500)
+        submit(self.users[1], self.chart, 500)
+        leaderboard_engine.chart(self.chart.id)  # 이 프로세스의 엔진에 읽어 둠
+        # 다른 프로세스가 저장한 기록 (이 프로세스의 엔진은 갱신되지 않음)
+        Rank.objects.create(chart=self.chart, user=self.users[3], score=900)
+
+        expected = [self.users[3].id, self.users[1].id, self.users[2].id]
+        self.assertEqual(self.board_user_ids(), expected)
+        ranks = self.client.get('/charts/chart/').json()['ranks']
+        self.assertEqual([rank['user']['id'] for rank in ranks], expected)
+
+    def test_score_out_of_engine_range_is_rejected(self):
+        for score in (-1, 2 ** 31):
+            response = self.client.post('/results/', result_data(self.chart, score), format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('score', response.json())
+        self.assertFalse(Rank.objects.exists())
+
+    def test_period_boards(self):
+        last_week = timezone.now() - datetime.timedelta(days=7)
+        with mock.patch('django.utils.timezone.now', return_value=last_week):
+            submit(self.users[1], self.chart, 900)
+        submit(self.users[2], self.chart, 500)
+        last_week_key = period_keys(last_week)['week']
+
+        self.assertEqual(self.board_user_ids(), [self.users[1].id, self.users[2].id])
+        this_week = self.client.get('/leaderboard/chart/?period=week').json()
+        self.assertEqual([(entry['user']['id'], entry['score']) for entry in this_week], [(self.users[2].id, 500)])
+        previous = self.client.get(f'/leaderboard/chart/?period=week&key={last_week_key}').json()
+        self.assertEqual([(entry['user']['id'], entry['score']) for entry in previous], [(self.users[1].id, 900)])
+
+        # 끝난 기간은 스냅샷으로 고정되어 영구 캐시 가능
+        call_command('freeze_leaderboards', stdout=open(os.devnull, 'w'))
+        response = self.client.get(f'/leaderboard/chart/?period=week&key={last_week_key}')
+        self.assertEqual(response.json(), previous)
+        self.assertIn('immutable', response['Cache-Control'])
+
+        for query in ('period=week&key=2026-10', 'period=month&key=2026-W01', 'period=year'):
+            self.assertEqual(self.client.get(f'/leaderboard/chart/?{query}').status_code, 400)
+
+    def test_cache_is_invalidated_only_when_top_changes(self):
+        players = [make_user(f'top-{i}') for i in range(leaderboard_cache.LEADERBOARD_SIZE)]
+        for i, player in enumerate(players):
+            submit(player, self.chart, 1000 + i)
+        leaderboard_cache.reset_stats()
+
+        board = self.board_user_ids()
+        self.assertEqual(self.board_user_ids(), board)
+        self.assertEqual((leaderboard_cache.stats()['misses'], leaderboard_cache.stats()['hits']), (1, 1))
+
+        # 상위 목록 밖의 점수는 캐시를 지우지 않음
+        with self.captureOnCommitCallbacks(execute=True):
+            submit(self.users[1], self.chart, 500)
+        self.assertEqual(self.board_user_ids(), board)
+        self.assertEqual(leaderboard_cache.stats()['hits'], 2)
+
+        # 상위 목록에 드는 점수는 커밋 후 캐시를 지워 다음 요청에 바로 반영
+        with self.captureOnCommitCallbacks(execute=True):
+            submit(self.users[2], self.chart, 2000)
+        self.assertEqual(self.board_user_ids(), [self.users[2].id] + board[:-1])
+        self.assertEqual(leaderboard_cache.stats()['misses'], 2)
+
+class ResultBatchTests(TestCase):
+    """결과 일괄 제출: 항목별 상태를 요청 순서대로 반환하고 올바른 항목만 저장"""
+
+    def test_per_item_statuses(self):
+        user = make_user('player')
+        chart = make_chart(user, 'chart')
+        client = APIClient()
+        client.force_authenticate(user)
+        missing_score = result_data(chart, 0)
+        del missing_score['score']
+
+        response = client.post('/results/batch/', [
+            result_data(chart, 300),
+            {**result_data(chart, 900), 'musicId': 'unknown'},
+            missing_score,
+            result_data(chart, 700),
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(
+            [(item['index'], item['status']) for item in data['results']],
+            [(0, 'created'), (1, 'not_found'), (2, 'invalid'), (3, 'created')],
+        )
+        self.assertIn('musicId', data['results'][1]['errors'])
+        self.assertIn('score', data['results'][2]['errors'])
+        self.assertEqual([item['result']['score'] for item in data['results'] if item['status'] == 'created'], [300, 700])
+
+        self.assertEqual(sorted(Result.objects.values_list('score', flat=True)), [300, 700])
+        self.assertEqual(Rank.objects.get(user=user, chart=chart).score, 700)
+        self.assertEqual(client.post('/results/batch/', result_data(chart, 100), format='json').status_code, 400)
+
+
+class ReplayVerificationTests(TestCase):
+    """inputLog를 차트 노트로 다시 판정한 점수를 verifiedScore에 저장"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('player')
+        self.chart = make_chart(self.user, 'chart')
+        self.chart.set_notes(NoteColumns.from_notes([
+            {'time': 1000, 'lane': 0, 'type': 'tap', 'duration': None},
+            {'time': 2000, 'lane': 1, 'type': 'tap', 'duration': None},
+            {'time': 3000, 'lane': 2, 'type': 'hold', 'duration': 500},
+        ]))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, input_log):
+        return self.client.post('/results/', {**result_data(self.chart, 999999), 'inputLog': input_log}, format='json')
+
+    def test_replay_scores_input_log(self):
+        response = self.post([
+            [1010, 0, 1], [1050, 0, 0],  # perfect (10ms)
+            [2050, 1, 1], [2080, 1, 0],  # great (50ms)
+            [3000, 2, 1], [3600, 2, 0],  # 롱노트를 끝까지 누름
+        ])
+        self.assertEqual(response.status_code, 201, response.content)
+        result = Result.objects.get()
+        # 500 + 300 + 750 (콤보 20 미만이라 배율 1), 보낸 점수와 무관
+        self.assertEqual((result.score, result.verifiedScore), (999999, 1550))
+        self.assertEqual(result.laneStats, [[1, 0], [1, 0], [1, 0]])
+
+    def test_missed_notes_are_not_scored(self):
+        # 두 번째 노트는 입력 없음, 롱노트는 끝나기 전에 뗌
+        self.assertEqual(self.post([[990, 0, 1], [1000, 0, 0], [3000, 2, 1], [3200, 2, 0]]).status_code, 201)
+        result = Result.objects.get()
+        self.assertEqual((result.verifiedScore, result.laneStats), (500, [[1, 0], [1, 1], [1, 1]]))
+
+    def test_invalid_input_log(self):
+        for input_log in ([[1000, 0]], [[1000, 0, 2]], [[1000, -1, 1]], 'keys'):
+            with self.subTest(input_log):
+                response = self.post(input_log)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('inputLog', response.json())
+        self.assertFalse(Result.objects.exists())
+
+
+class UserStatsTests(TestCase):
+    """결과 저장 시 갱신한 UserStats를 /auth/me에서 집계 없이 반환"""
+
+    def test_stats_follow_submissions(self):
+        user = make_user('player')
+        chart = make_chart(user, 'chart')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        def stats():
+            # 요청마다 유저를 새로 읽는 인증처럼 (캐시된 gameStats 관계를 쓰지 않음)
+            client.force_authenticate(User.objects.get(id=user.id))
+            return client.get('/auth/me').json()['user']['stats']
+
+        self.assertEqual(stats()['playCount'], 0)
+
+        client.post('/results/', {**result_data(chart, 700), 'combo': '1-2-30', 'perfect': 12}, format='json')
+        client.post('/results/batch/', [
+            {**result_data(chart, 900), 'combo': '5,8', 'perfect': 20, 'isFullCombo': True},
+            {**result_data(chart, 800), 'perfect': 3, 'isFullCombo': True, 'isAllPerfect': True},
+        ], format='json')
+
+        expected = {
+            'playCount': 3, 'perfectCount': 35, 'fullComboCount': 2, 'allPerfectCount': 1,
+            'highestScore': 900, 'maxCombo': 30,
+        }
+        self.assertEqual(stats(), expected)
+
+        # 재계산 명령도 같은 값
+        UserStats.objects.all().delete()
+        call_command('rebuild_user_stats', stdout=open(os.devnull, 'w'))
+        self.assertEqual(stats(), expected)
+
+
+class ChartStatsTests(TestCase):
+    """결과 저장 시 더한 ChartStat 구간 값으로 차트 통계 응답"""
+
+    def setUp(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, True)
+        override = override_settings(RESULT_ARCHIVE_DIR=archive_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = make_user('player')
+        self.chart = make_chart(self.user, 'chart')
+        self.chart.set_notes(NoteColumns.from_notes([
+            {'time': 1000, 'lane': 0, 'type': 'tap', 'duration': None},
+            {'time': 2000, 'lane': 1, 'type': 'tap', 'duration': None},
+            {'time': 3000, 'lane': 2, 'type': 'hold', 'duration': 500},
+        ]))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_stats_follow_submissions(self):
+        empty = self.client.get('/charts/chart/stats/').json()
+        self.assertEqual((empty['playCount'], empty['lanes']), (0, []))
+        self.assertEqual(empty['score']['counts'], [0] * 40)
+
+        submissions = [
+            # 입력 기록으로 검증된 플레이 (레인 통계 집계)
+            {**result_data(self.chart, 120000), 'accuracy': 100.0, 'perfect': 3, 'earlyCount': 1, 'inputLog': [
+                [1010, 0, 1], [1050, 0, 0], [2050, 1, 1], [2080, 1, 0], [3000, 2, 1], [3600, 2, 0],
+            ]},
+            {**result_data(self.chart, 999999), 'perfect': 1, 'miss': 2, 'inputLog': [[990, 0, 1], [1000, 0, 0]]},
+            # 마지막 구간보다 큰 점수는 마지막 구간에 포함
+            {**result_data(self.chart, 5000000), 'accuracy': 42.5, 'great': 4, 'lateCount': 2},
+        ]
+        for data in submissions:
+            self.assertEqual(self.client.post('/results/', data, format='json').status_code, 201)
+
+        stats = self.client.get('/charts/chart/stats/').json()
+        self.assertEqual((stats['musicId'], stats['playCount'], stats['verifiedPlayCount']), ('chart', 3, 2))
+        score_counts = [0] * 40
+        score_counts[2] = score_counts[19] = score_counts[39] = 1
+        self.assertEqual(stats['score'], {'binWidth': 50000, 'counts': score_counts})
+        accuracy_counts = [0] * 20
+        accuracy_counts[8] = accuracy_counts[18] = accuracy_counts[19] = 1
+        self.assertEqual(stats['accuracy'], {'binWidth': 5, 'counts': accuracy_counts})
+        self.assertEqual(stats['judgements'], {
+            'perfect': 4, 'great': 4, 'good': 0, 'bad': 0, 'miss': 2, 'earlyCount': 1, 'lateCount': 2,
+        })
+        self.assertEqual(stats['lanes'], [
+            {'lane': 0, 'notes': 2, 'misses': 0, 'missRate': 0.0},
+            {'lane': 1, 'notes': 2, 'misses': 1, 'missRate': 0.5},
+            {'lane': 2, 'notes': 2, 'misses': 1, 'missRate': 0.5},
+        ])
+
+        # 재계산 명령도 같은 값
+        ChartStat.objects.all().delete()
+        call_command('rebuild_chart_stats', stdout=open(os.devnull, 'w'))
+        self.assertEqual(self.client.get('/charts/chart/stats/').json(), stats)
+
+    def test_unknown_chart(self):
+        self.assertEqual(self.client.get('/charts/missing/stats/').status_code, 404)
+
+
+class ConcurrentResultTests(TransactionTestCase):
+    """같은 유저/차트 결과를 여러 스레드에서 동시에 제출해도 최고 점수 Rank 하나만 남음"""
+
+    def test_concurrent_submissions_keep_best_score(self):
+        user = make_user('player')
+        chart = make_chart(user, 'chart')
+        scores = list(range(1000, 1040))
+        errors = []
+
+        def post(score):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                response = client.post('/results/', result_data(chart, score), format='json')
+                if response.status_code != 201:
+                    errors.append(response.content)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(post, scores))
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Result.objects.filter(user=user, chart=chart).count(), len(scores))
+        self.assertEqual(list(Rank.objects.filter(user=user, chart=chart).values_list('score', flat=True)), [max(scores)])
+        # 처음 기록이 동시에 저장되어도 레이팅에는 최고 점수가 한 번만 반영됨
+        rating = PlayerRating.objects.get(user=user)
+        self.assertEqual((rating.rating, rating.chartCount), (PlayerRating.rating_of(max(scores), chart.difficulty), 1))
+
+
+class ResultPaginationTests(TestCase):
+    """결과 목록 커서를 끝까지 따라가면 DB와 보관된 결과가 빠짐/중복 없이 정렬 순서대로 나옴"""
+
+    def setUp(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, True)
+        override = override_settings(RESULT_ARCHIVE_DIR=archive_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.players = [make_user(f'player-{i}') for i in range(3)]
+        self.chart = make_chart(self.players[0], 'chart')
+        self.client = APIClient()
+        self.client.force_authenticate(self.players[0])
+
+        # 점수 4가지, 플레이 시간 2가지뿐이라 같은 정렬 값이 많음 (동점은 id로 구분)
+        now = timezone.now()
+        for i in range(60):
+            result = submit(self.players[i % 3], self.chart, (i % 4) * 100)
+            played_at = now - datetime.timedelta(days=400 if i < 40 else 1)
+            Result.objects.filter(id=result.id).update(playedAt=played_at)
+
+        self.expected = {
+            'user': list(
+                Result.objects.filter(user=self.players[0]).order_by('-playedAt', '-id').values_list('id', flat=True)
+            ),
+            'score': list(Result.objects.order_by('-score', '-id').values_list('id', flat=True)),
+            'combo': list(Result.objects.order_by('-maxCombo', '-id').values_list('id', flat=True)),
+        }
+        self.owners = dict(Result.objects.values_list('id', 'user_id'))
+        call_command('archive_results', days=180, segment_size=7, stdout=open(os.devnull, 'w'))
+
+    def walk(self, url):
+        ids, page_queries = [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page_queries.append(len(queries))
+            ids += [result['id'] for result in response.json()['results']]
+            url = response.json()['next']
+        return ids, page_queries
+
+    def test_cursor_walk_covers_db_and_archive(self):
+        self.assertGreater(len(result_archive.segments()), 1)
+        self.assertLess(Result.objects.count(), 60)
+
+        for name, url in (
+            ('user', f'/results/user/{self.players[0].id}/?limit=4'),
+            ('score', f'/results/chart/{self.chart.musicId}/?limit=4'),
+            ('combo', f'/results/chart/{self.chart.musicId}/?order=combo&limit=3'),
+        ):
+            with self.subTest(name):
+                ids, page_queries = self.walk(url)
+                self.assertEqual(ids, self.expected[name])
+                # 페이지 위치와 무관하게 첫 페이지 쿼리 + 보관된 결과의 유저/차트 조회 2번 이내 (OFFSET 없음)
+                self.assertLessEqual(max(page_queries), page_queries[0] + 2)
+
+    def test_pages_at_archive_boundary(self):
+        # 첫 페이지는 DB 행으로 끝나고 두 번째 페이지는 보관된 행으로 시작하도록 limit을 정함
+        expected = self.expected['user']
+        in_db = set(Result.objects.values_list('id', flat=True))
+        boundary = next(i for i, result_id in enumerate(expected) if result_id not in in_db)
+        self.assertGreater(len(expected), 2 * boundary)
+
+        first = self.client.get(f'/results/user/{self.players[0].id}/?limit={boundary}').json()
+        second = self.client.get(first['next']).json()
+        first_ids = [result['id'] for result in first['results']]
+        second_ids = [result['id'] for result in second['results']]
+        self.assertEqual(first_ids, expected[:boundary])
+        self.assertEqual(second_ids, expected[boundary:2 * boundary])
+        self.assertTrue(set(first_ids) <= in_db)
+        self.assertNotIn(second_ids[0], in_db)
+        self.assertEqual(second['results'][0]['username'], self.players[0].nickname)
+        self.assertEqual(second['results'][0]['title'], self.chart.title)
+
+    def test_without_cursor_returns_full_list(self):
+        for name, url in (
+            ('user', f'/results/user/{self.players[0].id}/'),
+            ('score', f'/results/chart/{self.chart.musicId}/'),
+        ):
+            with self.subTest(name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([result['id'] for result in response.json()], self.expected[name])
+
+    def test_deleted_user_results_are_skipped(self):
+        # 세그먼트는 다시 쓰지 않지만 삭제된 유저의 보관된 결과는 목록과 내보내기에서 빠짐
+        deleted = self.players[1]
+        deleted_id = deleted.id
+        deleted.delete()
+        expected = [result_id for result_id in self.expected['score'] if self.owners[result_id] != deleted_id]
+
+        listed = self.client.get(f'/results/chart/{self.chart.musicId}/').json()
+        self.assertEqual([result['id'] for result in listed], expected)
+        walked, _ = self.walk(f'/results/chart/{self.chart.musicId}/?limit=7')
+        self.assertEqual(walked, expected)
+
+        admin = User.objects.create_user(username='admin', nickname='admin', is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.get('/results/export/')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(sorted(row['id'] for row in rows), sorted(expected))
+
+
+class ResultExportTests(TestCase):
+    """결과/랭킹 내보내기를 보관된 결과까지 NDJSON/CSV로 스트리밍"""
+
+    def setUp(self):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir, True)
+        override = override_settings(RESULT_ARCHIVE_DIR=archive_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.players = [make_user(f'player-{i}') for i in range(2)]
+        self.charts = [make_chart(self.players[0], f'chart-{i}') for i in range(2)]
+        now = timezone.now()
+        self.played_at, self.owners = {}, {}
+        for i in range(8):
+            result = submit(self.players[i % 2], self.charts[i // 4], 100 * i)
+            played_at = now - datetime.timedelta(days=400 if i % 4 < 2 else 1)
+            Result.objects.filter(id=result.id).update(playedAt=played_at)
+            self.played_at[result.id] = played_at
+            self.owners[result.id] = (result.user_id, result.chart_id)
+        call_command('archive_results', days=180, stdout=open(os.devnull, 'w'))
+
+        admin = User.objects.create_user(username='admin', nickname='admin', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def get(self, query):
+        response = self.client.get(f'/results/export/?{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_includes_archived_results(self):
+        self.assertEqual(Result.objects.count(), 4)
+        response, body = self.get('')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="results.ndjson"')
+        rows = [json.loads(line) for line in body.splitlines()]
+        # 보관된 결과 먼저, 그 다음 DB 결과 (각각 id 순)
+        live = list(Result.objects.order_by('id').values_list('id', flat=True))
+        archived = sorted(set(self.played_at) - set(live))
+        self.assertEqual([row['id'] for row in rows], archived + live)
+        music_ids = {chart.id: chart.musicId for chart in self.charts}
+        for row in rows:
+            self.assertEqual((row['user'], row['chart']), self.owners[row['id']])
+            self.assertEqual(row['musicId'], music_ids[row['chart']])
+            self.assertEqual(datetime.datetime.fromisoformat(row['playedAt']), self.played_at[row['id']])
+
+    def test_filters(self):
+        def ids(query):
+            return sorted(json.loads(line)['id'] for line in self.get(query)[1].splitlines())
+
+        player, chart = self.players[1], self.charts[1]
+        # 보관된 결과 1개 + DB 결과 1개
+        expected = sorted(id for id, owner in self.owners.items() if owner == (player.id, chart.id))
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(ids(f'chart={chart.musicId}&user={player.id}'), expected)
+
+        recent = (timezone.now() - datetime.timedelta(days=30)).date().isoformat()
+        self.assertEqual(ids(f'since={recent}'), sorted(Result.objects.values_list('id', flat=True)))
+        self.assertEqual(ids('since=2000-01-01'), sorted(self.played_at))
+
+    def test_csv_and_ranks(self):
+        response, body = self.get('table=ranks&stream=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ranks.csv"')
+        lines = body.splitlines()
+        self.assertEqual(lines[0], 'id,user,chart,musicId,score')
+        self.assertEqual(
+            lines[1:],
+            [
+                f'{rank.id},{rank.user_id},{rank.chart_id},{rank.chart.musicId},{rank.score}'
+                for rank in Rank.objects.select_related('chart').order_by('id')
+            ],
+        )
+
+        lines = self.get('stream=csv')[1].splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'user', 'chart'])
+        self.assertEqual(len(lines), 1 + len(self.played_at))
+
+    def test_invalid_params(self):
+        for query in ('table=users', 'stream=xml', 'user=abc', 'since=yesterday'):
+            with self.subTest(query):
+                response = self.client.get(f'/results/export/?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+        self.assertEqual(self.client.get('/results/export/?chart=missing').status_code, 404)
+
+        self.client.force_authenticate(self.players[0])
+        self.assertEqual(self.client.get('/results/export/').status_code, 403)
+
+
+class ResultJournalRecoveryTests(TransactionTestCase):
+    """종료된 프로세스의 저널 복구와 일부만 저장된 묶음 처리"""
+
+    def setUp(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir, True)
+        self.journal_path = os.path.join(journal_dir, 'result_journal.ndjson')
+        override = override_settings(RESULT_JOURNAL_PATH=self.journal_path, RESULT_JOURNAL_FSYNC=False)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = make_user('player')
+        self.chart = make_chart(self.user, 'chart')
+
+    def write_journal(self, path, scores):
+        journal = ResultJournal(path, fsync=False)
+        for seq, score in enumerate(scores, 1):
+            journal.append(seq, self.user.id, self.chart.id, result_data(self.chart, score))
+        journal.close()
+        return journal
+
+    def test_flush_skips_journals_of_running_processes(self):
+        self.write_journal(self.journal_path.replace('.ndjson', '.1-1.ndjson'), [100, 200])
+        running = ResultJournal(self.journal_path.replace('.ndjson', '.2-2.ndjson'), fsync=False)
+        self.assertTrue(running.lock())
+        running.append(1, self.user.id, self.chart.id, result_data(self.chart, 300))
+        self.addCleanup(running.close)
+
+        self.assertEqual(ResultQueue().flush_pending(), 2)
+        self.assertEqual(sorted(Result.objects.values_list('score', flat=True)), [100, 200])
+        self.assertEqual(os.listdir(os.path.dirname(self.journal_path)), [os.path.basename(running.path)])
+
+    def test_partial_flush_does_not_save_twice(self):
+        self.write_journal(self.journal_path, [100, 200, 300])
+        result_queue = ResultQueue()
+        save = result_queue._save
+        # 묶음 저장은 일반 오류 -> 하나씩 저장하다가 두 번째에서 DB 오류
+        calls = [ValueError('bad batch'), None, OperationalError('database is locked')]
+
+        def flaky_save(records):
+            error = calls.pop(0) if calls else None
+            if error is not None:
+                raise error
+            return save(records)
+
+        with mock.patch.object(result_queue, '_save', side_effect=flaky_save):
+            with self.assertRaises(OperationalError):
+                result_queue.flush_pending()
+            self.assertEqual([record['seq'] for record in ResultJournal(self.journal_path).pending()], [2, 3])
+            self.assertEqual(result_queue.flush_pending(), 2)
+
+        self.assertEqual(sorted(Result.objects.values_list('score', flat=True)), [100, 200, 300])
+
+
+class VideoJobTests(TestCase):
+    """차트 업로드 후 비디오 처리 작업 (ffmpeg 대신 process_video를 mock)"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        override = override_settings(
+            MEDIA_ROOT=self.media_root, VIDEO_JOB_WORKERS=0, VIDEO_JOB_MAX_ATTEMPTS=3, VIDEO_JOB_RETRY_DELAY_SECONDS=0,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('creator'))
+        self.video = os.urandom(4096)
+
+    def media(self, *parts):
+        return os.path.join(self.media_root, *parts)
+
+    def upload(self):
+        chart = upload_chart(self.client, SimpleUploadedFile('video.mp4', self.video, 'video/mp4'))
+        self.assertEqual(chart.videoStatus, VIDEO_PROCESSING)
+        self.assertEqual(chart.videoJob.status, JOB_QUEUED)
+        # 처리하는 동안 배경 비디오 경로에서 원본을 제공
+        self.assertEqual(chart.backgroundVideo, f'/media/video/{chart.musicId}.mp4')
+        with open(self.media('video', f'{chart.musicId}.mp4'), 'rb') as video:
+            self.assertEqual(video.read(), self.video)
+        return chart
+
+    def test_job_processes_video_and_reports_progress(self):
+        chart = self.upload()
+
+        def process_video(input_path, output_path, progress=None, **options):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(input_path, 'rb') as source, open(output_path, 'wb') as output:
+                output.write(source.read()[:100])
+            progress(0.5)
+            progress(1.0)
+            return output_path
+
+        with mock.patch('game.video_jobs.process_video', side_effect=process_video) as processed:
+            self.assertEqual(video_job_runner.run_pending(), 1)
+        self.assertEqual(processed.call_args.kwargs['input_path'], self.media('temp', f'{chart.musicId}.mp4'))
+        # 제공 중인 원본(음원과 하드 링크될 수 있음)에 직접 쓰지 않음
+        self.assertNotEqual(processed.call_args.kwargs['output_path'], self.media('video', f'{chart.musicId}.mp4'))
+
+        response = self.client.get(f'/charts/{chart.musicId}/processing/').json()
+        self.assertEqual(response['videoStatus'], VIDEO_READY)
+        self.assertEqual((response['job']['status'], response['job']['progress'], response['job']['attempts']), (JOB_DONE, 1.0, 1))
+        with open(self.media('video', f'{chart.musicId}.mp4'), 'rb') as output:
+            self.assertEqual(output.read(), self.video[:100])
+        with open(self.media('songs', f'{chart.musicId}.mp4'), 'rb') as song:
+            self.assertEqual(song.read(), self.video)
+        self.assertEqual(os.listdir(self.media('temp')), [])
+        self.assertEqual(Chart.objects.get(id=chart.id).revision, chart.revision + 1)
+
+    def test_failed_job_retries_then_uses_original_video(self):
+        chart = self.upload()
+        with mock.patch('game.video_jobs.process_video', side_effect=Exception('ffmpeg failed')) as processed, \
+                self.assertLogs('game.video_jobs', 'WARNING') as logs:
+            while video_job_runner.run_pending():
+                pass
+        self.assertEqual(processed.call_count, 3)
+        self.assertEqual(len(logs.records), 3)
+
+        job = VideoJob.objects.get(chart=chart)
+        self.assertEqual((job.status, job.attempts, job.error), (JOB_FAILED, 3, 'ffmpeg failed'))
+        self.assertEqual(Chart.objects.get(id=chart.id).videoStatus, VIDEO_READY)
+        with open(self.media('video', f'{chart.musicId}.mp4'), 'rb') as output:
+            self.assertEqual(output.read(), self.video)
+        with open(self.media('songs', f'{chart.musicId}.mp4'), 'rb') as song:
+            self.assertEqual(song.read(), self.video)
+        self.assertEqual(os.listdir(self.media('temp')), [])
+
+    def test_processing_status_of_unknown_chart(self):
+        self.assertEqual(self.client.get('/charts/unknown/processing/').status_code, 404)
+
+
+class SegmentedEncodeTests(SimpleTestCase):
+    """구간 분할 인코딩: 워커를 기다린 구간의 ffmpeg도 전체 제한 시간 안에서 실행"""
+
+    def test_queued_segments_get_remaining_time(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        input_path = os.path.join(work_dir, 'input.mp4')
+        output_path = os.path.join(work_dir, 'out', 'output.mp4')
+        with open(input_path, 'wb') as file:
+            file.write(b'video')
+        encode_timeouts = []
+
+        def run_ffmpeg(command, timeout=300, duration=None, progress=None):
+            target = command[-1]
+            if '-segment_times' in command:
+                for i in range(command[command.index('-segment_times') + 1].count(',') + 2):
+                    open(target % i, 'wb').close()
+            else:
+                if '-threads' in command:
+                    encode_timeouts.append(timeout)
+                    time.sleep(0.05)
+                open(target, 'wb').close()
+            return ''
+
+        with mock.patch.object(video_processor, 'run_ffmpeg', side_effect=run_ffmpeg), \
+                mock.patch.object(video_processor, 'probe_duration', return_value=40.0), \
+                mock.patch.object(video_processor, 'has_audio', return_value=False):
+            video_processor.process_video(
+                input_path, output_path, timeout=10, segments=4, workers=1, min_segment_seconds=1,
+            )
+
+        self.assertTrue(os.path.exists(output_path))
+        self.assertEqual(len(encode_timeouts), 4)
+        # 한 번에 하나씩 실행되므로 뒤의 구간일수록 앞 구간 실행 시간만큼 제한 시간이 줄어듦
+        for earlier, later in zip(encode_timeouts, encode_timeouts[1:]):
+            self.assertLess(later, earlier - 0.04)
+
+    def test_unknown_duration_encodes_in_one_pass(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        input_path = os.path.join(work_dir, 'input.mp4')
+        output_path = os.path.join(work_dir, 'out', 'output.mp4')
+        with open(input_path, 'wb') as file:
+            file.write(b'video')
+        commands = []
+
+        def run_ffmpeg(command, timeout=300, duration=None, progress=None):
+            commands.append(command)
+            open(command[-1], 'wb').close()
+            return ''
+
+        with mock.patch.object(video_processor, 'run_ffmpeg', side_effect=run_ffmpeg), \
+                mock.patch.object(video_processor, 'probe_duration', return_value=None):
+            video_processor.process_video(
+                input_path, output_path, timeout=10, segments=4, workers=1, min_segment_seconds=1,
+            )
+
+        self.assertTrue(os.path.exists(output_path))
+        self.assertEqual(len(commands), 1)
+        self.assertNotIn('-segment_times', commands[0])
+        self.assertEqual(commands[0][-1], output_path)
+
+
+class UploadMemoryTests(TestCase):
+    """큰 업로드를 저장하고 원본 비디오로 대체할 때까지 최대 RSS가 파일 크기만큼 늘지 않음"""
+    UPLOAD_SIZE = 64 * 2 ** 20
+    RSS_LIMIT = 16 * 2 ** 20
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        override = override_settings(
+            MEDIA_ROOT=self.media_root, VIDEO_JOB_WORKERS=0, VIDEO_JOB_MAX_ATTEMPTS=1,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def reset_peak_rss(self):
+        """최대 RSS를 현재 RSS로 초기화 (Linux 4.0+)"""
+        try:
+            with open('/proc/self/clear_refs', 'w') as file:
+                file.write('5')
+        except OSError:
+            self.skipTest('최대 RSS를 초기화할 수 없습니다 (/proc/self/clear_refs).')
+
+    def peak_rss(self):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux: KB
+
+    def test_large_upload_is_streamed(self):
+        # 업로드 핸들러(TemporaryFileUploadHandler)처럼 청크 단위로 받은 임시 파일
+        upload = TemporaryUploadedFile('video.mp4', 'video/mp4', self.UPLOAD_SIZE, None)
+        self.addCleanup(upload.close)
+        chunk = os.urandom(64 * 2 ** 10)
+        for _ in range(self.UPLOAD_SIZE // len(chunk)):
+            upload.write(chunk)
+        upload.seek(0)
+
+        request = APIRequestFactory().post('/charts/')
+        request.user = make_user('creator')
+        serializer = ChartSerializer(data={
+            'title': 'title', 'artist': 'artist', 'difficulty': 3, 'musicFile': upload,
+            'notes_data': json.dumps([{'time': 1000, 'lane': 1, 'type': 'tap', 'duration': None}]),
+        }, context={'request': request})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        self.reset_peak_rss()
+        baseline = self.peak_rss()
+        chart = serializer.save()
+        self.assertLess(self.peak_rss() - baseline, self.RSS_LIMIT)
+
+        # 비디오 처리 실패 시 원본 비디오로 대체하는 경로도 파일을 메모리에 읽지 않음
+        with mock.patch('game.video_jobs.process_video', side_effect=Exception('ffmpeg failed')), \
+                self.assertLogs('game.video_jobs', 'WARNING'):
+            video_job_runner.run_pending()
+        self.assertLess(self.peak_rss() - baseline, self.RSS_LIMIT)
+
+        for folder in ('songs', 'video'):
+            self.assertEqual(
+                os.path.getsize(os.path.join(self.media_root, folder, f'{chart.musicId}.mp4')), self.UPLOAD_SIZE,
+            )
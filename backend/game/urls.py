@@ -9,6 +9,9 @@ urlpatterns = [
         'patch': 'partial_update',
         'delete': 'destroy'
     }), name='chart-detail'),
+    path('<str:musicId>/notes/', views.chart_notes, name='chart-notes'),
     path('<str:musicId>/leaderboard/', views.leaderboard, name='leaderboard'),
     path('<str:musicId>/results/', views.chart_results, name='chart-results'),
+    path('<str:musicId>/stats/', views.chart_statistics, name='chart-stats'),
+    path('<str:musicId>/processing/', views.chart_processing, name='chart-processing'),
 ]
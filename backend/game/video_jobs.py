@@ -0,0 +1,195 @@
+"""
+차트 배경 비디오 처리 작업
+
+차트 업로드 요청은 원본 비디오를 MEDIA_ROOT/temp에 저장하고 VideoJob을 추가한 뒤 바로 응답합니다
+(차트 videoStatus = 'processing'). 처리하는 동안에는 배경 비디오 경로(MEDIA_ROOT/video)에 있는 원본을 제공합니다.
+워커가 작업을 하나씩 가져가 process_video(ffmpeg)로 다운스케일/블러 처리하며, ffmpeg -progress 출력으로
+작업의 진행률을 갱신합니다. 처리된 비디오는 임시 파일로 만든 뒤 배경 비디오 경로로 교체(os.replace)하므로
+재생 중인 원본이나 원본과 하드 링크된 음원 파일은 바뀌지 않습니다.
+
+실패하면 VIDEO_JOB_RETRY_DELAY_SECONDS * 2^(시도 횟수 - 1)초 뒤에 다시 시도하고,
+VIDEO_JOB_MAX_ATTEMPTS번 모두 실패하면 원본 비디오를 그대로 배경 비디오로 사용합니다.
+작업은 DB에 저장되므로 서버가 다시 시작되어도 남은 작업을 이어서 처리합니다.
+여러 프로세스의 워커가 같은 테이블을 사용해도 상태 조건부 UPDATE로 한 워커만 작업을 가져갑니다.
+
+워커는 서버 프로세스 안의 스레드(VIDEO_JOB_WORKERS개) 또는 run_video_jobs 명령으로 실행합니다.
+스레드는 서버 프로세스가 첫 요청을 받을 때(game.apps) 또는 작업을 추가할 때 시작합니다.
+VIDEO_JOB_WORKERS = 0으로 서버 안 워커를 끄면 run_video_jobs를 서비스로 계속 실행해야 합니다.
+"""
+import datetime
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .media_files import link_or_copy
+from .models import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, VIDEO_PROCESSING, VIDEO_READY, Chart, VideoJob
+from .video_processor import process_video
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_SAVE_INTERVAL = 1.0  # 진행률을 DB에 저장하는 최소 간격 (초)
+STALE_JOB_GRACE_SECONDS = 60  # 실행 중 상태로 이 시간 넘게 제한 시간을 넘긴 작업은 워커가 죽은 것으로 봄
+VIDEO_OPTIONS = {'width': 1280, 'height': 720, 'quality': 26, 'blur_sigma': 5.0}
+
+
+def media_path(relative_path):
+    return os.path.join(settings.MEDIA_ROOT, relative_path)
+
+
+def enqueue(chart, input_path, output_path):
+    """차트의 비디오 처리 작업 추가 (차트 생성과 같은 트랜잭션 안에서 호출)
+
+    Args:
+        input_path, output_path: MEDIA_ROOT 기준 경로.
+    """
+    job = VideoJob.objects.create(chart=chart, inputPath=input_path, outputPath=output_path)
+    transaction.on_commit(video_job_runner.notify)
+    return job
+
+
+def retry_delay(attempts):
+    """attempts번째 실패 뒤 다시 시도하기까지의 대기 시간"""
+    return datetime.timedelta(seconds=settings.VIDEO_JOB_RETRY_DELAY_SECONDS * 2 ** (attempts - 1))
+
+
+class VideoJobRunner:
+    """VideoJob 테이블을 처리하는 워커 스레드 묶음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    def start(self, workers=None):
+        """워커 스레드 시작 (처음 한 번만)"""
+        workers = settings.VIDEO_JOB_WORKERS if workers is None else workers
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(workers):
+                thread = threading.Thread(target=self._run, name=f'video-job-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """새 작업이 추가되었음을 워커에 알림 (서버 프로세스 안 워커를 쓰면 이때 시작)"""
+        self.start()
+        self._wakeup.set()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def run_pending(self):
+        """지금 실행할 수 있는 작업이 없을 때까지 현재 스레드에서 처리. 처리한 작업 수 반환"""
+        count = 0
+        while (job := self.claim()) is not None:
+            self.run(job)
+            count += 1
+        return count
+
+    def _run(self):
+        poll = settings.VIDEO_JOB_POLL_SECONDS
+        while True:
+            try:
+                job = self.claim()
+                if job is None:
+                    self._wakeup.wait(poll)
+                    self._wakeup.clear()
+                    continue
+                self.run(job)
+            except Exception:
+                logger.exception('비디오 작업 워커 오류')
+                time.sleep(poll)
+            finally:
+                close_old_connections()
+
+    def claim(self):
+        """실행할 시간이 된 작업 하나를 실행 중으로 바꾸고 반환 (없으면 None)"""
+        now = timezone.now()
+        stale = now - datetime.timedelta(seconds=settings.VIDEO_PROCESS_TIMEOUT + STALE_JOB_GRACE_SECONDS)
+        VideoJob.objects.filter(status=JOB_RUNNING, startedAt__lt=stale).update(status=JOB_QUEUED)
+
+        candidates = (
+            VideoJob.objects.filter(status=JOB_QUEUED, runAfter__lte=now)
+            .order_by('runAfter', 'id').values_list('id', flat=True)[:10]
+        )
+        for job_id in candidates:
+            claimed = VideoJob.objects.filter(id=job_id, status=JOB_QUEUED).update(
+                status=JOB_RUNNING, startedAt=now, progress=0, attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return VideoJob.objects.get(id=job_id)
+        return None
+
+    def run(self, job):
+        """작업 하나 실행: 성공하면 완료, 실패하면 재시도 예약 또는 원본 비디오 사용"""
+        input_path, output_path = media_path(job.inputPath), media_path(job.outputPath)
+        # 원본과 같은 폴더에서 인코딩 (출력 형식은 확장자로 정해지므로 이름 앞에 붙임)
+        encoded_path = os.path.join(os.path.dirname(input_path), f'encoded-{os.path.basename(output_path)}')
+        last_saved = 0.0
+
+        def save_progress(fraction):
+            nonlocal last_saved
+            if fraction < 1 and time.monotonic() - last_saved < PROGRESS_SAVE_INTERVAL:
+                return
+            last_saved = time.monotonic()
+            VideoJob.objects.filter(id=job.id, status=JOB_RUNNING).update(progress=fraction)
+
+        timings = {}
+        try:
+            process_video(
+                input_path=input_path,
+                output_path=encoded_path,
+                timeout=settings.VIDEO_PROCESS_TIMEOUT,
+                progress=save_progress,
+                segments=settings.VIDEO_ENCODE_SEGMENTS,
+                workers=settings.VIDEO_ENCODE_WORKERS,
+                min_segment_seconds=settings.VIDEO_SEGMENT_MIN_SECONDS,
+                timings=timings,
+                **VIDEO_OPTIONS
+            )
+            os.replace(encoded_path, output_path)
+        except Exception as e:
+            if os.path.exists(encoded_path):
+                os.remove(encoded_path)
+            if job.attempts < settings.VIDEO_JOB_MAX_ATTEMPTS:
+                delay = retry_delay(job.attempts)
+                logger.warning('비디오 처리 실패 (%s, %d번째), %s 뒤 다시 시도: %s', job.chart_id, job.attempts, delay, e)
+                VideoJob.objects.filter(id=job.id).update(
+                    status=JOB_QUEUED, error=str(e), progress=0, runAfter=timezone.now() + delay,
+                )
+                return
+            # 마지막 시도도 실패: 업로드 때 배경 비디오 경로에 둔 원본을 그대로 사용
+            logger.warning('비디오 처리 실패 (%s), 원본 파일 사용: %s', job.chart_id, e)
+            if not os.path.exists(output_path):  # 원본을 미리 두지 않던 때 추가된 작업
+                try:
+                    link_or_copy(input_path, output_path)
+                except OSError:
+                    logger.exception('원본 비디오를 복사하지 못했습니다 (%s)', job.chart_id)
+            self._finish(job, JOB_FAILED, error=str(e))
+        else:
+            logger.info('비디오 처리 완료 (%s): %s', job.chart_id, ', '.join(f'{k} {v:.2f}s' for k, v in timings.items()))
+            self._finish(job, JOB_DONE)
+
+    def _finish(self, job, status, error=''):
+        if os.path.exists(media_path(job.inputPath)):
+            os.remove(media_path(job.inputPath))
+        with transaction.atomic():
+            VideoJob.objects.filter(id=job.id).update(
+                status=status, error=error, progress=1, finishedAt=timezone.now(),
+            )
+            # save()로 저장하여 차트 버전(revision)을 올려 캐시된 차트 응답을 무효화
+            chart = Chart.objects.select_for_update().defer('notesData').filter(id=job.chart_id).first()
+            if chart is not None and chart.videoStatus == VIDEO_PROCESSING:
+                chart.videoStatus = VIDEO_READY
+                chart.save(update_fields=['videoStatus'])
+
+
+video_job_runner = VideoJobRunner()
@@ -1,17 +1,124 @@
+import logging
 import subprocess
 import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+def probe_duration(input_path: str):
+    """ffprobe로 비디오 길이(초)를 읽습니다. 알 수 없으면 None."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", input_path],
+            capture_output=True, text=True, check=True, timeout=30
+        )
+        return float(result.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return None
+
+def has_audio(input_path: str) -> bool:
+    """ffprobe로 오디오 스트림이 있는지 확인합니다. 알 수 없으면 True."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "a", "-show_entries", "stream=index", "-of", "csv=p=0", input_path],
+            capture_output=True, text=True, check=True, timeout=30
+        )
+        return bool(result.stdout.strip())
+    except (OSError, subprocess.SubprocessError):
+        return True
+
+def _read_progress(stream, duration, progress):
+    # -progress 출력은 "key=value" 줄의 묶음이며, out_time_us는 지금까지 인코딩한 길이(마이크로초)
+    for line in stream:
+        key, _, value = line.strip().partition("=")
+        if progress is None:
+            continue
+        if key == "out_time_us" and duration:
+            try:
+                progress(min(max(int(value) / 1e6 / duration, 0.0), 1.0))
+            except ValueError:  # 시작 직후에는 N/A
+                pass
+        elif key == "progress" and value == "end":
+            progress(1.0)
+
+def run_ffmpeg(command: list, timeout: float = 300, duration: float = None, progress=None) -> str:
+    """
+    ffmpeg 명령을 실행하고 -progress 출력으로 진행률을 알립니다.
+
+    Args:
+        command (list): ffmpeg 명령 (["ffmpeg", ..., 출력 경로]).
+        timeout (float): 제한 시간 (초).
+        duration (float): 입력 길이 (초). 진행률 계산에 사용.
+        progress (callable): 진행률(0.0~1.0)을 받는 함수.
+
+    Returns:
+        str: ffmpeg stderr 출력.
+
+    Raises:
+        subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError
+    """
+    command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+    # stderr는 길어질 수 있으므로 파이프 대신 임시 파일로 받음 (읽지 않은 파이프가 차서 멈추지 않도록)
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8", errors="replace") as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        reader = threading.Thread(target=_read_progress, args=(process.stdout, duration, progress), daemon=True)
+        reader.start()
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            reader.join()
+            process.stdout.close()
+        stderr.seek(0)
+        output = stderr.read()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stderr=output)
+    return output
+
+def _video_args(width, height, quality, blur_sigma):
+    # scale=-2:720은 비율을 유지하면서 높이를 720으로 설정 (너비는 자동 계산)
+    # 또는 scale=1280:720으로 고정 크기로 설정
+    return [
+        "-vf", f"scale={width}:{height},gblur=sigma={blur_sigma}",
+        "-crf", str(quality),
+        "-preset", "medium",  # 인코딩 속도와 압축률의 균형
+        "-c:v", "libx264",  # H.264 코덱 사용
+    ]
+
+def _remaining(deadline):
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise subprocess.TimeoutExpired("ffmpeg", 0)
+    return remaining
 
 def process_video(
-    input_path: str, 
+    input_path: str,
     output_path: str,
     width: int = 1280,
     height: int = 720,
     quality: int = 28,
-    blur_sigma: float = 10.0
+    blur_sigma: float = 10.0,
+    timeout: float = 300,
+    progress=None,
+    segments: int = 1,
+    workers: int = None,
+    min_segment_seconds: float = 30,
+    timings: dict = None
 ) -> str:
     """
     비디오를 다운스케일링하고 블러 효과를 적용합니다.
 
+    segments가 2 이상이고 비디오 길이를 알 수 있으며 충분히 길면 키프레임 기준으로 나눈 구간을 여러 ffmpeg 프로세스로
+    동시에 인코딩한 뒤 재인코딩 없이 이어 붙입니다 (구간 분할 모드). 나누기나 잇기에 실패하면
+    남은 시간 안에서 한 번에 인코딩합니다.
+
     Args:
         input_path (str): 원본 비디오 파일의 경로.
         output_path (str): 처리된 비디오를 저장할 전체 경로.
@@ -20,60 +127,75 @@ def process_video(
         quality (int): 비디오 화질 (CRF 값). 18(고품질)에서 28(낮은 품질) 사이의 값.
                        값이 높을수록 화질은 낮아지고 파일 크기는 작아집니다. 기본값 26.
         blur_sigma (float): 가우시안 블러의 강도. 값이 높을수록 블러가 강해집니다. 기본값 5.0.
+        timeout (float): 전체 처리 제한 시간 (초). 기본값 300.
+        progress (callable): 진행률(0.0~1.0)을 받는 함수. ffmpeg -progress 출력에서 계산합니다.
+        segments (int): 나눌 구간 수. 1이면 한 번에 인코딩합니다.
+        workers (int): 동시에 실행할 ffmpeg 프로세스 수. 기본값은 min(segments, CPU 수).
+        min_segment_seconds (float): 구간 하나의 최소 길이 (초). 짧은 비디오는 구간 수를 줄입니다.
+        timings (dict): 주어지면 단계별 소요 시간(초)을 채웁니다
+                        (probe, split, encode, concat, total).
 
     Returns:
         str: 처리된 비디오 파일의 경로.
-    
+
     Raises:
         Exception: ffmpeg 명령 실행 실패 시.
     """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"원본 비디오 파일을 찾을 수 없습니다: {input_path}")
-    
+
     # 출력 디렉토리가 없으면 생성
     output_dir = os.path.dirname(output_path)
     if output_dir and not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    # ffmpeg command: scale down and apply blur
-    # scale=-2:720은 비율을 유지하면서 높이를 720으로 설정 (너비는 자동 계산)
-    # 또는 scale=1280:720으로 고정 크기로 설정
-    command = [
-        "ffmpeg",
-        "-i", input_path,
-        "-vf", f"scale={width}:{height},gblur=sigma={blur_sigma}",
-        "-crf", str(quality),
-        "-preset", "medium",  # 인코딩 속도와 압축률의 균형
-        "-c:v", "libx264",  # H.264 코덱 사용
-        "-c:a", "aac",  # 오디오 코덱
-        "-movflags", "+faststart",  # 스트리밍 최적화
-        "-y",  # 출력 파일 덮어쓰기
-        output_path
-    ]
+    timings = {} if timings is None else timings
+    start = time.monotonic()
+    deadline = start + timeout
+    video_args = _video_args(width, height, quality, blur_sigma)
 
     try:
-        # Execute the ffmpeg command
-        result = subprocess.run(
-            command, 
-            capture_output=True, 
-            text=True, 
-            check=True,
-            timeout=300  # 5분 타임아웃
-        )
-        print(f"ffmpeg stdout: {result.stdout}")
-        if result.stderr:
-            print(f"ffmpeg stderr: {result.stderr}")
-        
+        duration = probe_duration(input_path) if progress or segments > 1 else None
+        timings["probe"] = time.monotonic() - start
+        if duration:
+            segments = min(segments, int(duration // min_segment_seconds))
+
+        stderr = None
+        # 길이를 알 수 없으면 자를 시간을 정할 수 없으므로 한 번에 인코딩
+        if segments > 1 and duration:
+            try:
+                stderr = _encode_segmented(
+                    input_path, output_path, video_args, duration, segments, workers, deadline, progress, timings
+                )
+            except subprocess.CalledProcessError as e:
+                logger.warning("구간 분할 인코딩 실패, 한 번에 인코딩합니다: %s", e.stderr)
+        if stderr is None:
+            encode_start = time.monotonic()
+            # ffmpeg command: scale down and apply blur
+            command = [
+                "ffmpeg",
+                "-i", input_path,
+                *video_args,
+                "-c:a", "aac",  # 오디오 코덱
+                "-movflags", "+faststart",  # 스트리밍 최적화
+                "-y",  # 출력 파일 덮어쓰기
+                output_path
+            ]
+            stderr = run_ffmpeg(command, timeout=_remaining(deadline), duration=duration, progress=progress)
+            timings["encode"] = time.monotonic() - encode_start
+        timings["total"] = time.monotonic() - start
+        if stderr:
+            print(f"ffmpeg stderr: {stderr}")
+
         if not os.path.exists(output_path):
             raise Exception(f"비디오 처리 후 출력 파일이 생성되지 않았습니다: {output_path}")
-        
+
         return output_path
 
     except subprocess.TimeoutExpired:
         raise Exception("비디오 처리 시간이 초과되었습니다.")
     except subprocess.CalledProcessError as e:
         print(f"ffmpeg command failed: {e}")
-        print(f"ffmpeg stdout: {e.stdout}")
         print(f"ffmpeg stderr: {e.stderr}")
         raise Exception(f"비디오 처리 실패: {e.stderr}")
     except FileNotFoundError:
@@ -81,3 +203,87 @@ def process_video(
     except Exception as e:
         raise Exception(f"비디오 처리 중 알 수 없는 오류 발생: {e}")
 
+def _encode_segmented(input_path, output_path, video_args, duration, segments, workers, deadline, progress, timings):
+    """
+    구간 분할 인코딩
+
+    1. split: 비디오 스트림을 재인코딩 없이(-c copy) segments개 구간으로 나눔.
+       segment muxer는 지정한 시간 다음 키프레임에서 자르므로 구간은 항상 키프레임으로 시작합니다.
+    2. encode: 구간마다 ffmpeg 프로세스 하나로 scale + gblur + libx264 인코딩 (최대 workers개 동시 실행).
+       오디오는 전체를 한 번 aac로 인코딩하는 작업으로 함께 실행합니다.
+    3. concat: concat demuxer로 인코딩된 구간과 오디오를 재인코딩 없이(-c copy) 이어 붙임.
+
+    Returns:
+        str: 마지막(concat) ffmpeg stderr 출력.
+    """
+    workers = workers or min(segments, os.cpu_count() or 1)
+    # 프로세스마다 x264 스레드를 CPU 수만큼 만들지 않도록 나눠 줌
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    work_dir = tempfile.mkdtemp(prefix="segments-", dir=os.path.dirname(output_path) or None)
+    try:
+        split_start = time.monotonic()
+        cut_times = ",".join(f"{duration * i / segments:.3f}" for i in range(1, segments))
+        run_ffmpeg([
+            "ffmpeg", "-i", input_path,
+            "-map", "0:v:0", "-c", "copy",
+            "-f", "segment", "-segment_times", cut_times, "-reset_timestamps", "1",
+            "-y", os.path.join(work_dir, "source-%03d.mkv")
+        ], timeout=_remaining(deadline))
+        sources = sorted(name for name in os.listdir(work_dir) if name.startswith("source-"))
+        if len(sources) < 2:  # 키프레임이 부족해 나눠지지 않음
+            raise subprocess.CalledProcessError(0, "ffmpeg segment", stderr="키프레임이 부족해 구간을 나눌 수 없습니다.")
+        source_durations = [probe_duration(os.path.join(work_dir, name)) or 0.0 for name in sources]
+        timings["split"] = time.monotonic() - split_start
+
+        encode_start = time.monotonic()
+        fractions = [0.0] * len(sources)
+        progress_lock = threading.Lock()
+        total_duration = sum(source_durations) or 1.0
+
+        def report(index):
+            def update(fraction):
+                with progress_lock:
+                    fractions[index] = fraction
+                    done = sum(f * d for f, d in zip(fractions, source_durations))
+                if progress:
+                    progress(min(done / total_duration, 1.0))
+            return update
+
+        def run_until_deadline(command, duration=None, progress=None):
+            # 워커를 기다리는 동안 지난 시간도 빼도록 ffmpeg를 시작하기 직전에 남은 시간 계산
+            return run_ffmpeg(command, _remaining(deadline), duration, progress)
+
+        encoded = [os.path.join(work_dir, f"encoded-{i:03d}.mp4") for i in range(len(sources))]
+        audio_path = os.path.join(work_dir, "audio.m4a") if has_audio(input_path) else None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(run_until_deadline, [
+                    "ffmpeg", "-i", os.path.join(work_dir, name),
+                    *video_args, "-threads", str(threads), "-an",
+                    "-y", target
+                ], source_durations[i], report(i))
+                for i, (name, target) in enumerate(zip(sources, encoded))
+            ]
+            if audio_path:
+                futures.append(executor.submit(run_until_deadline, [
+                    "ffmpeg", "-i", input_path, "-vn", "-c:a", "aac", "-y", audio_path
+                ]))
+            for future in futures:
+                future.result()
+        timings["encode"] = time.monotonic() - encode_start
+
+        concat_start = time.monotonic()
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for path in encoded:
+                escaped = path.replace("'", "'\\''")
+                list_file.write(f"file '{escaped}'\n")
+        command = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", list_path]
+        if audio_path:
+            command += ["-i", audio_path, "-map", "0:v:0", "-map", "1:a:0"]
+        command += ["-c", "copy", "-movflags", "+faststart", "-y", output_path]
+        stderr = run_ffmpeg(command, timeout=_remaining(deadline))
+        timings["concat"] = time.monotonic() - concat_start
+        return stderr
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
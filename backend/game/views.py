@@ -1,10 +1,51 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from .models import Chart, Result, Rank
-from .serializers import ChartSerializer, ResultSerializer, RankSerializer, CreateResultSerializer
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from . import chart_cache, chart_stats, leaderboard_cache, result_export
+from .leaderboard import leaderboard_engine
+from .leaderboard_cache import LEADERBOARD_SIZE
+from .models import (
+    Chart, ChartStat, LeaderboardSnapshot, PeriodRank, PlayerRating, Result, Rank, VideoJob,
+    PERIOD_ALL, PERIOD_MONTH, PERIOD_WEEK, period_keys,
+)
+from .pagination import KeysetPagination
+from .renderers import CompactChartRenderer
+from .result_archive import result_archive
+from .result_queue import result_queue
+from .results import build_result, save_results
+from .serializers import (
+    ChartSerializer, ChartListSerializer, ResultSerializer, RankSerializer, CreateResultSerializer,
+    PlayerRatingSerializer, VideoJobSerializer,
+)
+import json
+import re
+from functools import partial
+
+User = get_user_model()
+
+PERIOD_KEY_PATTERNS = {
+    PERIOD_WEEK: re.compile(r'\d{4}-W\d{2}'),
+    PERIOD_MONTH: re.compile(r'\d{4}-\d{2}'),
+}
+SNAPSHOT_MAX_AGE = 60 * 60 * 24 * 365  # 끝난 기간의 리더보드는 바뀌지 않으므로 1년 캐시
+MAX_AROUND = 50
+MAX_RESULT_BATCH = 500
+CHART_RESULT_ORDERINGS = {
+    'score': ('score', 'id'),
+    'combo': ('maxCombo', 'id'),
+}
+GLOBAL_LEADERBOARD_SIZE = 50
+MAX_GLOBAL_LEADERBOARD_SIZE = 100
 
 class ChartViewSet(viewsets.ModelViewSet):
     """차트 CRUD 뷰셋"""
@@ -12,6 +53,58 @@ class ChartViewSet(viewsets.ModelViewSet):
     serializer_class = ChartSerializer
     lookup_field = 'musicId'
     permission_classes = [IsAuthenticated]
+    # ?limit=&offset= 이 주어질 때만 페이지네이션 (기존 배열 응답 유지)
+    pagination_class = LimitOffsetPagination
+
+    def get_renderers(self):
+        renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+        if self.action == 'retrieve':
+            renderers.append(CompactChartRenderer())
+        return renderers
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ChartListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        # 랭킹과 유저 최고 기록은 차트 수와 무관하게 prefetch 한 번씩, 노트는 캐시에 없을 때만 읽음
+        queryset = queryset.defer('notesData').with_top_ranks().with_user_best(self.request.user)
+        if self.action == 'list':
+            queryset = queryset.with_top_score().order_by('id')
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        """차트 상세 조회 - 노트 부분은 차트 버전별로 캐시하고 ETag로 조건부 응답"""
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, (JSONRenderer, CompactChartRenderer)):
+            return super().retrieve(request, *args, **kwargs)
+
+        chart = self.get_object()
+        context = {**self.get_serializer_context(), 'exclude_notes': True}
+        meta = self.get_serializer(chart, context=context).data
+
+        etag = chart_cache.chart_etag(chart, renderer.format, meta)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            body = chart_cache.render_chart(chart, renderer.format, meta)
+            response = HttpResponse(body, content_type=renderer.media_type)
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept', 'Cookie'))
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # 에러 응답은 압축 포맷 대신 JSON으로 반환
+        if getattr(response, 'exception', False) and isinstance(getattr(request, 'accepted_renderer', None), CompactChartRenderer):
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
 
     def create(self, request, musicId=None):
         """차트 생성 - URL의 musicId 사용"""
@@ -30,6 +123,62 @@ class ChartViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def chart_notes(request, musicId):
+    """차트 노트 구간 조회
+
+    ?from=&to= (ms, to는 미포함)로 시작 시간이 구간 안인 노트만 반환합니다.
+    ?stream=ndjson 또는 Accept: application/x-ndjson이면 노트를 한 줄씩 스트리밍합니다.
+    """
+    chart = get_object_or_404(Chart, musicId=musicId)
+    try:
+        start = _optional_int(request.query_params, 'from')
+        end = _optional_int(request.query_params, 'to')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    notes = chart.iter_notes(start, end)
+    if request.query_params.get('stream') == 'ndjson' or 'application/x-ndjson' in request.headers.get('Accept', ''):
+        lines = (json.dumps(note_data, separators=(',', ':')) + '\n' for note_data in notes)
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+    return Response({'from': start, 'to': end, 'notes': list(notes)})
+
+
+@api_view(['GET'])
+def chart_statistics(request, musicId):
+    """차트 통계 조회 (점수/정확도 분포, 판정 합계, 레인별 miss 비율)
+
+    결과 저장 시 갱신되는 구간 값만 읽으므로 결과 수와 관계없이 구간 수만큼만 읽습니다.
+    """
+    chart = get_object_or_404(Chart.objects.only('id', 'musicId'), musicId=musicId)
+    stats = ChartStat.objects.filter(chart=chart).values_list('metric', 'bin', 'value')
+    return Response(chart_stats.summarize(chart, stats))
+
+
+@api_view(['GET'])
+def chart_processing(request, musicId):
+    """차트 배경 비디오 처리 상태 조회 (진행률은 ffmpeg -progress 출력 기준)"""
+    chart = get_object_or_404(Chart.objects.only('id', 'musicId', 'videoStatus'), musicId=musicId)
+    job = VideoJob.objects.filter(chart=chart).first()
+    return Response({
+        'musicId': chart.musicId,
+        'videoStatus': chart.videoStatus,
+        'job': VideoJobSerializer(job).data if job else None,
+    })
+
+
+def _optional_int(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'{name} 값은 정수여야 합니다.')
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_result(request):
@@ -39,60 +188,222 @@ def create_result(request):
 
     data = serializer.validated_data
     chart = get_object_or_404(Chart, musicId=data['musicId'])
+    if settings.RESULT_INGEST_MODE == 'queue':
+        # 저널에 기록 후 바로 응답하고, 백그라운드 스레드가 모아서 저장
+        sequence = result_queue.put(request.user.id, chart.id, dict(data))
+        return Response({'status': 'queued', 'sequence': sequence, **serializer.data}, status=status.HTTP_202_ACCEPTED)
 
-    result = Result.objects.create(
-        user=request.user,
-        chart=chart,
-        musicId=data['musicId'],
-        difficulty=chart.difficulty,
-        score=data['score'],
-        accuracy=data['accuracy'],
-        combo=data['combo'],
-        rank=data['rank'],
-        isFullCombo=data['isFullCombo'],
-        isAllPerfect=data['isAllPerfect'],
-        perfect=data.get('perfect', 0),
-        great=data.get('great', 0),
-        good=data.get('good', 0),
-        miss=data.get('miss', 0),
-        bad=data.get('bad', 0),
-        earlyCount=data.get('earlyCount', 0),
-        lateCount=data.get('lateCount', 0),
-    )
-
-    rank, created = Rank.objects.get_or_create(
-        user=request.user,
-        chart=chart,
-        defaults={'score': result.score}
-    )
-    if not created and result.score > rank.score:
-        rank.score = result.score
-        rank.save()
+    result, = save_results(request.user, [build_result(request.user, chart, data)])
 
     return Response(ResultSerializer(result).data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def result_queue_stats(request):
+    """결과 write-behind 큐 상태 조회 (대기 수, 저장 수, 저장 시간)"""
+    return Response({'mode': settings.RESULT_INGEST_MODE, **result_queue.stats()})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_results_batch(request):
+    """오프라인 플레이 결과 일괄 제출 (결과 객체 배열, 항목별 처리 상태 반환)"""
+    if not isinstance(request.data, list):
+        return Response({'error': '결과 목록(JSON 배열)을 보내야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(request.data) > MAX_RESULT_BATCH:
+        return Response({'error': f'한 번에 최대 {MAX_RESULT_BATCH}개까지 제출할 수 있습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    statuses = []
+    valid = []
+    for index, item in enumerate(request.data):
+        serializer = CreateResultSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+            statuses.append(None)
+        else:
+            statuses.append({'index': index, 'status': 'invalid', 'errors': serializer.errors})
+
+    charts = Chart.objects.defer('notesData').in_bulk({data['musicId'] for _, data in valid}, field_name='musicId')
+    pending = []
+    for index, data in valid:
+        chart = charts.get(data['musicId'])
+        if chart is None:
+            statuses[index] = {'index': index, 'status': 'not_found', 'errors': {'musicId': ['존재하지 않는 곡입니다.']}}
+        else:
+            pending.append((index, build_result(request.user, chart, data)))
+
+    if pending:
+        saved = save_results(request.user, [result for _, result in pending])
+        for (index, _), result in zip(pending, saved):
+            statuses[index] = {'index': index, 'status': 'created', 'result': ResultSerializer(result).data}
+
+    return Response({'created': len(pending), 'results': statuses}, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def leaderboard(request, musicId):
-    """곡별 리더보드 조회"""
+    """곡별 리더보드 조회 (?period=all|week|month, 지난 기간은 &key=2026-W41 / 2026-09)"""
+    chart = get_object_or_404(Chart, musicId=musicId)
+    period = request.query_params.get('period', PERIOD_ALL)
+    if period == PERIOD_ALL:
+        key = PERIOD_ALL
+    elif period in (PERIOD_WEEK, PERIOD_MONTH):
+        key = request.query_params.get('key') or period_keys()[period]
+        if not PERIOD_KEY_PATTERNS[period].fullmatch(key):
+            return Response({'error': f'{period} 기간의 key 형식이 올바르지 않습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        return Response({'error': 'period 값은 all, week, month 중 하나여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    payload = leaderboard_cache.get_or_build(chart.id, key, lambda: _build_leaderboard(chart, key))
+    response = Response([
+        {**entry, 'user': {**entry['user'], 'profileImage': _absolute_url(request, entry['user']['profileImage'])}}
+        for entry in payload['entries']
+    ])
+    if payload['frozen']:
+        patch_cache_control(response, public=True, max_age=SNAPSHOT_MAX_AGE, immutable=True)
+    return response
+
+
+def _build_leaderboard(chart, key):
+    """캐시할 리더보드 (프로필 이미지는 요청과 무관한 상대 경로)"""
+    if key == PERIOD_ALL:
+        # 상위 목록은 DB에서 읽음 (프로세스별 엔진은 다른 프로세스의 기록을 늦게 반영하므로 순위/주변 조회에만 사용)
+        ranks = Rank.objects.filter(chart=chart).select_related('user').order_by('-score', 'user')[:LEADERBOARD_SIZE]
+        return {'entries': RankSerializer(ranks, many=True).data, 'frozen': False}
+
+    snapshot = LeaderboardSnapshot.objects.filter(chart=chart, period=key).first()
+    if snapshot is not None:
+        return {'entries': snapshot.entries, 'frozen': True}
+
+    ranks = PeriodRank.objects.filter(chart=chart, period=key).select_related('user').order_by('-score', 'user')[:LEADERBOARD_SIZE]
+    return {'entries': RankSerializer(ranks, many=True).data, 'frozen': False}
+
+
+def _absolute_url(request, url):
+    return request.build_absolute_uri(url) if url else url
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def leaderboard_cache_stats(request):
+    """리더보드 캐시 적중/미스 횟수 조회 (?reset=1이면 조회 후 초기화)"""
+    data = leaderboard_cache.stats()
+    if request.query_params.get('reset'):
+        leaderboard_cache.reset_stats()
+    return Response(data)
+
+
+@api_view(['GET'])
+def global_leaderboard(request):
+    """전체 레이팅 리더보드 조회 (?limit=&offset=)"""
+    try:
+        limit = _optional_int(request.query_params, 'limit')
+        offset = _optional_int(request.query_params, 'offset')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    limit = GLOBAL_LEADERBOARD_SIZE if limit is None else min(max(limit, 1), MAX_GLOBAL_LEADERBOARD_SIZE)
+    offset = max(offset or 0, 0)
+
+    ratings = PlayerRating.objects.select_related('user').order_by('-rating', 'user')[offset:offset + limit]
+    data = PlayerRatingSerializer(ratings, many=True, context={'request': request}).data
+    return Response([{'rank': offset + i + 1, **rating_data} for i, rating_data in enumerate(data)])
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_leaderboard_rank(request, musicId):
+    """곡별 리더보드에서 내 순위와 주변 순위 조회 (?around=N, 기본 5)"""
     chart = get_object_or_404(Chart, musicId=musicId)
-    ranks = Rank.objects.filter(chart=chart).order_by('-score')[:10]
-    serializer = RankSerializer(ranks, many=True)
-    return Response(serializer.data)
+    try:
+        around = _optional_int(request.query_params, 'around')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    around = 5 if around is None else min(max(around, 0), MAX_AROUND)
+
+    board = leaderboard_engine.chart(chart.id)
+    return Response({
+        'rank': board.rank_of(request.user.id),
+        'score': board.score_of(request.user.id),
+        'total': len(board),
+        'around': _serialize_board_entries(request, chart, board.around(request.user.id, around)),
+    })
+
+
+def _serialize_board_entries(request, chart, entries):
+    """리더보드 엔진의 (순위, 유저 ID, 점수) 목록을 RankSerializer 형식으로 변환"""
+    users = User.objects.in_bulk([user_id for _, user_id, _ in entries])
+    data = []
+    for rank, user_id, score in entries:
+        user = users.get(user_id)
+        if user is None:  # 엔진을 다시 읽기 전에 삭제된 유저
+            continue
+        rank_data = RankSerializer(Rank(chart=chart, user=user, score=score), context={'request': request}).data
+        data.append({'rank': rank, **rank_data})
+    return data
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_results(request):
+    """결과/랭킹 내보내기 (?table=results|ranks&stream=ndjson|csv&chart=&user=&since=)
+
+    행을 chunk 단위로 읽어 바로 스트리밍하므로 내보내는 행 수와 관계없이 메모리 사용량이 일정합니다.
+    """
+    params = request.query_params
+    table = params.get('table', result_export.TABLE_RESULTS)
+    output_format = params.get('stream', result_export.FORMAT_NDJSON)
+    if table not in result_export.TABLE_FIELDS:
+        return Response({'error': 'table 값은 results, ranks 중 하나여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    if output_format not in result_export.FORMATS:
+        return Response({'error': 'stream 값은 ndjson, csv 중 하나여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        user_id = _optional_int(params, 'user')
+        since = result_export.parse_since(params.get('since'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    chart_id = None
+    if params.get('chart'):
+        chart_id = get_object_or_404(Chart.objects.only('id'), musicId=params['chart']).id
+
+    rows = result_export.iter_rows(table, chart_id, user_id, since)
+    response = StreamingHttpResponse(
+        result_export.export(table, output_format, rows),
+        content_type=result_export.CONTENT_TYPES[output_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{table}.{output_format}"'
+    return response
 
 
 @api_view(['GET'])
 def user_results(request, userId):
-    """특정 유저 결과 조회"""
-    results = Result.objects.filter(user_id=userId).order_by('-playedAt')
-    serializer = ResultSerializer(results, many=True)
-    return Response(serializer.data)
+    """특정 유저 결과 조회 (최근 플레이 순, ?cursor=&limit=)"""
+    results = _result_list_queryset().filter(user_id=userId)
+    return _paginated_results(request, results, ('playedAt', 'id'), 'user_id', userId)
 
 
 @api_view(['GET'])
 def chart_results(request, musicId):
-    """특정 곡 결과 조회"""
+    """특정 곡 결과 조회 (높은 점수 순, ?order=combo면 최대 콤보 순, ?cursor=&limit=)"""
     chart = get_object_or_404(Chart, musicId=musicId)
-    results = Result.objects.filter(chart=chart).order_by('-score')
-    serializer = ResultSerializer(results, many=True)
-    return Response(serializer.data)
+    order = request.query_params.get('order', 'score')
+    if order not in CHART_RESULT_ORDERINGS:
+        return Response({'error': 'order 값은 score, combo 중 하나여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    results = _result_list_queryset().filter(chart=chart)
+    return _paginated_results(request, results, CHART_RESULT_ORDERINGS[order], 'chart_id', chart.id)
+
+
+def _result_list_queryset():
+    # ResultSerializer가 쓰는 유저 닉네임/차트 제목을 JOIN으로 함께 읽음 (차트 노트 등은 읽지 않음)
+    result_fields = [field.name for field in Result._meta.concrete_fields]
+    return Result.objects.select_related('user', 'chart').only(*result_fields, 'user__nickname', 'chart__title')
+
+
+def _paginated_results(request, results, ordering, archive_field, archive_value):
+    # DB 행 다음 순서에 오는 보관된 결과(archive_results로 옮긴 행)를 세그먼트에서 이어서 읽음
+    archive = partial(result_archive.page, archive_field, archive_value, ordering)
+    paginator = KeysetPagination(ordering, archive)
+    page = paginator.paginate_queryset(results, request)
+    if page is None:  # cursor/limit이 없으면 기존처럼 전체 결과 배열
+        return Response(ResultSerializer(paginator.all_rows(results), many=True).data)
+    return paginator.get_paginated_response(ResultSerializer(page, many=True).data)
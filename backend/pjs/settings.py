@@ -125,6 +125,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # 테스트 DB는 파일로 생성 (메모리 DB는 여러 스레드가 동시에 쓰면 'table is locked'로 바로 실패)
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -169,6 +171,58 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pjs-default',
+    }
+}
+
+# 렌더링된 차트 노트 캐시 유지 시간 (초). 키에 차트 버전이 포함되어 변경 시 자동으로 무효화됨
+CHART_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 차트 노트 저장 방식
+# 'columnar': Chart.notesData에 열 단위 노트 블록 하나로 저장
+# 'rows': 노트마다 game_note 행 하나로 저장
+GAME_NOTE_STORAGE = 'columnar'
+
+# 메모리 리더보드를 Rank 테이블에서 다시 읽는 주기 (초). 다른 프로세스에서 갱신된 점수를 반영하기 위함
+# None이면 처음 한 번만 읽고 이후에는 이 프로세스의 create_result로만 갱신
+LEADERBOARD_REFRESH_SECONDS = 60
+
+# 리더보드 응답 캐시 유지 시간 (초). 이 프로세스의 결과 저장은 즉시 반영되고,
+# 다른 프로세스(로컬 메모리 캐시 사용 시)의 갱신은 최대 이 시간만큼 늦게 반영됨
+LEADERBOARD_CACHE_TIMEOUT = 60
+
+# 결과 저장 방식
+# 'sync': create_result 요청 안에서 바로 저장
+# 'queue': 저널 파일에 기록하고 바로 응답(202), 백그라운드 스레드가 모아서 저장 (서버 프로세스 하나일 때만 사용)
+RESULT_INGEST_MODE = 'sync'
+RESULT_QUEUE_FLUSH_INTERVAL_MS = 200  # 큐에 쌓인 결과를 저장하는 최대 간격
+RESULT_QUEUE_FLUSH_SIZE = 200  # 한 번에 저장할 최대 결과 수
+RESULT_JOURNAL_PATH = BASE_DIR / 'data' / 'result_journal.ndjson'  # 프로세스마다 pid를 붙인 파일을 사용 (result_journal.<pid>-<시각>.ndjson)
+RESULT_JOURNAL_FSYNC = True  # 저널 기록마다 fsync (끄면 빠르지만 OS 장애 시 유실 가능)
+
+# 오래된 결과 보관 (archive_results 명령)
+# 이 기간보다 오래된 결과(유저의 차트별 최고 기록 제외)를 열 단위 세그먼트 파일로 옮기고 DB에서 삭제
+RESULT_ARCHIVE_DIR = BASE_DIR / 'data' / 'result_archive'
+RESULT_ARCHIVE_AFTER_DAYS = 180
+
+# 차트 배경 비디오 처리 작업 (game.video_jobs)
+# 업로드 요청은 작업만 추가하고 바로 응답하며, 워커가 ffmpeg로 처리
+VIDEO_JOB_WORKERS = 2  # 서버 프로세스 안에서 실행할 워커 스레드 수 (0이면 run_video_jobs 명령으로만 처리)
+VIDEO_JOB_MAX_ATTEMPTS = 3  # 모두 실패하면 원본 비디오를 그대로 사용
+VIDEO_JOB_RETRY_DELAY_SECONDS = 30  # 첫 재시도 대기 시간 (재시도마다 2배)
+VIDEO_JOB_POLL_SECONDS = 5  # 새 작업/재시도 시간이 된 작업을 확인하는 간격
+VIDEO_PROCESS_TIMEOUT = 300  # ffmpeg 처리 제한 시간 (초)
+# 긴 비디오는 키프레임 기준 구간으로 나눠 여러 ffmpeg 프로세스로 동시에 인코딩 (1이면 한 번에 인코딩)
+VIDEO_ENCODE_SEGMENTS = 4
+VIDEO_ENCODE_WORKERS = None  # 작업 하나에서 동시에 실행할 ffmpeg 수 (None이면 min(구간 수, CPU 수))
+VIDEO_SEGMENT_MIN_SECONDS = 30  # 구간 하나의 최소 길이 (짧은 비디오는 구간 수를 줄이거나 한 번에 인코딩)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -41,9 +41,15 @@ urlpatterns = [
     path('auth/', include('accounts.urls')),
     path('charts/', include('game.urls')),
     path('results/', game_views.create_result, name='create_result'),
+    path('results/batch/', game_views.create_results_batch, name='create_results_batch'),
+    path('results/queue-stats/', game_views.result_queue_stats, name='result_queue_stats'),
+    path('results/export/', game_views.export_results, name='export_results'),
     path('results/user/<int:userId>/', game_views.user_results, name='user_results'),
     path('results/chart/<str:musicId>/', game_views.chart_results, name='chart_results'),
+    path('leaderboard/cache-stats/', game_views.leaderboard_cache_stats, name='leaderboard_cache_stats'),
+    path('leaderboard/global/', game_views.global_leaderboard, name='global_leaderboard'),
     path('leaderboard/<str:musicId>/', game_views.leaderboard, name='leaderboard'),
+    path('leaderboard/<str:musicId>/me/', game_views.my_leaderboard_rank, name='my_leaderboard_rank'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]
@@ -2,7 +2,7 @@ import { useEffect, useRef, useState } from "react";
 
 import { GameInfo, GameStats, JudgementLine } from "@/components/game";
 import PlayField from "@/components/game/play-field";
-import { getChart } from "@/shared/api/chartService";
+import { getChartCompact } from "@/shared/api/chartService";
 import { BackgroundVideo } from "@/shared/components";
 import { Chart } from "@/shared/types/chart";
 import { Note } from "@/shared/types/game/note";
@@ -30,7 +30,7 @@ export default function GameMain() {
       resetResult();
       clearHolds();
       setResult({ musicId });
-      getChart(musicId)
+      getChartCompact(musicId)
         .then((chartData) => {
           setChart(chartData);
           setResult({ difficulty: chartData.difficulty });
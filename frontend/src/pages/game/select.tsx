@@ -7,7 +7,7 @@ import { filterCharts, getCharts } from "@/shared/api/chartService";
 import { Header } from "@/shared/components";
 import { FlexAlign, HStack, VStack } from "@/shared/components/stack";
 import useKeyNavigationShortcuts from "@/shared/hook/useKeyNavigationShortcuts";
-import { Chart, ChartSortOption } from "@/shared/types/chart";
+import { ChartSortOption, ChartSummary } from "@/shared/types/chart";
 
 import s from "@/shared/styles/pages/game/select.module.scss";
 
@@ -15,7 +15,7 @@ const API_BASE = "http://localhost:8000";
 
 export default function SongSelect() {
   const navigate = useNavigate();
-  const [charts, setCharts] = useState<Chart[]>([]);
+  const [charts, setCharts] = useState<ChartSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -1,6 +1,12 @@
-import { Chart, ChartSortOption, Note } from "@/shared/types/chart";
+import {
+  Chart,
+  ChartSortOption,
+  ChartSummary,
+  Note,
+} from "@/shared/types/chart";
 
 import request from "./client";
+import { CHART_MEDIA_TYPE, decodeChart } from "./noteCodec";
 
 export interface GetChartsParams {
   search?: string;
@@ -43,16 +49,16 @@ export async function saveChart(data: SaveChartParams) {
 }
 
 export async function getCharts(_params?: GetChartsParams) {
-  return request<Chart[]>("/charts/", {
+  return request<ChartSummary[]>("/charts/", {
     method: "GET",
   });
 }
 
 export function filterCharts(
-  charts: Chart[],
+  charts: ChartSummary[],
   search: string,
   sort: ChartSortOption,
-): Chart[] {
+): ChartSummary[] {
   let filtered = [...charts];
 
   if (search.trim()) {
@@ -89,6 +95,35 @@ export async function getChart(musicId: string) {
   });
 }
 
+// 노트를 열 단위 바이너리 포맷으로 받아 디코딩 (JSON 대비 페이로드가 작음)
+export async function getChartCompact(musicId: string) {
+  const buffer = await request<ArrayBuffer>(`/charts/${musicId}/`, {
+    method: "GET",
+    headers: { Accept: CHART_MEDIA_TYPE },
+  });
+  return decodeChart(buffer);
+}
+
+export interface ChartNotesRange {
+  from: number | null;
+  to: number | null;
+  notes: Note[];
+}
+
+// 시작 시간이 [from, to) 구간인 노트만 조회 (ms 단위)
+export async function getChartNotes(
+  musicId: string,
+  from?: number,
+  to?: number,
+) {
+  const params = new URLSearchParams();
+  if (from !== undefined) params.set("from", String(from));
+  if (to !== undefined) params.set("to", String(to));
+  return request<ChartNotesRange>(`/charts/${musicId}/notes/?${params}`, {
+    method: "GET",
+  });
+}
+
 export async function createChart(data: Partial<Chart>) {
   return request<Chart>("/charts/", {
     method: "POST",
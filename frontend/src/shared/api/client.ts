@@ -44,6 +44,10 @@ async function request<T = any>(path: string, init: RequestInit = {}) {
     return (await res.json()) as T;
   }
 
+  if (contentType.includes("application/vnd.sunrin")) {
+    return (await res.arrayBuffer()) as unknown as T;
+  }
+
   return (await res.text()) as unknown as T;
 }
 
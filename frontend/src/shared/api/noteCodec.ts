@@ -0,0 +1,62 @@
+import { Chart, Note } from "@/shared/types/chart";
+
+// 차트 상세 압축 포맷 디코더 (backend/game/note_codec.py 레이아웃 참고)
+export const CHART_MEDIA_TYPE = "application/vnd.sunrin.chart";
+
+const CHART_MAGIC = "SNC1";
+const NOTE_BLOCK_MAGIC = "SNT1";
+const NOTE_TYPES: Note["type"][] = ["tap", "hold"];
+
+function readMagic(view: DataView, offset: number) {
+  return String.fromCharCode(
+    view.getUint8(offset),
+    view.getUint8(offset + 1),
+    view.getUint8(offset + 2),
+    view.getUint8(offset + 3),
+  );
+}
+
+export function decodeNotes(buffer: ArrayBuffer, offset = 0): Note[] {
+  const view = new DataView(buffer);
+  if (readMagic(view, offset) !== NOTE_BLOCK_MAGIC) {
+    throw new Error("올바른 노트 블록이 아닙니다.");
+  }
+  const count = view.getUint32(offset + 4, true);
+  let cursor = offset + 8;
+  const deltas = new Int32Array(buffer, cursor, count);
+  cursor += 4 * count;
+  const durations = new Int32Array(buffer, cursor, count);
+  cursor += 4 * count;
+  const lanes = new Uint8Array(buffer, cursor, count);
+  cursor += count;
+  const types = new Uint8Array(buffer, cursor, count);
+
+  const notes: Note[] = new Array(count);
+  let time = 0;
+  for (let i = 0; i < count; i++) {
+    time += deltas[i];
+    notes[i] = {
+      id: i + 1,
+      chart: 0,
+      time,
+      lane: lanes[i],
+      type: NOTE_TYPES[types[i]],
+      duration: durations[i] < 0 ? null : durations[i],
+    };
+  }
+  return notes;
+}
+
+export function decodeChart(buffer: ArrayBuffer): Chart {
+  const view = new DataView(buffer);
+  if (readMagic(view, 0) !== CHART_MAGIC) {
+    throw new Error("올바른 차트 페이로드가 아닙니다.");
+  }
+  const metaLength = view.getUint32(4, true);
+  const metaEnd = 8 + metaLength;
+  const meta = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, 8, metaLength)),
+  );
+  const notesOffset = metaEnd + ((4 - (metaEnd % 4)) % 4);
+  return { ...meta, notes: decodeNotes(buffer, notesOffset) };
+}
@@ -44,4 +44,9 @@ export interface Chart {
   creator: number;
 }
 
+export interface ChartSummary extends Omit<Chart, "notes"> {
+  noteCount: number;
+  topScore: number | null;
+}
+
 export type ChartSortOption = "latest" | "oldest" | "mostPlayed";